@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # Third-party
     "rest_framework",
@@ -151,6 +152,32 @@ DATABASES = {
     }
 }
 
+# --------------------------------------------------
+# CACHE (Redis when REDIS_URL is set, per-process memory otherwise)
+# --------------------------------------------------
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+# Cached social read responses (see SOCIAL_RESPONSE_CACHE); point this alias
+# at Redis/Memcached to share bodies between processes
+CACHES["social_responses"] = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "social-responses",
+    "OPTIONS": {"MAX_ENTRIES": 10000},
+}
+
 # --------------------------------------------------
 # AUTH
 # --------------------------------------------------
@@ -195,6 +222,24 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# WebP renditions of uploaded images (longest edge in px), built after commit
+# in a background thread; backfill with `manage.py generate_renditions`
+IMAGE_RENDITIONS = {"medium": 1080, "thumb": 320}
+IMAGE_RENDITION_QUALITY = 80
+IMAGE_RENDITIONS_ASYNC = True
+IMAGE_RENDITION_WORKERS = 2
+# Streaming upload caps (common.uploads); larger uploads get a 413
+UPLOAD_MAX_FILE_SIZE = 10 * 1024 * 1024
+UPLOAD_MAX_REQUEST_SIZE = 60 * 1024 * 1024
+# Uploads are stored once per content hash under MEDIA_ROOT/blobs/ (common.storage);
+# orphaned blobs are removed by `manage.py gc_media`
+STORAGES = {
+    "default": {"BACKEND": "common.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+# Serve /media/blobs/ from Django with immutable cache headers outside DEBUG too
+# (leave False when a web server or CDN serves MEDIA_ROOT)
+MEDIA_SERVE_BLOBS = False
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -237,3 +282,58 @@ CORS_ALLOW_HEADERS = list(default_headers) + [
 # --------------------------------------------------
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID", "rzp_test_YourKeyHere")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET", "YourSecretHere")
+
+# --------------------------------------------------
+# EXPLORE
+# --------------------------------------------------
+# In-process grid index of active gyms serving /gyms/map/ and /gyms/nearest/
+# (falls back to SQL until built and whenever another process changed a gym)
+EXPLORE_SPATIAL_INDEX = True
+EXPLORE_SPATIAL_CELL_DEGREES = 0.1
+EXPLORE_SPATIAL_INDEX_TTL = 3600
+
+# --------------------------------------------------
+# SOCIAL
+# --------------------------------------------------
+# Authors above this follower count are merged into feeds at read time
+SOCIAL_FANOUT_FOLLOWER_LIMIT = 5000
+# Recent posts copied into a timeline when a new follow is created
+SOCIAL_TIMELINE_BACKFILL = 100
+# Entries kept per home timeline; trim older ones with `manage.py trim_timelines`
+SOCIAL_TIMELINE_LENGTH = 800
+# Fan new posts out to followers in a background thread after commit
+SOCIAL_TIMELINE_FANOUT_ASYNC = True
+# Buffer like counters in sharded rows (flush with `manage.py flush_counter_shards`)
+SOCIAL_BUFFERED_COUNTERS = False
+SOCIAL_COUNTER_SHARDS = 16
+# Queue notifications for `manage.py process_notifications --loop`; only enable
+# with a shared default cache (Redis) and a cross-process SOCIAL_REALTIME_BROKER,
+# otherwise the worker's realtime pushes and badge refreshes never reach web processes.
+# Off, the request runs the same like coalescing itself
+SOCIAL_ASYNC_NOTIFICATIONS = False
+# Unread like notifications on a post absorb new likes within this many seconds
+SOCIAL_NOTIFICATION_COALESCE_WINDOW = 3600
+# Max staleness of cached unread badge counts
+SOCIAL_BADGE_CACHE_TIMEOUT = 300
+# Explore ranking (refresh with `manage.py refresh_trending --loop`)
+SOCIAL_TRENDING_WINDOW_DAYS = 7
+SOCIAL_TRENDING_TOP_K = 500
+SOCIAL_TRENDING_DECAY_SECONDS = 45000
+# Lifetime of cached follow/block id sets (invalidated on every write)
+SOCIAL_GRAPH_CACHE_TIMEOUT = 3600
+# Text search configuration for profile/post search vectors
+SOCIAL_SEARCH_CONFIG = "english"
+# Seconds before the in-process username autocomplete index is rebuilt
+SOCIAL_AUTOCOMPLETE_TTL = 600
+# Hours of hashtag usage summed for trending hashtags (older buckets pruned by refresh_trending)
+SOCIAL_HASHTAG_TREND_HOURS = 24
+# Public profile reads (retrieve/posts/followers/following) cached in this CACHES alias
+SOCIAL_RESPONSE_CACHE = "social_responses"
+SOCIAL_RESPONSE_CACHE_TIMEOUT = 300
+# Browser/CDN max-age of anonymous cached responses
+SOCIAL_RESPONSE_CACHE_MAX_AGE = 30
+# Realtime push (/api/social/stream/) needs the ASGI app:
+#   gunicorn Backend.asgi:application -k uvicorn.workers.UvicornWorker
+SOCIAL_REALTIME_BROKER = "social.realtime.InProcessBroker"
+SOCIAL_REALTIME_KEEPALIVE = 20
+SOCIAL_REALTIME_MAX_AGE = 300
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.urls import path, include
+from common.views import serve_blob
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -16,5 +17,11 @@ urlpatterns = [
 from django.conf import settings
 from django.conf.urls.static import static
 
+# Content-addressed blobs are immutable; serve them with long-lived cache headers
+if settings.DEBUG or settings.MEDIA_SERVE_BLOBS:
+    urlpatterns += [
+        path(f"{settings.MEDIA_URL.lstrip('/')}blobs/<path:path>", serve_blob),
+    ]
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,22 @@
+"""
+Per-process warm-up of the in-process indexes
+Each process starts its builds on its first request rather than at import:
+servers that import the app and then fork workers (gunicorn --preload)
+would otherwise leave every worker a build lock held by a thread it does
+not have
+"""
+
+from django.core.signals import request_started
+
+
+def _warm(**kwargs):
+    request_started.disconnect(_warm)
+
+    from explore import spatial
+    from social import autocomplete
+    spatial.index.warm()
+    autocomplete.index.warm()
+
+
+def install():
+    request_started.connect(_warm)
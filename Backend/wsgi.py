@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Backend.settings')
 
 application = get_wsgi_application()
+
+# Build the in-process indexes once this process serves its first request
+from Backend import warmup  # noqa: E402
+warmup.install()
@@ -17,6 +17,10 @@ class Profile(models.Model):
     
     # Personal Info
     profile_pic = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    # Renditions of profile_pic (written by common.images)
+    profile_pic_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_pic_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_pic_renditions = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField(blank=True)
     age = models.PositiveIntegerField(null=True, blank=True)
     gender = models.CharField(max_length=10, choices=GENDER_CHOICES, null=True, blank=True)
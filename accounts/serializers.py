@@ -1,15 +1,17 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from common import images
 from .models import Profile
 
 class ProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source="user.username", read_only=True)
     email = serializers.EmailField(source="user.email", read_only=True)
+    profile_pic_thumbnail = serializers.SerializerMethodField()
     
     class Meta:
         model = Profile
         fields = [
-            "id", "username", "email", "profile_pic", "bio", 
+            "id", "username", "email", "profile_pic", "profile_pic_thumbnail", "bio", 
             "age", "gender", "height", "weight", 
             "goal", "fitness_level", 
             "workouts_completed", "calories_burned", "current_streak", "achievements_count",
@@ -17,6 +19,11 @@ class ProfileSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'username', 'email', 'profile_pic', 'workouts_completed', 'calories_burned', 'current_streak', 'achievements_count', 'role']
 
+    def get_profile_pic_thumbnail(self, obj):
+        url = images.rendition_url(obj.profile_pic, obj.profile_pic_renditions, 'thumb')
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if url and request else url
+
 class RegisterSerializer(serializers.ModelSerializer):
     age = serializers.IntegerField(required=False)
     gender = serializers.CharField(required=False)
@@ -4,7 +4,9 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework import status, generics, parsers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.db import transaction
 from rest_framework_simplejwt.tokens import RefreshToken
+from common import images, uploads
 from .models import Profile
 from .serializers import RegisterSerializer, ProfileSerializer, UserSerializer, GymOwnerRegisterSerializer
 
@@ -99,7 +101,7 @@ class ProfileDetailView(generics.RetrieveUpdateAPIView):
         profile, created = Profile.objects.get_or_create(user=self.request.user)
         return profile
 
-class ProfilePictureUploadView(APIView):
+class ProfilePictureUploadView(uploads.StreamingUploadMixin, APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
 
@@ -108,6 +110,8 @@ class ProfilePictureUploadView(APIView):
         if 'profile_pic' not in request.data:
             return Response({"error": "No image provided"}, status=400)
         
-        profile.profile_pic = request.data['profile_pic']
-        profile.save()
+        with transaction.atomic():
+            profile.profile_pic = uploads.store(request.data['profile_pic'], Profile, 'profile_pic', profile)
+            profile.save()
+            images.schedule(profile, 'profile_pic')
         return Response(ProfileSerializer(profile, context={"request": request}).data, status=200)
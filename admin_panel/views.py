@@ -1,7 +1,9 @@
 from rest_framework import viewsets, permissions, status, views
 from rest_framework.response import Response
 from django.contrib.auth.models import User
-from explore.models import Gym
+from django.db import transaction
+from common import images, uploads
+from explore.models import Gym, GymImage
 from .models import AdminAction, LoginLog
 from .serializers import AdminUserSerializer, AdminGymSerializer, AdminActionSerializer, LoginLogSerializer
 from django.utils import timezone
@@ -62,14 +64,14 @@ class AdminUserViewSet(viewsets.ModelViewSet):
             details=f"Updated user {instance.username}"
         )
 
-class AdminGymViewSet(viewsets.ModelViewSet):
+class AdminGymViewSet(uploads.StreamingUploadMixin, viewsets.ModelViewSet):
     permission_classes = [IsAdminUser]
     queryset = Gym.objects.all().order_by('-created_at')
     serializer_class = AdminGymSerializer
 
     def create(self, request, *args, **kwargs):
         # Handle facilities being sent as a JSON string in multipart/form-data
-        data = request.data.copy()
+        data = uploads.mutable_data(request)
         if isinstance(data.get('facilities'), str):
             import json
             try:
@@ -83,25 +85,33 @@ class AdminGymViewSet(viewsets.ModelViewSet):
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def save_gallery(self, gym):
+        """Store uploaded gallery images (deduplicated) and insert their rows in one statement"""
+        with transaction.atomic():
+            gallery = GymImage.objects.bulk_create([
+                GymImage(gym=gym, image=uploads.store(img, GymImage, 'image'))
+                for img in self.request.FILES.getlist('gallery_images')
+            ])
+            for gym_image in gallery:
+                images.schedule(gym_image, 'image')
+        return gallery
+
     def perform_create(self, serializer):
         instance = serializer.save()
         
         # Handle gallery images
-        from explore.models import GymImage
-        images = self.request.FILES.getlist('gallery_images')
-        for img in images:
-            GymImage.objects.create(gym=instance, image=img)
+        gallery = self.save_gallery(instance)
 
         AdminAction.objects.create(
             admin=self.request.user,
             action_type='CREATE',
             target_model='GYM',
             target_id=str(instance.id),
-            details=f"Created gym {instance.name} with {len(images)} gallery images"
+            details=f"Created gym {instance.name} with {len(gallery)} gallery images"
         )
 
     def update(self, request, *args, **kwargs):
-        data = request.data.copy()
+        data = uploads.mutable_data(request)
         if isinstance(data.get('facilities'), str):
             import json
             try:
@@ -116,10 +126,7 @@ class AdminGymViewSet(viewsets.ModelViewSet):
         self.perform_update(serializer)
 
         # Handle new gallery images during update
-        from explore.models import GymImage
-        images = self.request.FILES.getlist('gallery_images')
-        for img in images:
-            GymImage.objects.create(gym=instance, image=img)
+        self.save_gallery(instance)
             
         return Response(serializer.data)
 
@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import MediaBlob
 
-# Register your models here.
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'sha256', 'name', 'size', 'refcount', 'created_at']
+    search_fields = ['sha256', 'name']
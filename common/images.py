@@ -0,0 +1,180 @@
+"""
+Image renditions
+Uploaded images are decoded once, off the request thread, into
+metadata-free WebP renditions stored next to the original
+
+A model opts in with three sibling fields per image field:
+    <field>_width / <field>_height   original (upright) dimensions
+    <field>_renditions               {name: {'name', 'width', 'height'}}
+plus 'source' (the original file name the renditions were built from)
+"""
+
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+logger = logging.getLogger(__name__)
+
+# Longest edge of every rendition, largest first
+RENDITIONS = getattr(settings, 'IMAGE_RENDITIONS', {'medium': 1080, 'thumb': 320})
+
+QUALITY = getattr(settings, 'IMAGE_RENDITION_QUALITY', 80)
+
+# Render in a background thread after commit; False renders inline (tests, scripts)
+ASYNC = getattr(settings, 'IMAGE_RENDITIONS_ASYNC', True)
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'IMAGE_RENDITION_WORKERS', 2),
+    thread_name_prefix='renditions'
+)
+
+# EXIF orientations that swap width and height
+ROTATED = {5, 6, 7, 8}
+
+
+# ============================================================
+# RENDERING
+# ============================================================
+
+def _rendition_name(source, name):
+    directory, filename = os.path.split(source)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'renditions', f'{stem}_{name}.webp')
+
+
+def render(field_file):
+    """
+    Write every rendition of field_file; returns (width, height, renditions)
+    JPEGs are decoded at the smallest scale still covering the largest
+    rendition; EXIF orientation is applied and all metadata dropped
+    """
+    largest = max(RENDITIONS.values())
+    with field_file.open('rb') as handle:
+        image = Image.open(handle)
+        width, height = image.size
+        if image.getexif().get(0x0112) in ROTATED:
+            width, height = height, width
+
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    renditions = {'source': field_file.name}
+    for name, size in sorted(RENDITIONS.items(), key=lambda item: -item[1]):
+        # Each rendition is scaled down from the previous (larger) one
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, 'WEBP', quality=QUALITY, method=4)
+        stored = default_storage.save(
+            _rendition_name(field_file.name, name), ContentFile(buffer.getvalue())
+        )
+        renditions[name] = {'name': stored, 'width': image.width, 'height': image.height}
+    return width, height, renditions
+
+
+def _stored_names(renditions):
+    return {value['name'] for key, value in (renditions or {}).items() if key != 'source'}
+
+
+def process(model, pk, field_name):
+    """Build renditions for one row; skipped if the image changed meanwhile"""
+    instance = model.objects.filter(pk=pk).first()
+    field_file = getattr(instance, field_name, None)
+    if not field_file:
+        return False
+
+    previous = getattr(instance, f'{field_name}_renditions')
+    try:
+        width, height, renditions = render(field_file)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.warning('Could not render %s #%s %s', model.__name__, pk, field_file.name)
+        return False
+
+    updated = model.objects.filter(pk=pk, **{field_name: field_file.name}).update(**{
+        f'{field_name}_width': width,
+        f'{field_name}_height': height,
+        f'{field_name}_renditions': renditions,
+    })
+    # Drop the replaced image's renditions, or ours if the image changed meanwhile
+    if updated:
+        stale = _stored_names(previous) - _stored_names(renditions)
+    else:
+        stale = _stored_names(renditions)
+    for name in stale:
+        default_storage.delete(name)
+    return bool(updated)
+
+
+def _run(model, pk, field_name):
+    try:
+        process(model, pk, field_name)
+    except Exception:
+        logger.exception('Rendition job failed for %s #%s', model.__name__, pk)
+    finally:
+        close_old_connections()
+
+
+def schedule(instance, field_name):
+    """Render instance.<field_name> once the surrounding transaction commits"""
+    if not getattr(instance, field_name):
+        return
+    model, pk = type(instance), instance.pk
+    if ASYNC:
+        transaction.on_commit(lambda: _executor.submit(_run, model, pk, field_name))
+    else:
+        transaction.on_commit(lambda: process(model, pk, field_name))
+
+
+# ============================================================
+# READING
+# ============================================================
+
+def rendition_url(field_file, renditions, name):
+    """URL of rendition `name` if it was built from the current file, else the original"""
+    if not field_file:
+        return None
+    if is_current(field_file, renditions) and name in renditions:
+        return default_storage.url(renditions[name]['name'])
+    return field_file.url
+
+
+def is_current(field_file, renditions):
+    return bool(field_file) and (renditions or {}).get('source') == field_file.name
+
+
+def backfill(queryset, field_name, chunk_size=500):
+    """
+    Render rows of queryset whose image has no up-to-date renditions,
+    inline and in primary-key order; yields (rows scanned, rows rendered)
+    """
+    model = queryset.model
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(
+                pk__gt=last_pk
+            ).exclude(
+                **{field_name: ''}
+            ).exclude(
+                **{f'{field_name}__isnull': True}
+            ).order_by('pk').only(
+                'pk', field_name, f'{field_name}_renditions'
+            )[:chunk_size]
+        )
+        if not rows:
+            return
+        rendered = sum(
+            process(model, row.pk, field_name)
+            for row in rows
+            if not is_current(getattr(row, field_name), getattr(row, f'{field_name}_renditions'))
+        )
+        last_pk = rows[-1].pk
+        yield len(rows), rendered
@@ -0,0 +1 @@
+# Common management commands
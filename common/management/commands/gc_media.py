@@ -0,0 +1,27 @@
+"""
+Management command to delete content-addressed media blobs that no
+database row references any more, and resync MediaBlob refcounts
+"""
+from django.core.management.base import BaseCommand
+from common import storage
+
+
+class Command(BaseCommand):
+    help = 'Garbage-collect unreferenced media blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=24,
+            help='Keep blobs written in the last N hours (uploads not yet committed)'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report without deleting')
+
+    def handle(self, *args, **options):
+        removed, freed = storage.collect_garbage(
+            grace_seconds=options['grace'] * 3600,
+            dry_run=options['dry_run']
+        )
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {removed} blobs ({freed / (1024 * 1024):.1f} MB)'
+        ))
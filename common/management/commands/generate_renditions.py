@@ -0,0 +1,42 @@
+"""
+Management command to build missing/outdated image renditions
+(images uploaded before the pipeline, or jobs lost with a restarted worker)
+"""
+from django.core.management.base import BaseCommand
+from accounts.models import Profile
+from common import images
+from explore.models import GymImage
+from social.models import Post
+
+
+# label -> (queryset, image field)
+TARGETS = {
+    'posts': (Post.objects.filter(is_active=True), 'image'),
+    'profiles': (Profile.objects.all(), 'profile_pic'),
+    'gym_images': (GymImage.objects.all(), 'image'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Render WebP thumbnail/medium renditions for images that lack them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only', choices=sorted(TARGETS),
+            help='Process a single kind of image'
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        labels = [options['only']] if options['only'] else list(TARGETS)
+        for label in labels:
+            queryset, field_name = TARGETS[label]
+            scanned = rendered = 0
+            for chunk_scanned, chunk_rendered in images.backfill(
+                queryset, field_name, chunk_size=options['chunk_size']
+            ):
+                scanned += chunk_scanned
+                rendered += chunk_rendered
+            self.stdout.write(f'  {label}: {rendered} rendered ({scanned} with images)')
+        
+        self.stdout.write(self.style.SUCCESS('Successfully generated renditions!'))
@@ -0,0 +1,26 @@
+"""
+Management command to measure duplicate content in a media directory
+(what content-addressed storage saves once files live under blobs/)
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from common import storage
+
+
+def _mb(size):
+    return f'{size / (1024 * 1024):.1f} MB'
+
+
+class Command(BaseCommand):
+    help = 'Report disk used by duplicate files under MEDIA_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=str(settings.MEDIA_ROOT))
+
+    def handle(self, *args, **options):
+        files, total, unique_files, unique_total = storage.duplicate_report(options['path'])
+        self.stdout.write(f'  files:  {files} ({_mb(total)})')
+        self.stdout.write(f'  unique: {unique_files} ({_mb(unique_total)})')
+        self.stdout.write(self.style.SUCCESS(
+            f'Deduplication saves {files - unique_files} files ({_mb(total - unique_total)})'
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0001_media_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediablob',
+            name='refcount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,3 +1,22 @@
 from django.db import models
 
-# Create your models here.
+
+class MediaBlob(models.Model):
+    """
+    One stored copy of an uploaded file, keyed by its SHA-256
+    Identical uploads (gym gallery, post images, profile pictures) reuse
+    the stored name instead of writing the bytes again
+    refcount counts stored references; gc_media recomputes it from the
+    file fields and deletes blobs left at zero
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, help_text="Path in default storage")
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'common_media_blob'
+
+    def __str__(self):
+        return f"{self.sha256[:12]} -> {self.name}"
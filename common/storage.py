@@ -0,0 +1,181 @@
+"""
+Content-addressed media storage
+Every file is stored once under blobs/<aa>/<bb>/<sha256><ext>, so
+identical uploads share one copy and a blob URL never changes content
+(served with immutable cache headers)
+
+Deleting through the storage never unlinks a blob (other rows may share
+it); the gc_media command removes blobs no database row references
+"""
+
+import hashlib
+import os
+import time
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models
+
+
+PREFIX = 'blobs'
+
+
+class _AlreadyStored(Exception):
+    pass
+
+
+def blob_name(digest, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    return f'{PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(f'{PREFIX}/')
+
+
+def touch(name):
+    """
+    Refresh a stored file's mtime so gc_media's grace period covers a new
+    reference to it; False if the file is gone
+    """
+    try:
+        os.utime(default_storage.path(name))
+    except (FileNotFoundError, NotImplementedError):
+        return False
+    return True
+
+
+def file_hash(content):
+    """SHA-256 of a File; reuses the hash computed while streaming the upload"""
+    digest = getattr(content, 'sha256', None)
+    if digest is None:
+        hasher = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        content.seek(0)
+        digest = hasher.hexdigest()
+    return digest
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage naming files by content hash; saving bytes that are
+    already stored writes nothing and returns the existing name
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content in _save; equal names mean equal bytes
+        if is_blob(name) and self.exists(name):
+            # A concurrent save of the same content created it first
+            raise _AlreadyStored
+        return name
+
+    def _save(self, name, content):
+        name = blob_name(file_hash(content), name)
+        if self.exists(name):
+            # Refresh the mtime so gc_media's grace period covers the new reference
+            os.utime(self.path(name))
+            return name
+        try:
+            return super()._save(name, content)
+        except _AlreadyStored:
+            return name
+
+    def delete(self, name):
+        if is_blob(name):
+            return
+        super().delete(name)
+
+
+# ============================================================
+# REFERENCES & GARBAGE COLLECTION
+# ============================================================
+
+def _reference_fields():
+    """(model, file fields, rendition JSON fields) for every installed model"""
+    for model in apps.get_models():
+        file_fields = [f.attname for f in model._meta.concrete_fields if isinstance(f, models.FileField)]
+        rendition_fields = [
+            f.attname for f in model._meta.concrete_fields
+            if isinstance(f, models.JSONField) and f.name.endswith('_renditions')
+        ]
+        if file_fields or rendition_fields:
+            yield model, file_fields, rendition_fields
+
+
+def count_references():
+    """Counter of storage name -> database rows referencing it"""
+    references = Counter()
+    for model, file_fields, rendition_fields in _reference_fields():
+        for row in model._base_manager.values_list(*file_fields, *rendition_fields).iterator():
+            for name in row[:len(file_fields)]:
+                if name:
+                    references[name] += 1
+            for renditions in row[len(file_fields):]:
+                for key, value in (renditions or {}).items():
+                    if key != 'source':
+                        references[value['name']] += 1
+    return references
+
+
+def collect_garbage(grace_seconds=86400, dry_run=False):
+    """
+    Sync MediaBlob.refcount with the database and delete blobs nothing
+    references; blobs newer than grace_seconds are kept (their rows may
+    not be committed yet). Returns (blobs removed, bytes freed)
+    """
+    from .models import MediaBlob
+
+    references = count_references()
+
+    drifted = []
+    for blob in MediaBlob.objects.only('id', 'name', 'refcount').iterator():
+        actual = references.get(blob.name, 0)
+        if blob.refcount != actual:
+            blob.refcount = actual
+            drifted.append(blob)
+    if not dry_run:
+        MediaBlob.objects.bulk_update(drifted, ['refcount'], batch_size=1000)
+
+    root = default_storage.path(PREFIX)
+    cutoff = time.time() - grace_seconds
+    removed = freed = 0
+    orphans = []
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, default_storage.location).replace(os.sep, '/')
+            if name in references or os.path.getmtime(path) > cutoff:
+                continue
+            removed += 1
+            freed += os.path.getsize(path)
+            orphans.append(name)
+            if not dry_run:
+                os.remove(path)
+
+    if orphans and not dry_run:
+        MediaBlob.objects.filter(name__in=orphans, refcount=0).delete()
+    return removed, freed
+
+
+def duplicate_report(root):
+    """
+    Hash every file under root; returns (files, bytes, unique files,
+    unique bytes) - the difference is what content addressing saves
+    """
+    sizes = defaultdict(int)
+    files = total = 0
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            hasher = hashlib.sha256()
+            with open(path, 'rb') as handle:
+                for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+                    hasher.update(chunk)
+            size = os.path.getsize(path)
+            sizes[hasher.hexdigest()] = size
+            files += 1
+            total += size
+    return files, total, len(sizes), sum(sizes.values())
@@ -0,0 +1,122 @@
+"""
+Streaming uploads
+Multipart files are streamed to temporary files on disk (never held in
+memory), size-capped while streaming and SHA-256 hashed on the way
+through; store() then writes each distinct content to storage only once
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import MediaBlob
+from .storage import file_hash, touch
+
+
+MAX_FILE_SIZE = getattr(settings, 'UPLOAD_MAX_FILE_SIZE', 10 * 1024 * 1024)
+MAX_REQUEST_SIZE = getattr(settings, 'UPLOAD_MAX_REQUEST_SIZE', 60 * 1024 * 1024)
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Upload too large.'
+    default_code = 'upload_too_large'
+
+
+# ============================================================
+# UPLOAD HANDLER
+# ============================================================
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """
+    Temporary-file handler that rejects oversized requests/files early and
+    leaves the hex SHA-256 of each file on `uploaded_file.sha256`
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > MAX_REQUEST_SIZE:
+            raise UploadTooLarge(f'Request exceeds {MAX_REQUEST_SIZE // (1024 * 1024)} MB.')
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > MAX_FILE_SIZE:
+            self.file.close()
+            raise UploadTooLarge(f'Files are limited to {MAX_FILE_SIZE // (1024 * 1024)} MB.')
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.hasher.hexdigest()
+        return uploaded
+
+
+class StreamingUploadMixin:
+    """APIView mixin installing HashingUploadHandler before the body is parsed"""
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [HashingUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+
+def mutable_data(request):
+    """
+    Editable copy of request.data; uploaded files are shared rather than
+    deep-copied (temporary files cannot be)
+    """
+    if not request.FILES:
+        return request.data.copy()
+    data = request.POST.copy()
+    for key, files in request.FILES.lists():
+        data.setlist(key, files)
+    return data
+
+
+# ============================================================
+# DEDUPLICATED STORAGE
+# ============================================================
+
+def store(uploaded, model, field_name, instance=None):
+    """
+    Storage name for `uploaded` as model.<field_name>; identical content
+    already stored (by any model) is reused instead of written again
+    Assign the result to the field: `obj.image = store(...)`, inside the
+    transaction that saves the row, so the blob's refcount bump commits or
+    rolls back with the reference (gc_media recomputes counts exactly)
+    """
+    if uploaded.size > MAX_FILE_SIZE:
+        raise UploadTooLarge(f'Files are limited to {MAX_FILE_SIZE // (1024 * 1024)} MB.')
+
+    digest = file_hash(uploaded)
+    blob = MediaBlob.objects.filter(sha256=digest).first()
+    # Touching first keeps gc_media (which skips recent files) off the reused blob
+    if blob is not None and touch(blob.name):
+        MediaBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + 1)
+        return blob.name
+
+    field = model._meta.get_field(field_name)
+    name = default_storage.save(field.generate_filename(instance, uploaded.name), uploaded)
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.update_or_create(
+                sha256=digest,
+                defaults={'name': name, 'size': uploaded.size, 'refcount': 1}
+            )
+    except IntegrityError:
+        # A concurrent upload of the same bytes won; use its copy
+        default_storage.delete(name)
+        blob = MediaBlob.objects.get(sha256=digest)
+        MediaBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + 1)
+        name = blob.name
+    return name
@@ -1,5 +1,11 @@
+import os
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.views.static import serve
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from . import storage
 from .utils import send_contact_email
 
 
@@ -11,3 +17,19 @@ class ContactView(APIView):
             request.data["email"]
         )
         return Response({"message": "Mail sent"})
+
+
+def serve_blob(request, path):
+    """
+    Serve a content-addressed media blob; its name is its hash, so the
+    response never changes and may be cached forever
+    """
+    digest = os.path.splitext(os.path.basename(path))[0]
+    etag = f'"{digest}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = serve(request, f'{storage.PREFIX}/{path}', document_root=settings.MEDIA_ROOT)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
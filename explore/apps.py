@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ExploreConfig(AppConfig):
     name = 'explore'
+
+    def ready(self):
+        """Import signals when app is ready"""
+        import explore.signals  # noqa
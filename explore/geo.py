@@ -0,0 +1,87 @@
+"""
+Gym proximity search without PostGIS
+A bounding box around the point narrows rows on the (latitude,
+longitude) index, then the exact haversine distance is computed and
+ranked in SQL for the survivors only
+"""
+
+import math
+
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 200
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    Q covering every point within radius_km of (lat, lng)
+    Longitude is unbounded near the poles and split across the antimeridian
+    """
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    box = Q(latitude__gte=max(min_lat, -90), latitude__lte=min(max_lat, 90))
+    if min_lat <= -90 or max_lat >= 90:
+        return box
+
+    delta_lng = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(lat))))
+    if delta_lng >= 180:
+        return box
+    min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    if min_lng < -180:
+        return box & (Q(longitude__gte=min_lng + 360) | Q(longitude__lte=max_lng))
+    if max_lng > 180:
+        return box & (Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng - 360))
+    return box & Q(longitude__gte=min_lng, longitude__lte=max_lng)
+
+
+def haversine_km(lat, lng):
+    """Expression: great-circle distance in km from (lat, lng) to each row"""
+    lat, lng = math.radians(lat), math.radians(lng)
+    half_dlat = (Radians(F('latitude')) - Value(lat)) / 2
+    half_dlng = (Radians(F('longitude')) - Value(lng)) / 2
+    a = Power(Sin(half_dlat), 2) + Value(math.cos(lat)) * Cos(Radians(F('latitude'))) * Power(Sin(half_dlng), 2)
+    return ExpressionWrapper(
+        Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a)),
+        output_field=FloatField()
+    )
+
+
+def nearby(queryset, lat, lng, radius_km=DEFAULT_RADIUS_KM):
+    """
+    queryset restricted to rows within radius_km of (lat, lng), annotated
+    with `distance` (km) and ordered nearest first
+    """
+    return queryset.filter(
+        bounding_box(lat, lng, radius_km)
+    ).annotate(
+        distance=haversine_km(lat, lng)
+    ).filter(
+        distance__lte=radius_km
+    ).order_by('distance', 'id')
+
+
+def parse_point(params):
+    """(lat, lng) from ?lat=&lng=, or None when missing or out of range"""
+    try:
+        lat, lng = float(params['lat']), float(params['lng'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def parse_bounded(params, name, default, maximum):
+    try:
+        value = float(params.get(name, default))
+    except ValueError:
+        return default
+    return default if not value > 0 else min(value, maximum)
@@ -0,0 +1,72 @@
+"""
+Management command to time proximity search (explore.geo) over synthetic
+gyms; the gyms are created inside a transaction that is rolled back
+"""
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from explore import geo
+from explore.models import Gym
+
+
+# Synthetic gyms are spread uniformly over India
+LAT_RANGE = (8.0, 35.0)
+LNG_RANGE = (68.0, 97.0)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark nearest-gym queries over synthetic gyms (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gyms', type=int, default=100000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--radius', type=float, default=geo.DEFAULT_RADIUS_KM)
+        parser.add_argument('--limit', type=int, default=geo.DEFAULT_LIMIT)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            self._create(rng, options['gyms'])
+            timings, found = self._run(rng, options)
+            transaction.set_rollback(True)
+
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f"  {options['queries']} queries, radius {options['radius']} km, "
+            f"limit {options['limit']}, {statistics.mean(found):.1f} gyms/result"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'p50 {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms, max {timings[-1]:.2f} ms'
+        ))
+
+    def _create(self, rng, count):
+        def coordinate(bounds):
+            return Decimal(f'{rng.uniform(*bounds):.6f}')
+
+        for start in range(0, count, 5000):
+            Gym.objects.bulk_create([
+                Gym(
+                    name=f'Synthetic Gym {i}', address='-', city='-',
+                    latitude=coordinate(LAT_RANGE), longitude=coordinate(LNG_RANGE),
+                    price_range_min=500, price_range_max=2000,
+                )
+                for i in range(start, min(start + 5000, count))
+            ])
+        self.stdout.write(f'  created {count} synthetic gyms')
+
+    def _run(self, rng, options):
+        queryset = Gym.objects.filter(is_active=True)
+        timings, found = [], []
+        for _ in range(options['queries']):
+            lat, lng = rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)
+            started = time.perf_counter()
+            gyms = list(geo.nearby(queryset, lat, lng, options['radius'])[:options['limit']])
+            timings.append((time.perf_counter() - started) * 1000)
+            found.append(len(gyms))
+        return timings, found
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('explore', '0007_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gym',
+            index=models.Index(fields=['latitude', 'longitude'], name='explore_gym_geo_idx'),
+        ),
+    ]
@@ -23,12 +23,22 @@ class Gym(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Bounding-box prefilter of proximity search (explore.geo)
+            models.Index(fields=['latitude', 'longitude'], name='explore_gym_geo_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
 class GymImage(models.Model):
     gym = models.ForeignKey(Gym, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='gym_gallery/')
+    # Renditions of image (written by common.images)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
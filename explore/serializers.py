@@ -1,10 +1,25 @@
 from rest_framework import serializers
+from common import images
 from .models import Gym, GymReview, GymImage
 
 class GymImageSerializer(serializers.ModelSerializer):
+    thumbnail = serializers.SerializerMethodField()
+    medium = serializers.SerializerMethodField()
+
     class Meta:
         model = GymImage
-        fields = ['id', 'image', 'created_at']
+        fields = ['id', 'image', 'thumbnail', 'medium', 'image_width', 'image_height', 'created_at']
+
+    def _url(self, obj, name):
+        url = images.rendition_url(obj.image, obj.image_renditions, name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if url and request else url
+
+    def get_thumbnail(self, obj):
+        return self._url(obj, 'thumb')
+
+    def get_medium(self, obj):
+        return self._url(obj, 'medium')
 
 class GymReviewSerializer(serializers.ModelSerializer):
     class Meta:
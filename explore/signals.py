@@ -0,0 +1,16 @@
+"""
+FitMitra Explore Signals
+Keep the in-process gym spatial index current
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Gym
+from . import spatial
+
+
+@receiver([post_save, post_delete], sender=Gym)
+def reindex_gym(sender, instance, **kwargs):
+    gym_id = instance.pk
+    transaction.on_commit(lambda: spatial.gym_changed(gym_id))
@@ -0,0 +1,417 @@
+"""
+In-process spatial index of active gyms for map views
+Gyms are bucketed into a uniform lat/lng grid; viewport queries read the
+covered cells and k-nearest queries expand rings of cells around the
+point until no closer gym can remain
+
+Kept current by Gym save/delete signals. Writes from other processes
+bump a generation in the default cache; a process whose index is behind
+(or not built yet) answers from the database while it rebuilds in the
+background
+"""
+
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.db.models import Q
+
+from . import geo
+from .models import Gym
+
+
+logger = logging.getLogger(__name__)
+
+ENABLED = getattr(settings, 'EXPLORE_SPATIAL_INDEX', True)
+
+# Grid cell edge in degrees (0.1 deg ~ 11 km of latitude)
+CELL_DEGREES = getattr(settings, 'EXPLORE_SPATIAL_CELL_DEGREES', 0.1)
+
+# Rebuild from the database after this many seconds regardless of signals
+REBUILD_SECONDS = getattr(settings, 'EXPLORE_SPATIAL_INDEX_TTL', 3600)
+
+DEFAULT_VIEWPORT_LIMIT = 500
+MAX_VIEWPORT_LIMIT = 2000
+
+DEFAULT_K = 10
+MAX_K = 100
+
+# Ring search is not bounded near the poles (cells shrink to nothing); use SQL there
+MAX_INDEXED_LATITUDE = 85
+
+KM_PER_DEGREE = math.pi * geo.EARTH_RADIUS_KM / 180
+
+GENERATION_KEY = 'explore:gyms:gen'
+
+MARKER_FIELDS = (
+    'id', 'name', 'city', 'latitude', 'longitude', 'rating',
+    'price_range_min', 'price_range_max', 'facilities', 'thumbnail',
+)
+
+
+# ============================================================
+# FILTERS & MARKERS
+# ============================================================
+
+class Filters:
+    """Facility (all of, case-insensitive) and price-overlap constraints"""
+
+    def __init__(self, facilities=(), min_price=None, max_price=None):
+        self.facilities = frozenset(name.strip().lower() for name in facilities if name.strip())
+        self.min_price = min_price
+        self.max_price = max_price
+
+    @classmethod
+    def from_params(cls, params):
+        def price(name):
+            try:
+                return float(params[name])
+            except (KeyError, TypeError, ValueError):
+                return None
+
+        facilities = params.get('facilities', '')
+        return cls(facilities.split(','), price('min_price'), price('max_price'))
+
+    def matches(self, marker, facilities):
+        if self.min_price is not None and marker['price_range_max'] < self.min_price:
+            return False
+        if self.max_price is not None and marker['price_range_min'] > self.max_price:
+            return False
+        return self.facilities <= facilities
+
+
+def _marker(row):
+    """Compact map marker from a values() row"""
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'city': row['city'],
+        'latitude': float(row['latitude']),
+        'longitude': float(row['longitude']),
+        'rating': float(row['rating']),
+        'price_range_min': float(row['price_range_min']),
+        'price_range_max': float(row['price_range_max']),
+        'facilities': row['facilities'] or [],
+        'thumbnail': default_storage.url(row['thumbnail']) if row['thumbnail'] else None,
+    }
+
+
+def _facility_set(marker):
+    return frozenset(str(name).lower() for name in marker['facilities'])
+
+
+def _rank(marker):
+    return (marker['rating'], -marker['id'])
+
+
+def _distance_km(lat, lng, marker):
+    lat1, lat2 = math.radians(lat), math.radians(marker['latitude'])
+    half_dlat = (lat2 - lat1) / 2
+    half_dlng = math.radians(marker['longitude'] - lng) / 2
+    a = math.sin(half_dlat) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(half_dlng) ** 2
+    return 2 * geo.EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _lng_ranges(west, east):
+    """Viewport longitudes as one or two (west, east) ranges across the antimeridian"""
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+# ============================================================
+# INDEX
+# ============================================================
+
+COLUMNS = int(math.ceil(360 / CELL_DEGREES))
+ROWS = int(math.ceil(180 / CELL_DEGREES))
+
+
+def _cell(lat, lng):
+    """(column, row) of the grid cell holding a point; +180/+90 fall in the last cell"""
+    return (
+        min(int(math.floor((lng + 180) / CELL_DEGREES)), COLUMNS - 1),
+        min(int(math.floor((lat + 90) / CELL_DEGREES)), ROWS - 1),
+    )
+
+
+class GymIndex:
+    """Grid of gym ids plus their markers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._cells = {}
+        self._gyms = {}
+        self._generation = None
+        self._built_at = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_locks)
+
+    def _reset_locks(self):
+        # A forked child inherits locks held by parent threads that it does not have
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------
+
+    def rebuild(self):
+        # Read the generation first: a write during the load makes us stale again
+        generation = current_generation()
+        cells, gyms = {}, {}
+        rows = Gym.objects.filter(is_active=True).values(*MARKER_FIELDS)
+        for row in rows.iterator(chunk_size=5000):
+            marker = _marker(row)
+            gyms[marker['id']] = (marker, _facility_set(marker))
+            cells.setdefault(_cell(marker['latitude'], marker['longitude']), set()).add(marker['id'])
+
+        with self._lock:
+            self._cells, self._gyms = cells, gyms
+            self._generation = generation
+            self._built_at = time.monotonic()
+
+    def warm(self):
+        """Start a background build (first request of a process); no-op when disabled"""
+        if ENABLED and self._build_lock.acquire(blocking=False):
+            threading.Thread(target=self._background_rebuild, daemon=True).start()
+
+    def _background_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception:
+            # Queries keep falling through to the database; the next one retries
+            logger.exception('Gym spatial index build failed')
+        finally:
+            connections.close_all()
+            self._build_lock.release()
+
+    def is_fresh(self):
+        """
+        True when queries may be served from memory; a missing or stale
+        index starts a rebuild (an expired one keeps serving meanwhile)
+        """
+        if not ENABLED:
+            return False
+        built_at = self._built_at
+        if built_at is None or not self.is_at(current_generation()):
+            self.warm()
+            return False
+        if time.monotonic() - built_at > REBUILD_SECONDS:
+            self.warm()
+        return True
+
+    def is_at(self, generation):
+        return self._built_at is not None and self._generation == generation
+
+    # ------------------------------------------------------------
+    # Incremental updates (signals, after commit)
+    # ------------------------------------------------------------
+
+    def _discard(self, gym_id):
+        entry = self._gyms.pop(gym_id, None)
+        if entry is None:
+            return
+        key = _cell(entry[0]['latitude'], entry[0]['longitude'])
+        members = self._cells.get(key)
+        if members is not None:
+            members.discard(gym_id)
+            if not members:
+                del self._cells[key]
+
+    def apply(self, gym_id, row, previous, generation):
+        """
+        Replace gym_id with row (None removes it) if this index was at
+        generation `previous`; otherwise it missed another write and stays
+        behind `generation` until rebuilt
+        """
+        with self._lock:
+            if self._generation != previous:
+                return
+            self._discard(gym_id)
+            if row is not None:
+                marker = _marker(row)
+                self._gyms[gym_id] = (marker, _facility_set(marker))
+                self._cells.setdefault(
+                    _cell(marker['latitude'], marker['longitude']), set()
+                ).add(gym_id)
+            self._generation = generation
+
+    # ------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------
+
+    def viewport(self, south, west, north, east, filters, limit):
+        """Highest rated matching gyms inside the box (west > east crosses 180)"""
+        (_, min_row), (_, max_row) = _cell(south, 0), _cell(north, 0)
+        with self._lock:
+            found = []
+            for lo, hi in _lng_ranges(west, east):
+                (min_col, _), (max_col, _) = _cell(0, lo), _cell(0, hi)
+                if (max_col - min_col + 1) * (max_row - min_row + 1) > len(self._cells):
+                    # Zoomed out: cheaper to test every occupied cell
+                    keys = [
+                        key for key in self._cells
+                        if min_col <= key[0] <= max_col and min_row <= key[1] <= max_row
+                    ]
+                else:
+                    keys = [
+                        (col, row)
+                        for col in range(min_col, max_col + 1)
+                        for row in range(min_row, max_row + 1)
+                        if (col, row) in self._cells
+                    ]
+                for key in keys:
+                    for gym_id in self._cells[key]:
+                        marker, facilities = self._gyms[gym_id]
+                        if (
+                            south <= marker['latitude'] <= north
+                            and lo <= marker['longitude'] <= hi
+                            and filters.matches(marker, facilities)
+                        ):
+                            found.append(marker)
+        return heapq.nlargest(limit, found, key=_rank)
+
+    def nearest(self, lat, lng, k, filters, radius_km):
+        """Up to k matching gyms within radius_km, nearest first, with `distance` (km)"""
+        center_col, center_row = _cell(lat, lng)
+        best = []   # max-heap of (-distance, -id, marker) holding the k nearest
+        visited = set()
+        ring = 0
+        with self._lock:
+            while True:
+                for col, row in _ring(center_col, center_row, ring):
+                    key = (col % COLUMNS, row)
+                    if not 0 <= row < ROWS or key in visited:
+                        continue
+                    visited.add(key)
+                    for gym_id in self._cells.get(key, ()):
+                        marker, facilities = self._gyms[gym_id]
+                        if not filters.matches(marker, facilities):
+                            continue
+                        distance = _distance_km(lat, lng, marker)
+                        if distance > radius_km:
+                            continue
+                        item = (-distance, -gym_id, marker)
+                        if len(best) < k:
+                            heapq.heappush(best, item)
+                        elif item > best[0]:
+                            heapq.heapreplace(best, item)
+
+                # Every gym outside the searched rings is at least this far away
+                bound = ring * CELL_DEGREES * KM_PER_DEGREE * math.cos(
+                    math.radians(min(89.9, abs(lat) + (ring + 1) * CELL_DEGREES))
+                )
+                limit = radius_km if len(best) < k else min(radius_km, -best[0][0])
+                if bound > limit or ring > max(COLUMNS, ROWS):
+                    break
+                ring += 1
+
+        return [
+            {**marker, 'distance': -negative}
+            for negative, _, marker in sorted(best, reverse=True)
+        ]
+
+
+def _ring(center_col, center_row, ring):
+    """Cells at Chebyshev distance `ring` from the center cell"""
+    if ring == 0:
+        yield center_col, center_row
+        return
+    for col in range(center_col - ring, center_col + ring + 1):
+        yield col, center_row - ring
+        yield col, center_row + ring
+    for row in range(center_row - ring + 1, center_row + ring):
+        yield center_col - ring, row
+        yield center_col + ring, row
+
+
+index = GymIndex()
+
+
+# ============================================================
+# GENERATIONS
+# ============================================================
+
+def current_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so an evicted counter never reuses an old generation
+        cache.add(GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def gym_changed(gym_id):
+    """
+    A gym was saved or deleted (called after commit): bump the shared
+    generation and patch this process's index in place
+    """
+    try:
+        generation = cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), None)
+        return
+    if not index.is_at(generation - 1):
+        # Not built, or already behind another process's write
+        return
+    row = Gym.objects.filter(pk=gym_id, is_active=True).values(*MARKER_FIELDS).first()
+    index.apply(gym_id, row, generation - 1, generation)
+
+
+# ============================================================
+# QUERIES (index, else database)
+# ============================================================
+
+def _first_matching(queryset, filters, limit, *extra):
+    """Markers of the first `limit` queryset rows passing filters"""
+    if filters.min_price is not None:
+        queryset = queryset.filter(price_range_max__gte=filters.min_price)
+    if filters.max_price is not None:
+        queryset = queryset.filter(price_range_min__lte=filters.max_price)
+    if not filters.facilities:
+        queryset = queryset[:limit]
+
+    markers = []
+    # Facilities are matched in Python: JSON containment is not portable
+    for row in queryset.values(*MARKER_FIELDS, *extra).iterator(chunk_size=1000):
+        marker = _marker(row)
+        if filters.matches(marker, _facility_set(marker)):
+            markers.append({**marker, **{field: row[field] for field in extra}})
+            if len(markers) == limit:
+                break
+    return markers
+
+
+def viewport(south, west, north, east, filters, limit=DEFAULT_VIEWPORT_LIMIT):
+    """Highest rated active gyms inside the map viewport"""
+    if index.is_fresh():
+        return index.viewport(south, west, north, east, filters, limit)
+
+    longitudes = Q()
+    for lo, hi in _lng_ranges(west, east):
+        longitudes |= Q(longitude__gte=lo, longitude__lte=hi)
+    queryset = Gym.objects.filter(
+        longitudes,
+        is_active=True,
+        latitude__gte=south,
+        latitude__lte=north
+    ).order_by('-rating', 'id')
+    return _first_matching(queryset, filters, limit)
+
+
+def nearest(lat, lng, filters, k=DEFAULT_K, radius_km=geo.MAX_RADIUS_KM):
+    """k nearest active gyms within radius_km, with `distance` (km)"""
+    if abs(lat) <= MAX_INDEXED_LATITUDE and index.is_fresh():
+        return index.nearest(lat, lng, k, filters, radius_km)
+
+    queryset = geo.nearby(Gym.objects.filter(is_active=True), lat, lng, radius_km)
+    return _first_matching(queryset, filters, k, 'distance')
@@ -1,3 +1,14 @@
 from django.test import TestCase
 
-# Create your tests here.
+from . import spatial
+
+
+class SpatialIndexTests(TestCase):
+    """The gym index keeps building in a child forked mid-build"""
+
+    def test_warm_after_fork_with_build_in_flight(self):
+        index = spatial.GymIndex()
+        index._build_lock.acquire()
+        index._reset_locks()
+        self.assertTrue(index._build_lock.acquire(blocking=False))
+        index._build_lock.release()
@@ -2,6 +2,7 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Value, FloatField
+from . import geo, spatial
 from .models import Gym
 from .serializers import GymSerializer
 
@@ -18,27 +19,79 @@ class GymViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         queryset = super().get_queryset()
         
-        lat = self.request.query_params.get('lat')
-        lng = self.request.query_params.get('lng')
         city = self.request.query_params.get('city')
 
         if city:
             queryset = queryset.filter(city__icontains=city)
 
-        # In a real-world scenario with PostGIS:
-        # from django.contrib.gis.db.models.functions import Distance
-        # from django.contrib.gis.geos import Point
-        # if lat and lng:
-        #     user_location = Point(float(lng), float(lat), srid=4326)
-        #     queryset = queryset.annotate(distance=Distance('location', user_location)).order_by('distance')
-
-        # For this implementation, we annotate a default distance.
-        # Sorting by distance can be handled in frontend for smaller datasets
-        # or via custom SQL expressions if PostGIS isn't available.
-        queryset = queryset.annotate(distance=Value(0.0, output_field=FloatField()))
-        
+        # ?lat=&lng=[&radius=km] - gyms within radius, nearest first
+        point = geo.parse_point(self.request.query_params)
+        if point is None:
+            return queryset.annotate(distance=Value(0.0, output_field=FloatField()))
+        if self.action != 'list':
+            return queryset.annotate(distance=geo.haversine_km(*point))
+
+        radius = geo.parse_bounded(
+            self.request.query_params, 'radius', geo.DEFAULT_RADIUS_KM, geo.MAX_RADIUS_KM
+        )
+        return geo.nearby(queryset, *point, radius_km=radius)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Proximity lists are capped (?limit=) after search/ordering
+        if self.action == 'list' and geo.parse_point(self.request.query_params):
+            limit = geo.parse_bounded(
+                self.request.query_params, 'limit', geo.DEFAULT_LIMIT, geo.MAX_LIMIT
+            )
+            queryset = queryset[:int(limit)]
         return queryset
 
+    @action(detail=False, methods=['get'])
+    def map(self, request):
+        """
+        Map markers inside ?south=&west=&north=&east= (west > east crosses
+        the antimeridian), highest rated first; optional ?facilities=a,b,
+        ?min_price=, ?max_price=, ?limit=
+        """
+        try:
+            south, west, north, east = (
+                float(request.query_params[name]) for name in ('south', 'west', 'north', 'east')
+            )
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'south, west, north and east are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+            return Response({'error': 'Invalid viewport'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = geo.parse_bounded(
+            request.query_params, 'limit', spatial.DEFAULT_VIEWPORT_LIMIT, spatial.MAX_VIEWPORT_LIMIT
+        )
+        markers = spatial.viewport(
+            south, west, north, east, spatial.Filters.from_params(request.query_params), int(limit)
+        )
+        return Response({'results': markers})
+
+    @action(detail=False, methods=['get'])
+    def nearest(self, request):
+        """
+        The ?k= nearest gyms to ?lat=&lng= within ?radius= km, with the same
+        filters as map
+        """
+        point = geo.parse_point(request.query_params)
+        if point is None:
+            return Response({'error': 'lat and lng are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        k = geo.parse_bounded(request.query_params, 'k', spatial.DEFAULT_K, spatial.MAX_K)
+        radius = geo.parse_bounded(
+            request.query_params, 'radius', geo.MAX_RADIUS_KM, geo.MAX_RADIUS_KM
+        )
+        markers = spatial.nearest(
+            *point, spatial.Filters.from_params(request.query_params), k=int(k), radius_km=radius
+        )
+        return Response({'results': markers})
+
     @action(detail=False, methods=['post'], permission_classes=[])
     def seed_data(self, request):
         """Seed initial gym data for testing."""
@@ -6,7 +6,9 @@ Django admin configuration for social models
 from django.contrib import admin
 from .models import (
     UserProfile, Post, Like, Comment, Follow,
-    Message, Notification, Report, Block
+    Message, Notification, Report, Block, TimelineEntry,
+    CounterShard, Conversation, NotificationEvent, TrendingPost,
+    Hashtag, PostHashtag, CommentHashtag, Mention, HashtagTrend
 )
 
 
@@ -72,7 +74,7 @@ class MessageAdmin(admin.ModelAdmin):
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ['id', 'recipient', 'actor', 'notification_type', 'is_read', 'created_at']
+    list_display = ['id', 'recipient', 'actor', 'notification_type', 'actor_count', 'is_read', 'created_at']
     search_fields = ['recipient__username', 'actor__username']
     list_filter = ['notification_type', 'is_read', 'created_at']
     readonly_fields = ['created_at']
@@ -92,3 +94,72 @@ class BlockAdmin(admin.ModelAdmin):
     search_fields = ['blocker__username', 'blocked__username']
     list_filter = ['created_at']
     readonly_fields = ['created_at']
+
+
+@admin.register(TimelineEntry)
+class TimelineEntryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'post', 'author', 'created_at']
+    search_fields = ['user__username', 'author__username']
+    raw_id_fields = ['user', 'post', 'author']
+
+
+@admin.register(CounterShard)
+class CounterShardAdmin(admin.ModelAdmin):
+    list_display = ['id', 'target', 'object_id', 'shard', 'delta']
+    list_filter = ['target']
+
+
+@admin.register(Conversation)
+class ConversationAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'partner', 'unread_count', 'last_activity_at']
+    search_fields = ['user__username', 'partner__username']
+    raw_id_fields = ['user', 'partner', 'last_message']
+
+
+@admin.register(NotificationEvent)
+class NotificationEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'recipient', 'actor', 'notification_type', 'created_at']
+    list_filter = ['notification_type']
+    raw_id_fields = ['recipient', 'actor', 'post', 'comment']
+
+
+@admin.register(TrendingPost)
+class TrendingPostAdmin(admin.ModelAdmin):
+    list_display = ['post', 'author', 'score', 'likes_count', 'comments_count', 'shares_count']
+    raw_id_fields = ['post', 'author']
+    ordering = ['-score']
+
+
+@admin.register(Hashtag)
+class HashtagAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'posts_count', 'created_at']
+    search_fields = ['name']
+    readonly_fields = ['created_at']
+
+
+@admin.register(PostHashtag)
+class PostHashtagAdmin(admin.ModelAdmin):
+    list_display = ['id', 'post', 'hashtag', 'created_at']
+    search_fields = ['hashtag__name']
+    raw_id_fields = ['post', 'hashtag']
+
+
+@admin.register(CommentHashtag)
+class CommentHashtagAdmin(admin.ModelAdmin):
+    list_display = ['id', 'comment', 'hashtag', 'created_at']
+    search_fields = ['hashtag__name']
+    raw_id_fields = ['comment', 'hashtag']
+
+
+@admin.register(Mention)
+class MentionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'author', 'post', 'comment', 'created_at']
+    search_fields = ['user__username', 'author__username']
+    raw_id_fields = ['user', 'author', 'post', 'comment']
+
+
+@admin.register(HashtagTrend)
+class HashtagTrendAdmin(admin.ModelAdmin):
+    list_display = ['id', 'hashtag', 'bucket', 'count']
+    raw_id_fields = ['hashtag']
+    ordering = ['-bucket', '-count']
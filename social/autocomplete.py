@@ -0,0 +1,186 @@
+"""
+FitMitra Social Autocomplete
+In-process sorted username index for @mention and follow-search typeahead
+
+Usernames are kept in a sorted array of (lowercase username, profile id)
+keys, so case variants ("Ravi", "ravi") are separate entries; a prefix is
+the bisect range [prefix, prefix + U+FFFF). Matches are ranked by
+followers_count.
+Short, crowded prefixes ("a", "jo") keep a cached top list so every
+lookup stays sub-millisecond
+"""
+
+import heapq
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from .models import UserProfile
+
+
+# Rebuild from the database after this many seconds so followers_count
+# changes (applied with UPDATE, no signals) are picked up
+REBUILD_SECONDS = getattr(settings, 'SOCIAL_AUTOCOMPLETE_TTL', 600)
+
+# Prefix ranges larger than this use the cached top list instead of a scan
+SCAN_LIMIT = 2000
+
+# Entries kept per cached prefix
+TOP_CACHE_SIZE = 50
+
+MAX_LIMIT = 20
+
+
+def _entry(user_id, username, followers_count, picture):
+    return {
+        'id': user_id,
+        'username': username,
+        'profile_picture': default_storage.url(picture) if picture else None,
+        'followers_count': followers_count,
+    }
+
+
+def _rank(entry):
+    # nlargest keeps input order on ties, so equal counts stay alphabetical
+    return entry['followers_count']
+
+
+class UsernameIndex:
+    """Sorted (lowercase username, profile id) keys plus display entries by profile id"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._keys = []
+        self._entries = {}
+        self._profile_keys = {}
+        self._top = {}
+        self._built_at = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_locks)
+
+    def _reset_locks(self):
+        # A forked child inherits locks held by parent threads that it does not have
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------
+
+    def rebuild(self):
+        entries = {}
+        profile_keys = {}
+        rows = UserProfile.objects.values_list(
+            'id', 'user_id', 'username', 'followers_count', 'profile_picture'
+        )
+        for profile_id, user_id, username, followers_count, picture in rows.iterator(chunk_size=5000):
+            entries[profile_id] = _entry(user_id, username, followers_count, picture)
+            profile_keys[profile_id] = (username.lower(), profile_id)
+
+        keys = sorted(profile_keys.values())
+        with self._lock:
+            self._keys, self._entries, self._profile_keys = keys, entries, profile_keys
+            self._top = {}
+            self._built_at = time.monotonic()
+
+    def warm(self):
+        """Start a background build (first request of a process) so no lookup waits for it"""
+        if self._build_lock.acquire(blocking=False):
+            threading.Thread(target=self._background_rebuild, daemon=True).start()
+
+    def _ensure_fresh(self):
+        built_at = self._built_at
+        if built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    self.rebuild()
+        elif time.monotonic() - built_at > REBUILD_SECONDS:
+            # Keep serving the old index while one thread rebuilds it
+            if self._build_lock.acquire(blocking=False):
+                threading.Thread(target=self._background_rebuild, daemon=True).start()
+
+    def _background_rebuild(self):
+        try:
+            self.rebuild()
+        finally:
+            self._build_lock.release()
+
+    # ------------------------------------------------------------
+    # Incremental updates (signals)
+    # ------------------------------------------------------------
+
+    def _forget_prefixes(self, name):
+        for length in range(1, len(name) + 1):
+            self._top.pop(name[:length], None)
+
+    def _discard(self, profile_id):
+        key = self._profile_keys.pop(profile_id, None)
+        if key is None:
+            return
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+        self._entries.pop(profile_id, None)
+        self._forget_prefixes(key[0])
+
+    def update(self, profile):
+        """Insert or move a profile; no-op until the index has been built"""
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._discard(profile.pk)
+            key = (profile.username.lower(), profile.pk)
+            insort(self._keys, key)
+            self._entries[profile.pk] = _entry(
+                profile.user_id, profile.username, profile.followers_count,
+                profile.profile_picture.name if profile.profile_picture else None
+            )
+            self._profile_keys[profile.pk] = key
+            self._forget_prefixes(key[0])
+
+    def remove(self, profile_id):
+        with self._lock:
+            if self._built_at is not None:
+                self._discard(profile_id)
+
+    # ------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------
+
+    def complete(self, prefix, limit=8, exclude_ids=()):
+        """Top `limit` entries whose username starts with prefix, most followed first"""
+        prefix = prefix.strip().lstrip('@').lower()
+        if not prefix:
+            return []
+        limit = max(1, min(limit, MAX_LIMIT))
+        self._ensure_fresh()
+
+        with self._lock:
+            lo = bisect_left(self._keys, (prefix,))
+            hi = bisect_left(self._keys, (prefix + '\uffff',), lo)
+            entries = (self._entries[key[1]] for key in self._keys[lo:hi])
+
+            if hi - lo > SCAN_LIMIT:
+                top = self._top.get(prefix)
+                if top is None:
+                    top = heapq.nlargest(TOP_CACHE_SIZE, entries, key=_rank)
+                    self._top[prefix] = top
+                matches = [entry for entry in top if entry['id'] not in exclude_ids][:limit]
+                if len(matches) == limit:
+                    return matches
+                # Hidden users crowded the cached list; rank the whole range
+                entries = (self._entries[key[1]] for key in self._keys[lo:hi])
+
+            return heapq.nlargest(
+                limit,
+                (entry for entry in entries if entry['id'] not in exclude_ids),
+                key=_rank
+            )
+
+
+index = UsernameIndex()
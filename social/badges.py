@@ -0,0 +1,47 @@
+"""
+FitMitra Social Badges
+Cached per-user unread counts for notifications and messages
+Writers invalidate after commit; readers repopulate on a miss
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import Conversation, Notification
+
+
+# Upper bound on how long a missed invalidation can leave a badge stale
+CACHE_TIMEOUT = getattr(settings, 'SOCIAL_BADGE_CACHE_TIMEOUT', 300)
+
+
+def _key(user_id):
+    return f'social:badges:{user_id}'
+
+
+def get_counts(user_id):
+    """{'notifications': n, 'messages': m}, from cache when possible"""
+    counts = cache.get(_key(user_id))
+    if counts is None:
+        counts = {
+            'notifications': Notification.objects.filter(
+                recipient_id=user_id,
+                is_read=False
+            ).count(),
+            'messages': Conversation.objects.filter(
+                user_id=user_id
+            ).aggregate(total=Sum('unread_count'))['total'] or 0,
+        }
+        cache.set(_key(user_id), counts, CACHE_TIMEOUT)
+    return counts
+
+
+def get_etag(counts):
+    return f'"{counts["notifications"]}-{counts["messages"]}"'
+
+
+def invalidate(*user_ids):
+    """Drop cached counts once the surrounding transaction commits"""
+    keys = [_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
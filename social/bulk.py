@@ -0,0 +1,254 @@
+"""
+FitMitra Social Bulk Import/Export
+Streams follows, posts and likes between CSV/JSONL files and the database
+in validated chunks; used by the import/export_social_graph commands
+"""
+
+import csv
+import json
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Follow, Like, Post
+from . import graph
+
+
+FORMATS = ('csv', 'jsonl')
+
+# kind -> (model, exported/imported columns)
+KINDS = {
+    'follows': (Follow, ('follower_id', 'following_id', 'status', 'created_at')),
+    'posts': (Post, ('id', 'author_id', 'post_type', 'caption', 'created_at')),
+    'likes': (Like, ('user_id', 'post_id', 'created_at')),
+}
+
+POST_TYPES = {choice for choice, _ in Post.POST_TYPE_CHOICES}
+FOLLOW_STATUSES = {choice for choice, _ in Follow.STATUS_CHOICES}
+CAPTION_MAX_LENGTH = Post._meta.get_field('caption').max_length
+
+
+# ============================================================
+# READING / WRITING
+# ============================================================
+
+def _csv_lines(stream, position, malformed):
+    """Decoded lines for csv; undecodable lines are recorded in `malformed` and skipped"""
+    for position[0], line in enumerate(stream, 1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8')
+            except UnicodeDecodeError:
+                malformed.append(position[0])
+                continue
+        yield line
+
+
+def read_records(stream, fmt, malformed=None):
+    """
+    Yield one dict per input row without loading the file
+    Lines that cannot be decoded or parsed yield None (rejected like any
+    invalid row) and their line numbers are appended to `malformed`
+    """
+    malformed = [] if malformed is None else malformed
+    if fmt == 'csv':
+        position = [0]
+        reader = csv.DictReader(_csv_lines(stream, position, malformed))
+        reported = len(malformed)
+        while True:
+            row = done = None
+            try:
+                row = next(reader)
+            except StopIteration:
+                done = True
+            except csv.Error:
+                malformed.append(position[0])
+            # Rejected lines (skipped by the reader or unparsable), in order
+            while reported < len(malformed):
+                reported += 1
+                yield None
+            if done:
+                break
+            if row is not None:
+                yield row
+    else:
+        for number, line in enumerate(stream, 1):
+            try:
+                if isinstance(line, bytes):
+                    line = line.decode('utf-8')
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+            except ValueError:
+                malformed.append(number)
+                record = None
+            yield record
+
+
+def write_records(stream, fmt, columns, rows):
+    """Write tuples in `columns` order; yields after every row written"""
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in row
+            )
+            yield
+    else:
+        for row in rows:
+            stream.write(json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder))
+            stream.write('\n')
+            yield
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ============================================================
+# VALIDATION
+# ============================================================
+
+def _int(value):
+    return int(value)
+
+
+def _datetime(value):
+    if not value:
+        return timezone.now()
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError(f'Invalid datetime: {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _build_follow(row):
+    follower_id, following_id = _int(row['follower_id']), _int(row['following_id'])
+    status = row.get('status') or 'accepted'
+    if follower_id == following_id or status not in FOLLOW_STATUSES:
+        raise ValueError('Invalid follow')
+    return Follow(
+        follower_id=follower_id,
+        following_id=following_id,
+        status=status,
+        created_at=_datetime(row.get('created_at'))
+    )
+
+
+def _build_post(row):
+    post_type = row.get('post_type') or 'text'
+    caption = row.get('caption') or ''
+    if post_type not in POST_TYPES or not caption or len(caption) > CAPTION_MAX_LENGTH:
+        raise ValueError('Invalid post')
+    return Post(
+        id=_int(row['id']) if row.get('id') else None,
+        author_id=_int(row['author_id']),
+        post_type=post_type,
+        caption=caption,
+        created_at=_datetime(row.get('created_at'))
+    )
+
+
+def _build_like(row):
+    return Like(
+        user_id=_int(row['user_id']),
+        post_id=_int(row['post_id']),
+        created_at=_datetime(row.get('created_at'))
+    )
+
+
+BUILDERS = {'follows': _build_follow, 'posts': _build_post, 'likes': _build_like}
+
+# kind -> [(model attribute, referenced model)] checked per chunk
+REFERENCES = {
+    'follows': [('follower_id', User), ('following_id', User)],
+    'posts': [('author_id', User)],
+    'likes': [('user_id', User), ('post_id', Post)],
+}
+
+
+def _existing_ids(model, ids):
+    return set(model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+
+
+def _validate_chunk(kind, rows):
+    """Build model instances, dropping malformed rows and dangling references"""
+    objs = []
+    for row in rows:
+        try:
+            objs.append(BUILDERS[kind](row))
+        except (KeyError, TypeError, ValueError):
+            continue
+
+    for attr, model in REFERENCES[kind]:
+        existing = _existing_ids(model, {getattr(obj, attr) for obj in objs})
+        objs = [obj for obj in objs if getattr(obj, attr) in existing]
+    return objs
+
+
+# ============================================================
+# IMPORT / EXPORT
+# ============================================================
+
+@contextmanager
+def _preserve_timestamps(model):
+    """Let bulk_create keep imported created_at values instead of now()"""
+    field = model._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def import_records(kind, records, chunk_size=5000):
+    """
+    Insert records chunk by chunk, one transaction per chunk
+    Existing rows (unique conflicts) are skipped by the database
+    Yields (rows read, rows accepted) per chunk; denormalized counters
+    are left for counters.reconcile()
+    """
+    model, _ = KINDS[kind]
+    with _preserve_timestamps(model):
+        for rows in _chunks(records, chunk_size):
+            objs = _validate_chunk(kind, rows)
+            with transaction.atomic():
+                model.objects.bulk_create(objs, ignore_conflicts=True)
+
+            if kind == 'follows':
+                # bulk_create skips the signals that invalidate graph sets
+                graph.invalidate(*{
+                    user_id
+                    for obj in objs
+                    for user_id in (obj.follower_id, obj.following_id)
+                })
+            yield len(rows), len(objs)
+
+    if kind == 'posts':
+        # Explicit ids leave the primary key sequence behind (PostgreSQL)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Post]):
+                cursor.execute(sql)
+
+
+def export_records(kind, stream, fmt, chunk_size=5000):
+    """Stream every row of `kind` to `stream` in primary-key order; yields per row"""
+    model, columns = KINDS[kind]
+    rows = model.objects.order_by('pk').values_list(*columns).iterator(chunk_size=chunk_size)
+    yield from write_records(stream, fmt, columns, rows)
@@ -0,0 +1,162 @@
+"""
+FitMitra Social Response Cache
+Per-view cache of public read responses (profile, posts, followers,
+following) with generation-based invalidation and ETag/Cache-Control
+
+Response data lives in the SOCIAL_RESPONSE_CACHE alias (process-local
+memory by default); generations live in the default cache so a bump
+from any process invalidates every copy
+"""
+
+import functools
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import UserProfile
+
+
+ALIAS = getattr(settings, 'SOCIAL_RESPONSE_CACHE', 'default')
+
+# Server-side lifetime; also bounds staleness of counters updated without signals
+TIMEOUT = getattr(settings, 'SOCIAL_RESPONSE_CACHE_TIMEOUT', 300)
+
+# Client/CDN freshness of anonymous responses before revalidating
+MAX_AGE = getattr(settings, 'SOCIAL_RESPONSE_CACHE_MAX_AGE', 30)
+
+
+# ============================================================
+# GENERATIONS
+# ============================================================
+
+def _generation_key(scope):
+    return f'social:resp:gen:{scope}'
+
+
+def _generation(scope):
+    key = _generation_key(scope)
+    generation = cache.get(key)
+    if generation is None:
+        # Seed from the clock so an evicted counter never reuses an old generation
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bump(scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_generation_key(scope))
+        except ValueError:
+            cache.set(_generation_key(scope), time.time_ns(), None)
+
+
+def _profile_scope(username):
+    return f'profile:{username}'
+
+
+def _viewer_scope(user_id):
+    return f'viewer:{user_id}'
+
+
+# ============================================================
+# INVALIDATION (called from signals and write paths)
+# ============================================================
+
+def invalidate_profiles(*usernames):
+    """Drop cached responses about these profiles after commit"""
+    scopes = [_profile_scope(username) for username in usernames if username]
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def invalidate_viewers(*user_ids):
+    """Drop cached responses rendered for these viewers after commit"""
+    scopes = [_viewer_scope(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def invalidate_users(*user_ids):
+    """Both of the above for users known by id (one username lookup)"""
+    def bump():
+        usernames = UserProfile.objects.filter(
+            user_id__in=user_ids
+        ).values_list('username', flat=True)
+        _bump([_profile_scope(username) for username in usernames])
+        _bump([_viewer_scope(user_id) for user_id in user_ids])
+
+    transaction.on_commit(bump)
+
+
+# ============================================================
+# VIEW DECORATOR
+# ============================================================
+
+def _response_key(request, username):
+    """
+    Scheme + host + path + sorted query + viewer class, under the current
+    generations; responses hold absolute URLs built for the requesting host
+    """
+    user = request.user
+    if user.is_authenticated:
+        viewer = f'user:{user.id}:{_generation(_viewer_scope(user.id))}'
+    else:
+        viewer = 'anon'
+    query = sorted(request.query_params.lists())
+    raw = json.dumps([
+        request.scheme, request.get_host(), request.path, query, viewer,
+        _generation(_profile_scope(username))
+    ])
+    return f'social:resp:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def _etag(data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return f'"{hashlib.md5(payload.encode()).hexdigest()}"'
+
+
+def _with_headers(response, etag, public):
+    response['ETag'] = etag
+    if public:
+        response['Cache-Control'] = f'public, max-age={MAX_AGE}'
+    else:
+        response['Cache-Control'] = 'private, no-cache'
+    response['Vary'] = 'Authorization'
+    return response
+
+
+def cache_response(view_method):
+    """
+    Cache a profile-scoped GET action (looked up by `username`)
+    Hits skip the view entirely; If-None-Match gets a 304
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return view_method(self, request, *args, **kwargs)
+
+        store = caches[ALIAS]
+        key = _response_key(request, kwargs.get('username'))
+        entry = store.get(key)
+        if entry is None:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            entry = (response.data, _etag(response.data))
+            store.set(key, entry, TIMEOUT)
+        else:
+            response = None
+
+        data, etag = entry
+        public = not request.user.is_authenticated
+        if request.headers.get('If-None-Match') == etag:
+            return _with_headers(Response(status=status.HTTP_304_NOT_MODIFIED), etag, public)
+        return _with_headers(response or Response(data), etag, public)
+
+    return wrapper
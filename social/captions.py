@@ -0,0 +1,255 @@
+"""
+FitMitra Social Captions
+Extracts #hashtags and @mentions from post captions and comments into
+indexed join tables, with bulk mention notifications and hourly
+hashtag usage counters
+
+A tag's posts_count and tag pages cover captions only; comment tags are
+linked to the comment and count towards trending
+"""
+
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import CommentHashtag, Hashtag, HashtagTrend, Mention, Post, PostHashtag, UserProfile
+from . import counters, graph, notifications
+
+
+# Trending hashtags sum the usage buckets of this many recent hours
+TREND_HOURS = getattr(settings, 'SOCIAL_HASHTAG_TREND_HOURS', 24)
+
+# Extra tags/mentions beyond these are ignored (spam guard)
+MAX_HASHTAGS = 30
+MAX_MENTIONS = 20
+
+HASHTAG_MAX_LENGTH = Hashtag._meta.get_field('name').max_length
+USERNAME_MAX_LENGTH = UserProfile._meta.get_field('username').max_length
+
+# Not preceded by a word character, so emails and "a#b" do not match
+HASHTAG_RE = re.compile(r'(?<![\w#&])#(\w+)')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.]+)')
+
+
+# ============================================================
+# PARSING
+# ============================================================
+
+def _unique(values, limit):
+    seen = []
+    for value in values:
+        if value not in seen:
+            seen.append(value)
+            if len(seen) == limit:
+                break
+    return seen
+
+
+def extract_hashtags(text):
+    """Lowercase tags in order of first use; purely numeric tags are skipped"""
+    return _unique(
+        (
+            tag.lower() for tag in HASHTAG_RE.findall(text or '')
+            if len(tag) <= HASHTAG_MAX_LENGTH and not tag.isdigit()
+        ),
+        MAX_HASHTAGS
+    )
+
+
+def extract_mentions(text):
+    """Mentioned usernames in order of first use (trailing dots dropped)"""
+    return _unique(
+        (
+            name for name in (match.rstrip('.') for match in MENTION_RE.findall(text or ''))
+            if name and len(name) <= USERNAME_MAX_LENGTH
+        ),
+        MAX_MENTIONS
+    )
+
+
+def trend_bucket(moment=None):
+    return (moment or timezone.now()).replace(minute=0, second=0, microsecond=0)
+
+
+# ============================================================
+# WRITE PATH (called inside the create transaction)
+# ============================================================
+
+def _hashtag_ids(names):
+    """Ids for `names`, creating missing tags; two queries however many tags"""
+    Hashtag.objects.bulk_create(
+        [Hashtag(name=name) for name in names],
+        ignore_conflicts=True
+    )
+    return list(Hashtag.objects.filter(name__in=names).values_list('id', flat=True))
+
+
+def _link_hashtags(post, names, count_usage=True):
+    hashtag_ids = _hashtag_ids(names)
+    PostHashtag.objects.bulk_create(
+        [
+            PostHashtag(post=post, hashtag_id=hashtag_id, created_at=post.created_at)
+            for hashtag_id in hashtag_ids
+        ],
+        ignore_conflicts=True
+    )
+    counters.adjust(Hashtag.objects.filter(id__in=hashtag_ids), 'posts_count', 1)
+
+    if count_usage:
+        _count_usage(hashtag_ids)
+
+
+def _link_comment_hashtags(comment, names):
+    hashtag_ids = _hashtag_ids(names)
+    CommentHashtag.objects.bulk_create(
+        [
+            CommentHashtag(comment=comment, hashtag_id=hashtag_id, created_at=comment.created_at)
+            for hashtag_id in hashtag_ids
+        ],
+        ignore_conflicts=True
+    )
+    _count_usage(hashtag_ids)
+
+
+def _count_usage(hashtag_ids):
+    """One use of each tag in the current trend bucket"""
+    bucket = trend_bucket()
+    HashtagTrend.objects.bulk_create(
+        [HashtagTrend(hashtag_id=hashtag_id, bucket=bucket) for hashtag_id in hashtag_ids],
+        ignore_conflicts=True
+    )
+    HashtagTrend.objects.filter(
+        hashtag_id__in=hashtag_ids,
+        bucket=bucket
+    ).update(count=F('count') + 1)
+
+
+def _record_mentions(author_id, names, post, comment=None):
+    """Resolve usernames in one query, store the mentions and notify in bulk"""
+    mentioned = set(
+        UserProfile.objects.filter(username__in=names).values_list('user_id', flat=True)
+    )
+    # Users who blocked the author never hear about it
+    mentioned -= graph.blocked_by_ids(author_id)
+    mentioned.discard(author_id)
+    if not mentioned:
+        return
+
+    Mention.objects.bulk_create([
+        Mention(post=post, comment=comment, user_id=user_id, author_id=author_id)
+        for user_id in mentioned
+    ])
+    notifications.notify_many(
+        mentioned, author_id, 'mention',
+        post_id=post.pk,
+        comment_id=comment.pk if comment else None
+    )
+
+
+def process_post(post):
+    """Index a new post's caption: hashtag links, usage counters, mentions"""
+    names = extract_hashtags(post.caption)
+    if names:
+        _link_hashtags(post, names)
+
+    usernames = extract_mentions(post.caption)
+    if usernames:
+        _record_mentions(post.author_id, usernames, post)
+
+
+def process_comment(comment):
+    """Index a new comment: hashtag links and usage counters, mentions"""
+    names = extract_hashtags(comment.text)
+    if names:
+        _link_comment_hashtags(comment, names)
+
+    usernames = extract_mentions(comment.text)
+    if usernames:
+        _record_mentions(comment.author_id, usernames, comment.post, comment)
+
+
+def remove_post(post):
+    """A post was deactivated; its tags lose one post each"""
+    counters.adjust(Hashtag.objects.filter(post_links__post=post), 'posts_count', -1)
+
+
+# ============================================================
+# READ PATH
+# ============================================================
+
+def posts_for_hashtag(name):
+    """
+    Active posts tagged #name, newest first, ordered on the link table's
+    (hashtag, -created_at) index; None when the tag does not exist
+    """
+    hashtag_id = Hashtag.objects.filter(
+        name=name.lstrip('#').lower()
+    ).values_list('id', flat=True).first()
+    if hashtag_id is None:
+        return None
+
+    return Post.objects.filter(
+        hashtag_links__hashtag_id=hashtag_id,
+        is_active=True
+    ).annotate(
+        tagged_at=F('hashtag_links__created_at')
+    ).order_by('-tagged_at', '-id')
+
+
+def trending_hashtags(limit=20, hours=TREND_HOURS):
+    """[{'name', 'posts_count', 'uses'}] of the most used tags in the last `hours`"""
+    since = trend_bucket() - timedelta(hours=hours - 1)
+    rows = HashtagTrend.objects.filter(
+        bucket__gte=since
+    ).values(
+        'hashtag_id', 'hashtag__name', 'hashtag__posts_count'
+    ).annotate(
+        uses=Sum('count')
+    ).order_by('-uses', 'hashtag_id')[:limit]
+    return [
+        {'name': row['hashtag__name'], 'posts_count': row['hashtag__posts_count'], 'uses': row['uses']}
+        for row in rows
+    ]
+
+
+# ============================================================
+# MAINTENANCE
+# ============================================================
+
+def prune_trends(hours=TREND_HOURS):
+    """Drop usage buckets that no longer count towards trending; returns rows"""
+    deleted, _ = HashtagTrend.objects.filter(
+        bucket__lt=trend_bucket() - timedelta(hours=hours - 1)
+    ).delete()
+    return deleted
+
+
+def backfill(chunk_size=1000):
+    """
+    Link hashtags of existing active posts (created before the pipeline
+    or bulk imported); mentions are not notified retroactively
+    One transaction per chunk; yields posts scanned
+    """
+    last_pk = 0
+    while True:
+        posts = list(
+            Post.objects.filter(
+                pk__gt=last_pk,
+                is_active=True
+            ).exclude(
+                hashtag_links__isnull=False
+            ).order_by('pk').only('id', 'caption', 'created_at')[:chunk_size]
+        )
+        if not posts:
+            return
+        with transaction.atomic():
+            for post in posts:
+                names = extract_hashtags(post.caption)
+                if names:
+                    _link_hashtags(post, names, count_usage=False)
+        last_pk = posts[-1].pk
+        yield len(posts)
@@ -0,0 +1,97 @@
+"""
+FitMitra Social Conversations
+Maintains the per-participant Conversation inbox rows
+"""
+
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q
+
+from .models import Conversation, Message
+from . import badges
+
+
+def _touch(user_id, partner_id, message, unread_delta):
+    updates = {
+        'last_message': message,
+        'last_activity_at': message.created_at,
+    }
+    if unread_delta:
+        updates['unread_count'] = F('unread_count') + unread_delta
+
+    if Conversation.objects.filter(user_id=user_id, partner_id=partner_id).update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            Conversation.objects.create(
+                user_id=user_id,
+                partner_id=partner_id,
+                last_message=message,
+                last_activity_at=message.created_at,
+                unread_count=unread_delta
+            )
+    except IntegrityError:
+        # Concurrent first message in the same conversation
+        Conversation.objects.filter(user_id=user_id, partner_id=partner_id).update(**updates)
+
+
+def record_message(message):
+    """Update both participants' inbox rows for a newly sent message"""
+    with transaction.atomic():
+        _touch(message.sender_id, message.recipient_id, message, 0)
+        _touch(message.recipient_id, message.sender_id, message, 1)
+
+
+def mark_read(user, partner):
+    """Reset the unread badge of user's conversation with partner"""
+    Conversation.objects.filter(
+        user=user,
+        partner=partner,
+        unread_count__gt=0
+    ).update(unread_count=0)
+    badges.invalidate(user.id)
+
+
+def rebuild_all():
+    """Recreate every inbox row from social_message; returns rows written"""
+    last_ids = defaultdict(int)
+    unread = defaultdict(int)
+
+    pairs = Message.objects.order_by().values('sender_id', 'recipient_id').annotate(
+        last_id=Max('id'),
+        unread=Count('id', filter=Q(is_read=False))
+    )
+    for row in pairs.iterator():
+        sender_id, recipient_id = row['sender_id'], row['recipient_id']
+        for key in ((sender_id, recipient_id), (recipient_id, sender_id)):
+            last_ids[key] = max(last_ids[key], row['last_id'])
+        unread[(recipient_id, sender_id)] += row['unread']
+
+    message_ids = sorted(set(last_ids.values()))
+    created_at = {}
+    for start in range(0, len(message_ids), 1000):
+        created_at.update(
+            Message.objects.filter(
+                id__in=message_ids[start:start + 1000]
+            ).values_list('id', 'created_at')
+        )
+
+    with transaction.atomic():
+        Conversation.objects.all().delete()
+        Conversation.objects.bulk_create(
+            [
+                Conversation(
+                    user_id=user_id,
+                    partner_id=partner_id,
+                    last_message_id=last_id,
+                    last_activity_at=created_at[last_id],
+                    unread_count=unread[(user_id, partner_id)]
+                )
+                for (user_id, partner_id), last_id in last_ids.items()
+            ],
+            batch_size=1000
+        )
+
+    return len(last_ids)
@@ -0,0 +1,194 @@
+"""
+FitMitra Social Counters
+Atomic updates, buffered hot counters and set-based reconciliation
+of denormalized social stats
+"""
+
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, CounterShard, Follow, Hashtag, Like, Post, PostHashtag, UserProfile
+
+
+# Buffer like counters in shard rows instead of updating the hot row directly
+BUFFERED = getattr(settings, 'SOCIAL_BUFFERED_COUNTERS', False)
+
+# Shard rows per buffered counter; more shards means less lock contention
+SHARDS = getattr(settings, 'SOCIAL_COUNTER_SHARDS', 16)
+
+# Buffered counter targets and the column each one is flushed into
+TARGETS = {
+    'post_likes': (Post, 'likes_count'),
+    'comment_likes': (Comment, 'likes_count'),
+}
+
+
+# ============================================================
+# ATOMIC UPDATES
+# ============================================================
+
+def adjust(queryset, field, delta):
+    """
+    Apply `SET field = field + delta` in a single UPDATE statement
+    Decrements are clamped at zero to respect PositiveIntegerField
+    """
+    if delta >= 0:
+        expression = F(field) + delta
+    else:
+        expression = Greatest(F(field) + delta, Value(0))
+    return queryset.update(**{field: expression})
+
+
+def adjust_post(post_id, field, delta):
+    return adjust(Post.objects.filter(pk=post_id), field, delta)
+
+
+def adjust_profile(user_id, field, delta):
+    return adjust(UserProfile.objects.filter(user_id=user_id), field, delta)
+
+
+def adjust_post_likes(post_id, delta):
+    if BUFFERED:
+        return add_to_shard('post_likes', post_id, delta)
+    return adjust_post(post_id, 'likes_count', delta)
+
+
+def adjust_follow(follower_id, following_id, delta):
+    """Update both sides of a follow edge"""
+    adjust_profile(follower_id, 'following_count', delta)
+    adjust_profile(following_id, 'followers_count', delta)
+
+
+# ============================================================
+# SHARDED (BUFFERED) COUNTERS
+# ============================================================
+
+def add_to_shard(target, object_id, delta):
+    """Add a delta to one randomly chosen shard row of a counter"""
+    lookup = {'target': target, 'object_id': object_id, 'shard': random.randrange(SHARDS)}
+
+    if CounterShard.objects.filter(**lookup).update(delta=F('delta') + delta):
+        return 1
+    try:
+        with transaction.atomic():
+            CounterShard.objects.create(delta=delta, **lookup)
+    except IntegrityError:
+        # Another writer created the shard first
+        CounterShard.objects.filter(**lookup).update(delta=F('delta') + delta)
+    return 1
+
+
+def pending_deltas(target, object_ids):
+    """Unflushed shard totals for a set of objects, in one query"""
+    if not BUFFERED:
+        return {}
+    return dict(
+        CounterShard.objects.filter(
+            target=target,
+            object_id__in=list(object_ids)
+        ).values('object_id').annotate(
+            total=Sum('delta')
+        ).values_list('object_id', 'total')
+    )
+
+
+def current_value(obj, target, pending=None):
+    """Column value plus unflushed shard deltas"""
+    model, field = TARGETS[target]
+    if pending is None:
+        pending = pending_deltas(target, [obj.pk])
+    return max(0, getattr(obj, field) + pending.get(obj.pk, 0))
+
+
+def flush_shards(chunk_size=500):
+    """
+    Fold shard deltas into their counter columns and delete the shard rows
+    Rows locked by in-flight writers are skipped and picked up next run
+    Returns the number of shard rows flushed
+    """
+    flushed = 0
+    while True:
+        with transaction.atomic():
+            shards = list(
+                CounterShard.objects.select_for_update(
+                    skip_locked=True
+                ).order_by('id').values_list('id', 'target', 'object_id', 'delta')[:chunk_size]
+            )
+            if not shards:
+                return flushed
+
+            totals = defaultdict(int)
+            for _, target, object_id, delta in shards:
+                totals[(target, object_id)] += delta
+
+            for (target, object_id), total in totals.items():
+                model, field = TARGETS[target]
+                if total:
+                    adjust(model.objects.filter(pk=object_id), field, total)
+
+            CounterShard.objects.filter(id__in=[shard[0] for shard in shards]).delete()
+            flushed += len(shards)
+
+
+# ============================================================
+# RECONCILIATION
+# ============================================================
+
+def _count(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group_by).annotate(
+                total=Count('*')
+            ).values('total')[:1],
+            output_field=IntegerField()
+        ),
+        Value(0)
+    )
+
+
+def counter_specs():
+    """(label, model, field, true-count expression) for every denormalized counter"""
+    return [
+        ('post.likes_count', Post, 'likes_count',
+         _count(Like.objects.filter(post=OuterRef('pk')), 'post')),
+        ('post.comments_count', Post, 'comments_count',
+         _count(Comment.objects.filter(post=OuterRef('pk'), is_active=True), 'post')),
+        ('profile.followers_count', UserProfile, 'followers_count',
+         _count(Follow.objects.filter(following=OuterRef('user_id'), status='accepted'), 'following')),
+        ('profile.following_count', UserProfile, 'following_count',
+         _count(Follow.objects.filter(follower=OuterRef('user_id'), status='accepted'), 'follower')),
+        ('profile.posts_count', UserProfile, 'posts_count',
+         _count(Post.objects.filter(author=OuterRef('user_id'), is_active=True), 'author')),
+        ('hashtag.posts_count', Hashtag, 'posts_count',
+         _count(PostHashtag.objects.filter(hashtag=OuterRef('pk'), post__is_active=True), 'hashtag')),
+    ]
+
+
+def reconcile(chunk_size=5000):
+    """
+    Recompute every counter from the source tables in primary-key chunks
+    Each chunk is one UPDATE touching only drifted rows
+    Yields (label, rows_fixed) per counter
+    """
+    # Buffered deltas would be double counted on top of the recomputed values
+    flush_shards()
+
+    for label, model, field, actual in counter_specs():
+        fixed = 0
+        last_pk = 0
+        max_pk = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+        while last_pk < max_pk:
+            chunk = model.objects.filter(pk__gt=last_pk, pk__lte=last_pk + chunk_size)
+            drifted = chunk.annotate(actual=actual).exclude(**{field: F('actual')})
+            fixed += model.objects.filter(
+                pk__in=drifted.values('pk')
+            ).update(**{field: actual})
+            last_pk += chunk_size
+
+        yield label, fixed
@@ -0,0 +1,135 @@
+"""
+FitMitra Social Graph Cache
+Per-user follow/block id sets with versioned invalidation
+
+Each user has a version counter in the cache. Sets are stored under keys
+that embed the version, so bumping it on any Follow/Block write orphans
+every cached set of that user at once
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Block, Follow
+
+
+# Lifetime of a cached id set; versions themselves never expire
+CACHE_TIMEOUT = getattr(settings, 'SOCIAL_GRAPH_CACHE_TIMEOUT', 3600)
+
+# kind -> (model, owner column, member column, extra filters)
+KINDS = {
+    'following': (Follow, 'follower_id', 'following_id', {'status': 'accepted'}),
+    'followers': (Follow, 'following_id', 'follower_id', {'status': 'accepted'}),
+    'blocking': (Block, 'blocker_id', 'blocked_id', {}),
+    'blocked_by': (Block, 'blocked_id', 'blocker_id', {}),
+}
+
+
+# ============================================================
+# STATS (per process)
+# ============================================================
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'load_ms': 0.0, 'invalidations': 0}
+
+
+def _record(**deltas):
+    with _stats_lock:
+        for name, delta in deltas.items():
+            _stats[name] += delta
+
+
+def get_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+    stats['avg_load_ms'] = round(stats['load_ms'] / stats['misses'], 3) if stats['misses'] else None
+    stats['load_ms'] = round(stats['load_ms'], 3)
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.update(hits=0, misses=0, load_ms=0.0, invalidations=0)
+
+
+# ============================================================
+# VERSIONED SETS
+# ============================================================
+
+def _version_key(user_id):
+    return f'social:graph:v:{user_id}'
+
+
+def _version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_ids(user_id, kind):
+    """frozenset of user ids related to user_id by `kind` (see KINDS)"""
+    key = f'social:graph:{kind}:{user_id}:{_version(user_id)}'
+    ids = cache.get(key)
+    if ids is not None:
+        _record(hits=1)
+        return ids
+
+    started = time.perf_counter()
+    model, owner, member, filters = KINDS[kind]
+    ids = frozenset(
+        model.objects.filter(**{owner: user_id}, **filters).values_list(member, flat=True)
+    )
+    cache.set(key, ids, CACHE_TIMEOUT)
+    _record(misses=1, load_ms=(time.perf_counter() - started) * 1000)
+    return ids
+
+
+def invalidate(*user_ids):
+    """Bump the graph version of every user once the transaction commits"""
+    def bump():
+        for user_id in user_ids:
+            try:
+                cache.incr(_version_key(user_id))
+            except ValueError:
+                cache.set(_version_key(user_id), time.time_ns(), None)
+        _record(invalidations=len(user_ids))
+
+    transaction.on_commit(bump)
+
+
+# ============================================================
+# LOOKUPS
+# ============================================================
+
+def following_ids(user_id):
+    return get_ids(user_id, 'following')
+
+
+def follower_ids(user_id):
+    return get_ids(user_id, 'followers')
+
+
+def blocking_ids(user_id):
+    return get_ids(user_id, 'blocking')
+
+
+def blocked_by_ids(user_id):
+    return get_ids(user_id, 'blocked_by')
+
+
+def is_following(follower_id, following_id):
+    return following_id in following_ids(follower_id)
+
+
+def has_blocked(blocker_id, blocked_id):
+    return blocked_id in blocking_ids(blocker_id)
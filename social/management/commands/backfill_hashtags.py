@@ -0,0 +1,21 @@
+"""
+Management command to link hashtags of posts created before the caption
+pipeline (or bulk imported)
+"""
+from django.core.management.base import BaseCommand
+from social import captions
+
+
+class Command(BaseCommand):
+    help = 'Parse captions of existing posts without hashtag links into the hashtag tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        scanned = 0
+        for count in captions.backfill(chunk_size=options['chunk_size']):
+            scanned += count
+            self.stdout.write(f'  {scanned} posts scanned')
+        
+        self.stdout.write(self.style.SUCCESS('Successfully backfilled hashtags!'))
@@ -0,0 +1,54 @@
+"""
+Management command to stream follows, posts or likes out as CSV/JSONL
+"""
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from social import bulk
+
+
+class Command(BaseCommand):
+    help = 'Stream follows/posts/likes to a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(bulk.KINDS))
+        parser.add_argument('path', help="Output file, or '-' for stdout")
+        parser.add_argument('--format', choices=bulk.FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--report-every', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in bulk.FORMATS:
+            raise CommandError('Pass --format csv or --format jsonl')
+
+        # Keep progress off stdout when the export itself goes there
+        log = self.stderr if path == '-' else self.stdout
+        stream = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        every = options['report_every']
+        written = 0
+        started = window_started = time.perf_counter()
+
+        try:
+            for _ in bulk.export_records(
+                options['kind'], stream, fmt, chunk_size=options['chunk_size']
+            ):
+                written += 1
+                if written % every == 0:
+                    now = time.perf_counter()
+                    log.write(
+                        f'  {written:>12,} rows  {now - window_started:>7.2f}s  '
+                        f'{every / (now - window_started):>10,.0f} rows/s'
+                    )
+                    window_started = now
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+        log.write(self.style.SUCCESS(
+            f'Successfully exported {written:,} {options["kind"]} in {elapsed:.1f}s'
+        ))
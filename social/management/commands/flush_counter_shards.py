@@ -0,0 +1,28 @@
+"""
+Management command to fold buffered counter shards into their columns
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from social import counters
+
+
+class Command(BaseCommand):
+    help = 'Flush buffered like-counter shards into Post/Comment likes_count'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep flushing every --interval seconds'
+        )
+        parser.add_argument('--interval', type=float, default=5.0)
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = counters.flush_shards(chunk_size=options['chunk_size'])
+            self.stdout.write(f'Flushed {flushed} counter shards')
+            
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,91 @@
+"""
+Management command to bulk-load follows, posts or likes from CSV/JSONL
+Load users first; rows that reference unknown users or posts, and lines
+that cannot be parsed, are skipped
+"""
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from social import bulk, counters
+
+
+class Command(BaseCommand):
+    help = 'Stream follows/posts/likes from a CSV or JSONL file into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(bulk.KINDS))
+        parser.add_argument('path', help="Input file, or '-' for stdin")
+        parser.add_argument('--format', choices=bulk.FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--report-every', type=int, default=100000)
+        parser.add_argument(
+            '--skip-reconcile', action='store_true',
+            help='Do not recompute denormalized counters after the import'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in bulk.FORMATS:
+            raise CommandError('Pass --format csv or --format jsonl')
+
+        # Bytes in, so one undecodable line is rejected instead of ending the import
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        malformed = []
+        try:
+            self.run_import(options, bulk.read_records(stream, fmt, malformed))
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        if malformed:
+            shown = ', '.join(str(number) for number in malformed[:20])
+            more = f' (+{len(malformed) - 20} more)' if len(malformed) > 20 else ''
+            self.stdout.write(self.style.WARNING(
+                f'Rejected {len(malformed):,} malformed lines: {shown}{more}'
+            ))
+
+        if not options['skip_reconcile']:
+            self.stdout.write('Reconciling counters...')
+            for label, fixed in counters.reconcile():
+                self.stdout.write(f'  {label}: {fixed} rows fixed')
+
+        if options['kind'] in ('follows', 'posts'):
+            self.stdout.write(
+                'Run rebuild_timelines and refresh_trending to surface imported rows in feeds'
+            )
+        if options['kind'] == 'posts':
+            # bulk_create skips the signals that index posts and link their hashtags
+            self.stdout.write(
+                'Run backfill_hashtags and rebuild_search_index to make imported posts searchable'
+            )
+
+    def run_import(self, options, records):
+        every = options['report_every']
+        read = accepted = 0
+        started = window_started = time.perf_counter()
+        next_report = every
+
+        for chunk_read, chunk_accepted in bulk.import_records(
+            options['kind'], records, chunk_size=options['chunk_size']
+        ):
+            read += chunk_read
+            accepted += chunk_accepted
+            if read >= next_report:
+                now = time.perf_counter()
+                window = read - (next_report - every)
+                self.stdout.write(
+                    f'  {read:>12,} rows  {now - window_started:>7.2f}s  '
+                    f'{window / (now - window_started):>10,.0f} rows/s'
+                )
+                window_started = now
+                next_report = (read // every + 1) * every
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully imported {options["kind"]}: {read:,} rows read, {accepted:,} accepted, '
+            f'{read - accepted:,} rejected in {elapsed:.1f}s '
+            f'({read / elapsed if elapsed else 0:,.0f} rows/s)'
+        ))
@@ -0,0 +1,30 @@
+"""
+Management command to turn queued notification events into notifications
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from social import notifications
+
+
+class Command(BaseCommand):
+    help = 'Batch and coalesce queued NotificationEvent rows into Notification rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep processing every --interval seconds'
+        )
+        parser.add_argument('--interval', type=float, default=2.0)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        while True:
+            processed, written = notifications.process_events(
+                batch_size=options['batch_size']
+            )
+            self.stdout.write(f'Processed {processed} events into {written} notifications')
+            
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,90 @@
+"""
+Management command to measure how many idle realtime streams one worker holds
+Run the ASGI server separately, e.g.
+    gunicorn Backend.asgi:application -k uvicorn.workers.UvicornWorker -w 1
+"""
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Open many concurrent idle /api/social/stream/ connections and report how many stay up'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/social/stream/')
+        parser.add_argument('--username', required=True, help='User to authenticate the streams as')
+        parser.add_argument('--connections', type=int, default=1000)
+        parser.add_argument('--ramp', type=int, default=200, help='New connections per second')
+        parser.add_argument('--hold', type=float, default=30.0, help='Seconds to keep streams idle')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist")
+
+        token = str(RefreshToken.for_user(user).access_token)
+        asyncio.run(self.run(options, token))
+
+    async def run(self, options, token):
+        url = urlsplit(options['url'])
+        path = f'{url.path}?token={token}'
+        request = (
+            f'GET {path} HTTP/1.1\r\n'
+            f'Host: {url.netloc}\r\n'
+            'Accept: text/event-stream\r\n\r\n'
+        ).encode()
+
+        stats = {'open': 0, 'failed': 0, 'dropped': 0}
+        writers = []
+
+        async def connect():
+            try:
+                reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+                writer.write(request)
+                await writer.drain()
+                status_line = await asyncio.wait_for(reader.readline(), timeout=10)
+                if b' 200 ' not in status_line:
+                    raise ConnectionError(status_line.decode(errors='replace').strip())
+            except (OSError, asyncio.TimeoutError, ConnectionError):
+                stats['failed'] += 1
+                return
+            stats['open'] += 1
+            writers.append(writer)
+            try:
+                # Drain keep-alives until the hold period ends
+                while await reader.read(1024):
+                    pass
+                stats['dropped'] += 1
+            except (OSError, asyncio.CancelledError):
+                pass
+
+        started = time.perf_counter()
+        tasks = []
+        for i in range(options['connections']):
+            tasks.append(asyncio.create_task(connect()))
+            if (i + 1) % options['ramp'] == 0:
+                await asyncio.sleep(1)
+                self.stdout.write(f"  {stats['open']} open, {stats['failed']} failed")
+
+        await asyncio.sleep(options['hold'])
+        held = stats['open'] - stats['dropped']
+        elapsed = time.perf_counter() - started
+
+        for writer in writers:
+            writer.close()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{held} idle streams held after {elapsed:.0f}s "
+            f"({stats['failed']} failed to connect, {stats['dropped']} dropped by server)"
+        ))
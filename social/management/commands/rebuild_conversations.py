@@ -0,0 +1,13 @@
+"""
+Management command to rebuild Conversation inbox rows from messages
+"""
+from django.core.management.base import BaseCommand
+from social import conversations
+
+
+class Command(BaseCommand):
+    help = 'Rebuild Conversation inbox summaries from social_message'
+
+    def handle(self, *args, **options):
+        count = conversations.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {count} conversation rows!'))
@@ -0,0 +1,22 @@
+"""
+Management command to recompute stored profile/post search vectors
+"""
+from django.core.management.base import BaseCommand
+from social import search
+
+
+class Command(BaseCommand):
+    help = 'Recompute UserProfile/Post search vectors (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if not search.use_postgres():
+            self.stdout.write('Not on PostgreSQL: search uses the in-memory fallback index')
+            return
+        
+        for label, updated in search.rebuild_vectors(chunk_size=options['chunk_size']):
+            self.stdout.write(f'  {label}: {updated} rows updated')
+        
+        self.stdout.write(self.style.SUCCESS('Successfully rebuilt search vectors!'))
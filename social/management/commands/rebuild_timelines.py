@@ -0,0 +1,33 @@
+"""
+Management command to rebuild materialized home timelines
+"""
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from social import timeline
+
+User = get_user_model()
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized home timelines from the follow graph'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', dest='usernames', default=[],
+            help='Only rebuild the timeline of this username (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+        
+        entries_count = 0
+        users_count = 0
+        
+        for user in users.iterator():
+            entries_count += timeline.rebuild_timeline(user)
+            users_count += 1
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {users_count} timelines ({entries_count} entries)!'
+        ))
@@ -0,0 +1,24 @@
+"""
+Management command to repair drift in denormalized social counters
+"""
+from django.core.management.base import BaseCommand
+from social import counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute likes/comments/followers/following/posts counters from source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Primary-key range updated per statement'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        
+        for label, fixed in counters.reconcile(chunk_size=options['chunk_size']):
+            self.stdout.write(f'  {label}: {fixed} rows fixed')
+            total += fixed
+        
+        self.stdout.write(self.style.SUCCESS(f'Successfully reconciled counters ({total} rows fixed)!'))
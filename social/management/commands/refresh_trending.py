@@ -0,0 +1,33 @@
+"""
+Management command to refresh the precomputed explore ranking
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from social import captions, trending
+
+
+class Command(BaseCommand):
+    help = 'Rescore changed recent posts in the trending table used by explore and prune old hashtag buckets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep refreshing every --interval seconds'
+        )
+        parser.add_argument('--interval', type=float, default=300.0)
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            scored, removed = trending.refresh()
+            pruned = captions.prune_trends()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'Rescored {scored} posts, removed {removed} expired, '
+                f'pruned {pruned} hashtag buckets ({elapsed:.2f}s)'
+            )
+            
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,232 @@
+"""
+Management command to benchmark social query paths on a seeded dataset
+All seeded rows are created inside a transaction that is rolled back
+"""
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from social.models import Comment, Like, Post, UserProfile
+from social import search, usernames
+from social.serializers import FeedPostSerializer
+from social.viewer import ViewerContext, POST_LISTING_RELATED
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark social query paths (queries, time, peak memory) on seeded data'
+
+    scenarios = ['listing', 'search', 'usernames', 'login']
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=self.scenarios)
+        parser.add_argument('--posts', type=int, default=15, help='Posts on the page')
+        parser.add_argument('--likes', type=int, default=20000, help='Likes per viral post')
+        parser.add_argument('--comments', type=int, default=2000, help='Comments per viral post')
+        parser.add_argument('--viral', type=int, default=3, help='Number of viral posts on the page')
+        parser.add_argument('--profiles', type=int, default=20000, help='Profiles to search over')
+        parser.add_argument('--query', default='marat', help='Search term')
+        parser.add_argument(
+            '--depths', default='10,100,1000',
+            help='Comma-separated numbers of existing colliding usernames'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            getattr(self, f"run_{options['scenario']}")(options)
+            transaction.set_rollback(True)
+
+    # ------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------
+
+    def seed_users(self, prefix, count):
+        User.objects.bulk_create(
+            [User(username=f'{prefix}{i}') for i in range(count)],
+            batch_size=1000
+        )
+        return list(User.objects.filter(username__startswith=prefix).order_by('id'))
+
+    def measure(self, label, func):
+        tracemalloc.start()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        elapsed = (time.perf_counter() - started) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'  {label:<24} {len(ctx):>5} queries  {elapsed:>9.1f} ms  '
+            f'{peak / 1024:>9.0f} KiB peak'
+        )
+
+    # ------------------------------------------------------------
+    # Scenarios
+    # ------------------------------------------------------------
+
+    def run_listing(self, options):
+        """Feed page with prefetch_related('likes', 'comments') vs the lean path"""
+        self.stdout.write('Seeding...')
+        viewer, = self.seed_users('bench_viewer_', 1)
+        authors = self.seed_users('bench_author_', options['posts'])
+        likers = self.seed_users('bench_liker_', options['likes'])
+
+        posts = Post.objects.bulk_create([
+            Post(author=author, caption=f'Benchmark post {i}')
+            for i, author in enumerate(authors)
+        ])
+        for post in posts[:options['viral']]:
+            Like.objects.bulk_create(
+                [Like(user=liker, post=post) for liker in likers],
+                batch_size=5000
+            )
+            Comment.objects.bulk_create(
+                [
+                    Comment(post=post, author=likers[i % len(likers)], text=f'Comment {i}')
+                    for i in range(options['comments'])
+                ],
+                batch_size=5000
+            )
+            post.likes_count = options['likes']
+            post.comments_count = options['comments']
+        Post.objects.bulk_update(posts, ['likes_count', 'comments_count'])
+
+        request = RequestFactory().get('/api/social/feed/')
+        request.user = viewer
+        post_ids = [post.id for post in posts]
+
+        def prefetch_path():
+            page = list(
+                Post.objects.filter(id__in=post_ids).select_related(
+                    'author', 'author__social_profile'
+                ).prefetch_related('likes', 'comments')
+            )
+            FeedPostSerializer(page, many=True, context={'request': request}).data
+
+        def lean_path():
+            page = list(
+                Post.objects.filter(id__in=post_ids).select_related(*POST_LISTING_RELATED)
+            )
+            context = {
+                'request': request,
+                'viewer': ViewerContext(viewer, page, with_comments=True)
+            }
+            FeedPostSerializer(page, many=True, context=context).data
+
+        self.stdout.write(
+            f"Feed page of {options['posts']} posts, {options['viral']} with "
+            f"{options['likes']} likes and {options['comments']} comments:"
+        )
+        self.measure('prefetch likes+comments', prefetch_path)
+        self.measure('lean + viewer context', lean_path)
+
+    def run_search(self, options):
+        """ILIKE over joined columns (old SearchFilter) vs the search subsystem"""
+        self.stdout.write('Seeding...')
+        words = ['strength', 'marathon', 'yoga', 'powerlifting', 'cycling', 'mobility', 'hiit']
+        users = self.seed_users('bench_search_', options['profiles'])
+        # bulk_create skipped the profile signal
+        UserProfile.objects.bulk_create(
+            [
+                UserProfile(
+                    user=user,
+                    username=user.username,
+                    bio=f'{words[i % len(words)]} coach, {words[(i * 3) % len(words)]} on weekends'
+                )
+                for i, user in enumerate(users)
+            ],
+            batch_size=1000
+        )
+        for label, _ in search.rebuild_vectors():
+            self.stdout.write(f'  indexed {label}')
+
+        query = options['query']
+
+        def ilike_path():
+            list(
+                UserProfile.objects.filter(
+                    Q(username__icontains=query) | Q(user__first_name__icontains=query)
+                    | Q(user__last_name__icontains=query) | Q(bio__icontains=query)
+                ).select_related('user').distinct()[:20]
+            )
+
+        def search_path():
+            list(search.search_profiles(query).select_related('user')[:20])
+
+        self.stdout.write(
+            f"Profile search for {query!r} over {options['profiles']} profiles "
+            f"({'tsvector + trigram' if search.use_postgres() else 'in-memory fallback'}):"
+        )
+        self.measure('ILIKE (SearchFilter)', ilike_path)
+        # First fallback call builds the index; measure it separately
+        self.measure('search (cold)', search_path)
+        self.measure('search (warm)', search_path)
+
+    def run_usernames(self, options):
+        """Probe-loop username generation vs the single-query allocator"""
+        base = 'bench_rahul'
+
+        def probe_loop():
+            username = base
+            counter = 1
+            while UserProfile.objects.filter(username=username).exists():
+                username = f'{base}{counter}'
+                counter += 1
+            return username
+
+        seeded = 0
+        for depth in sorted(int(value) for value in options['depths'].split(',')):
+            self.stdout.write(f'Seeding to {depth} existing "{base}*" usernames...')
+            users = self.seed_users(f'bench_un_{seeded}_', depth - seeded)
+            UserProfile.objects.bulk_create(
+                [
+                    UserProfile(user=user, username=usernames._candidate(base, seeded + i))
+                    for i, user in enumerate(users)
+                ],
+                batch_size=1000
+            )
+            seeded = depth
+
+            self.stdout.write(f'Allocating the next "{base}" with {depth} collisions:')
+            self.measure('exists() probe loop', probe_loop)
+            self.measure('usernames.allocate', lambda: usernames.allocate(base))
+
+    def run_login(self, options):
+        """Queries per login now that User saves no longer rewrite the profile"""
+        from django.contrib.auth.models import update_last_login
+        from rest_framework.test import APIRequestFactory
+        from accounts.views import LoginView
+
+        user = User.objects.create_user(username='bench_login', password='bench-pass-123')
+
+        def api_login():
+            request = APIRequestFactory().post(
+                '/api/accounts/login/',
+                {'username': 'bench_login', 'password': 'bench-pass-123'},
+                format='json'
+            )
+            LoginView.as_view()(request)
+
+        def session_login():
+            # What django.contrib.auth.login() does (admin, session auth)
+            update_last_login(None, User.objects.get(pk=user.pk))
+
+        def session_login_legacy():
+            # Previous save_social_profile: lazy SELECT + full-row UPDATE
+            fresh = User.objects.get(pk=user.pk)
+            update_last_login(None, fresh)
+            if hasattr(fresh, 'social_profile'):
+                fresh.social_profile.__dict__.pop('_loaded_values', None)
+                fresh.social_profile.save()
+
+        self.stdout.write('Login paths:')
+        self.measure('LoginView.post', api_login)
+        self.measure('last_login update', session_login)
+        self.measure('last_login (old signal)', session_login_legacy)
@@ -3,7 +3,7 @@ Management command to create missing UserProfile records for existing users
 """
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from social.models import UserProfile
+from social import usernames
 
 User = get_user_model()
 
@@ -11,23 +11,12 @@ class Command(BaseCommand):
     help = 'Create missing UserProfile records for existing users'
 
     def handle(self, *args, **options):
-        users = User.objects.all()
+        users = User.objects.filter(social_profile__isnull=True)
         created_count = 0
         
-        for user in users:
-            profile, created = UserProfile.objects.get_or_create(user=user)
-            if created:
-                # Username generation logic similar to signals
-                base_username = user.username if user.username else user.email.split('@')[0]
-                username = base_username
-                
-                counter = 1
-                while UserProfile.objects.filter(username=username).exclude(id=profile.id).exists():
-                    username = f"{base_username}{counter}"
-                    counter += 1
-                
-                profile.username = username
-                profile.save()
-                created_count += 1
+        for user in users.iterator():
+            # Same username allocation as the signup signal
+            usernames.create_profile(user)
+            created_count += 1
         
         self.stdout.write(self.style.SUCCESS(f'Successfully created {created_count} missing UserProfiles!'))
@@ -0,0 +1,24 @@
+"""
+Management command to cap materialized home timelines at their newest entries
+"""
+from django.core.management.base import BaseCommand, CommandError
+from social import timeline
+
+
+class Command(BaseCommand):
+    help = 'Delete home timeline entries beyond the newest SOCIAL_TIMELINE_LENGTH per user'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--length', type=int, default=timeline.TIMELINE_LENGTH,
+            help='Entries to keep per timeline'
+        )
+
+    def handle(self, *args, **options):
+        if options['length'] < 1:
+            raise CommandError('--length must be at least 1')
+
+        trimmed, deleted = timeline.trim_timelines(options['length'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Trimmed {trimmed} timelines ({deleted} entries deleted)!'
+        ))
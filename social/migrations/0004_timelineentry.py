@@ -0,0 +1,33 @@
+# Generated by Django 4.2.11 on 2026-10-18 01:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('social', '0003_delete_sharedworkout'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('author', models.ForeignKey(help_text='Denormalized post author for unfollow/block cleanup', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='social.post')),
+                ('user', models.ForeignKey(help_text='User whose home timeline contains the post', on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Timeline Entry',
+                'verbose_name_plural': 'Timeline Entries',
+                'db_table': 'social_timeline_entry',
+                'indexes': [models.Index(fields=['user', '-created_at'], name='social_time_user_id_0e2831_idx'), models.Index(fields=['user', 'author'], name='social_time_user_id_2bba06_idx')],
+                'unique_together': {('user', 'post')},
+            },
+        ),
+    ]
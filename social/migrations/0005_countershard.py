@@ -0,0 +1,30 @@
+# Generated by Django 4.2.11 on 2026-10-18 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0004_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounterShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(choices=[('post_likes', 'Post.likes_count'), ('comment_likes', 'Comment.likes_count')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('delta', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Counter Shard',
+                'verbose_name_plural': 'Counter Shards',
+                'db_table': 'social_counter_shard',
+                'indexes': [models.Index(fields=['target', 'object_id'], name='social_coun_target_870667_idx')],
+                'unique_together': {('target', 'object_id', 'shard')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.11 on 2026-10-18 01:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('social', '0007_notificationevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='social.post')),
+                ('score', models.FloatField()),
+                ('likes_count', models.PositiveIntegerField(default=0)),
+                ('comments_count', models.PositiveIntegerField(default=0)),
+                ('shares_count', models.PositiveIntegerField(default=0)),
+                ('author', models.ForeignKey(help_text='Denormalized post author for block filtering', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Trending Post',
+                'verbose_name_plural': 'Trending Posts',
+                'db_table': 'social_trending_post',
+                'indexes': [models.Index(fields=['-score'], name='social_tren_score_baf5d9_idx')],
+            },
+        ),
+    ]
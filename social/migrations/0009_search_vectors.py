@@ -0,0 +1,67 @@
+# Generated by Django 4.2.11 on 2026-10-18 01:37
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# GIN/trigram indexes only exist on PostgreSQL; other backends use the
+# in-memory fallback in social.search
+PG_INDEXES = [
+    ('social_prof_search_gin', 'social_user_profile USING gin (search_vector)'),
+    ('social_prof_username_trgm', 'social_user_profile USING gin (username gin_trgm_ops)'),
+    ('social_post_search_gin', 'social_post USING gin (search_vector)'),
+]
+
+BACKFILL = [
+    """
+    UPDATE social_user_profile p SET search_vector =
+        setweight(to_tsvector(%(config)s, coalesce(p.username, '')), 'A') ||
+        setweight(to_tsvector(%(config)s, coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '')), 'A') ||
+        setweight(to_tsvector(%(config)s, coalesce(p.bio, '')), 'B')
+    FROM auth_user u WHERE u.id = p.user_id
+    """,
+    """
+    UPDATE social_post SET search_vector = to_tsvector(%(config)s, coalesce(caption, ''))
+    """,
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    config = getattr(settings, 'SOCIAL_SEARCH_CONFIG', 'english')
+    for sql in BACKFILL:
+        schema_editor.execute(sql, {'config': config})
+    for name, definition in PG_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {definition}')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in PG_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0008_trendingpost'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
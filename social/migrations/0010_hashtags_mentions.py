@@ -0,0 +1,79 @@
+# Generated by Django 4.2.11 on 2026-10-18 01:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('social', '0009_search_vectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Hashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Hashtag',
+                'verbose_name_plural': 'Hashtags',
+                'db_table': 'social_hashtag',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostHashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='social.hashtag')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hashtag_links', to='social.post')),
+            ],
+            options={
+                'verbose_name': 'Post Hashtag',
+                'verbose_name_plural': 'Post Hashtags',
+                'db_table': 'social_post_hashtag',
+                'indexes': [models.Index(fields=['hashtag', '-created_at'], name='social_post_hashtag_04378b_idx')],
+                'unique_together': {('post', 'hashtag')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Mention',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('author', models.ForeignKey(help_text='User who wrote the mention', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('comment', models.ForeignKey(blank=True, help_text='Set when the mention is in a comment rather than the caption', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to='social.comment')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to='social.post')),
+                ('user', models.ForeignKey(help_text='Mentioned user', on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Mention',
+                'verbose_name_plural': 'Mentions',
+                'db_table': 'social_mention',
+                'indexes': [models.Index(fields=['user', '-created_at'], name='social_ment_user_id_cca061_idx'), models.Index(fields=['post'], name='social_ment_post_id_fc422f_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HashtagTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the hour counted')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trend_buckets', to='social.hashtag')),
+            ],
+            options={
+                'verbose_name': 'Hashtag Trend',
+                'verbose_name_plural': 'Hashtag Trends',
+                'db_table': 'social_hashtag_trend',
+                'indexes': [models.Index(fields=['bucket'], name='social_hash_bucket_46448c_idx')],
+                'unique_together': {('hashtag', 'bucket')},
+            },
+        ),
+    ]
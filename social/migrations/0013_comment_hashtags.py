@@ -0,0 +1,30 @@
+# Generated by Django 4.2.11 on 2026-10-18 02:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0012_notification_actor_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentHashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hashtag_links', to='social.comment')),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comment_links', to='social.hashtag')),
+            ],
+            options={
+                'verbose_name': 'Comment Hashtag',
+                'verbose_name_plural': 'Comment Hashtags',
+                'db_table': 'social_comment_hashtag',
+                'indexes': [models.Index(fields=['hashtag', '-created_at'], name='social_comm_hashtag_bbaa69_idx')],
+                'unique_together': {('comment', 'hashtag')},
+            },
+        ),
+    ]
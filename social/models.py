@@ -7,9 +7,12 @@ Designed for 100k+ users with optimized queries and indexing
 from django.db import models
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinLengthValidator
 from django.utils import timezone
 
+from common import images
+
 
 # ============================================================
 # USER PROFILE EXTENSION (Social Layer)
@@ -68,6 +71,9 @@ class UserProfile(models.Model):
         help_text="Allow direct messages from followers"
     )
     
+    # Full-text search (PostgreSQL only; maintained by social.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -85,13 +91,63 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"@{self.username}"
     
+    # Dirty-field tracking: save() only writes columns changed since load
+    
+    def _tracked_values(self):
+        deferred = self.get_deferred_fields()
+        return {
+            field.attname: field.get_prep_value(field.value_from_object(self))
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname not in deferred
+        }
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._tracked_values()
+        return instance
+    
+    def get_dirty_fields(self):
+        """Names of fields changed since the row was loaded or last saved"""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        return [
+            name for name, value in self._tracked_values().items()
+            if name in loaded and loaded[name] != value
+        ]
+    
+    def save(self, *args, **kwargs):
+        """
+        Updates write only dirty fields (plus updated_at), so a stale copy
+        never overwrites counters maintained with F() expressions
+        Saving an unchanged profile is a no-op
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            dirty = self.get_dirty_fields()
+            if dirty is not None:
+                if not dirty:
+                    return
+                kwargs['update_fields'] = dirty + ['updated_at']
+        super().save(*args, **kwargs)
+        saved = kwargs.get('update_fields')
+        if saved is None or getattr(self, '_loaded_values', None) is None:
+            self._loaded_values = self._tracked_values()
+        else:
+            # Fields changed in memory but not saved here stay dirty
+            saved = {self._meta.get_field(name).attname for name in saved}
+            self._loaded_values.update(
+                (name, value) for name, value in self._tracked_values().items() if name in saved
+            )
+    
     def get_profile_picture_url(self):
         """Return profile picture URL or default"""
         if self.profile_picture:
             return self.profile_picture.url
         # Fallback to main profile picture if exists
         if hasattr(self.user, 'profile') and self.user.profile.profile_pic:
-            return self.user.profile.profile_pic.url
+            profile = self.user.profile
+            return images.rendition_url(profile.profile_pic, profile.profile_pic_renditions, 'thumb')
         return None
 
 
@@ -135,6 +191,11 @@ class Post(models.Model):
         help_text="Optional post image"
     )
     
+    # Image renditions (written by common.images off the request thread)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    
     # Engagement Stats (Denormalized)
     likes_count = models.PositiveIntegerField(default=0, db_index=True)
     comments_count = models.PositiveIntegerField(default=0)
@@ -146,6 +207,9 @@ class Post(models.Model):
         help_text="Soft delete flag"
     )
     
+    # Full-text search (PostgreSQL only; maintained by social.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -355,6 +419,59 @@ class Message(models.Model):
             self.is_read = True
             self.read_at = timezone.now()
             self.save(update_fields=['is_read', 'read_at'])
+            
+            # Keep the recipient's inbox badge in sync
+            Conversation.objects.filter(
+                user_id=self.recipient_id,
+                partner_id=self.sender_id,
+                unread_count__gt=0
+            ).update(unread_count=models.F('unread_count') - 1)
+
+
+# ============================================================
+# CONVERSATION MODEL (Inbox Summary)
+# ============================================================
+
+class Conversation(models.Model):
+    """
+    Inbox summary of a 1-to-1 conversation, one row per participant
+    Maintained on send/read so the inbox is a single indexed query
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='conversations',
+        help_text="Inbox owner"
+    )
+    partner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    
+    last_message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    last_activity_at = models.DateTimeField()
+    
+    # Messages from partner not yet read by user
+    unread_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'social_conversation'
+        unique_together = ('user', 'partner')
+        indexes = [
+            models.Index(fields=['user', '-last_activity_at']),
+        ]
+        verbose_name = 'Conversation'
+        verbose_name_plural = 'Conversations'
+    
+    def __str__(self):
+        return f"Conversation of user #{self.user_id} with user #{self.partner_id}"
 
 
 # ============================================================
@@ -404,6 +521,11 @@ class Notification(models.Model):
         blank=True
     )
     
+    # Number of actors folded into this notification ("12 people liked your post")
+    actor_count = models.PositiveIntegerField(default=1)
+    # Distinct actor ids behind actor_count, so repeat events are not counted twice
+    actor_ids = models.JSONField(default=list, blank=True, editable=False)
+    
     # Status
     is_read = models.BooleanField(default=False, db_index=True)
     
@@ -424,6 +546,55 @@ class Notification(models.Model):
         return f"{self.notification_type} for @{self.recipient.social_profile.username}"
 
 
+# ============================================================
+# NOTIFICATION EVENT MODEL (Async Queue)
+# ============================================================
+
+class NotificationEvent(models.Model):
+    """
+    Queued notification awaiting the process_notifications worker
+    Requests only insert here; the worker batches and coalesces them
+    into Notification rows
+    """
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    notification_type = models.CharField(
+        max_length=20,
+        choices=Notification.NOTIFICATION_TYPES
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'social_notification_event'
+        verbose_name = 'Notification Event'
+        verbose_name_plural = 'Notification Events'
+    
+    def __str__(self):
+        return f"{self.notification_type} event for user #{self.recipient_id}"
+
+
 # ============================================================
 # REPORT MODEL (Content Moderation)
 # ============================================================
@@ -524,3 +695,277 @@ class Block(models.Model):
     
     def __str__(self):
         return f"@{self.blocker.social_profile.username} blocked @{self.blocked.social_profile.username}"
+
+
+# ============================================================
+# TIMELINE MODEL (Materialized Home Feed)
+# ============================================================
+
+class TimelineEntry(models.Model):
+    """
+    Materialized home timeline row (fan-out-on-write)
+    One row per (reader, post) so the feed is a single indexed range read
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        help_text="User whose home timeline contains the post"
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="Denormalized post author for unfollow/block cleanup"
+    )
+    
+    # Copy of post.created_at so ordering never leaves this table
+    created_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'social_timeline_entry'
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['user', 'author']),
+        ]
+        verbose_name = 'Timeline Entry'
+        verbose_name_plural = 'Timeline Entries'
+    
+    def __str__(self):
+        return f"Post #{self.post_id} in timeline of user #{self.user_id}"
+
+
+# ============================================================
+# COUNTER SHARD MODEL (Buffered Hot Counters)
+# ============================================================
+
+class CounterShard(models.Model):
+    """
+    Pending delta for a hot denormalized counter
+    Increments are spread over several shard rows to avoid a single row lock
+    and folded into the real column by the flush_counter_shards command
+    """
+    TARGET_CHOICES = [
+        ('post_likes', 'Post.likes_count'),
+        ('comment_likes', 'Comment.likes_count'),
+    ]
+    
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    shard = models.PositiveSmallIntegerField()
+    delta = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'social_counter_shard'
+        unique_together = ('target', 'object_id', 'shard')
+        indexes = [
+            models.Index(fields=['target', 'object_id']),
+        ]
+        verbose_name = 'Counter Shard'
+        verbose_name_plural = 'Counter Shards'
+    
+    def __str__(self):
+        return f"{self.target} #{self.object_id} shard {self.shard}: {self.delta:+d}"
+
+
+# ============================================================
+# TRENDING MODEL (Precomputed Explore Ranking)
+# ============================================================
+
+class TrendingPost(models.Model):
+    """
+    Time-decayed trending score of a recent post
+    Maintained by the refresh_trending command; explore reads the top rows
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="Denormalized post author for block filtering"
+    )
+    score = models.FloatField()
+    
+    # Engagement the score was computed from; rows are rescored when these drift
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    shares_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'social_trending_post'
+        indexes = [
+            models.Index(fields=['-score']),
+        ]
+        verbose_name = 'Trending Post'
+        verbose_name_plural = 'Trending Posts'
+    
+    def __str__(self):
+        return f"Post #{self.post_id} trending score {self.score:.3f}"
+
+
+# ============================================================
+# HASHTAG & MENTION MODELS (Parsed From Captions/Comments)
+# ============================================================
+
+class Hashtag(models.Model):
+    """
+    Normalized (lowercase) hashtag parsed from post captions and comments
+    """
+    name = models.CharField(max_length=100, unique=True)
+    
+    # Active posts whose caption carries the tag (Denormalized); tags used
+    # only in comments stay at 0 but still count towards trending
+    posts_count = models.PositiveIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'social_hashtag'
+        verbose_name = 'Hashtag'
+        verbose_name_plural = 'Hashtags'
+    
+    def __str__(self):
+        return f"#{self.name}"
+
+
+class PostHashtag(models.Model):
+    """
+    Post <-> hashtag link
+    Browsing a tag is one indexed range read on (hashtag, -created_at)
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='hashtag_links'
+    )
+    hashtag = models.ForeignKey(
+        Hashtag,
+        on_delete=models.CASCADE,
+        related_name='post_links'
+    )
+    
+    # Copy of post.created_at so ordering never leaves this table
+    created_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'social_post_hashtag'
+        unique_together = ('post', 'hashtag')
+        indexes = [
+            models.Index(fields=['hashtag', '-created_at']),
+        ]
+        verbose_name = 'Post Hashtag'
+        verbose_name_plural = 'Post Hashtags'
+    
+    def __str__(self):
+        return f"Post #{self.post_id} tagged #{self.hashtag_id}"
+
+
+class CommentHashtag(models.Model):
+    """
+    Comment <-> hashtag link
+    Comment tags feed trending usage; they do not add the post to the tag
+    """
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        related_name='hashtag_links'
+    )
+    hashtag = models.ForeignKey(
+        Hashtag,
+        on_delete=models.CASCADE,
+        related_name='comment_links'
+    )
+    created_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'social_comment_hashtag'
+        unique_together = ('comment', 'hashtag')
+        indexes = [
+            models.Index(fields=['hashtag', '-created_at']),
+        ]
+        verbose_name = 'Comment Hashtag'
+        verbose_name_plural = 'Comment Hashtags'
+    
+    def __str__(self):
+        return f"Comment #{self.comment_id} tagged #{self.hashtag_id}"
+
+
+class Mention(models.Model):
+    """
+    @username mention in a post caption or comment
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='mentions'
+    )
+    comment = models.ForeignKey(
+        Comment,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        help_text="Set when the mention is in a comment rather than the caption"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        help_text="Mentioned user"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="User who wrote the mention"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'social_mention'
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['post']),
+        ]
+        verbose_name = 'Mention'
+        verbose_name_plural = 'Mentions'
+    
+    def __str__(self):
+        return f"User #{self.user_id} mentioned on Post #{self.post_id}"
+
+
+class HashtagTrend(models.Model):
+    """
+    Hourly usage counter of a hashtag
+    Incremented as posts and comments are created; trending tags sum the recent buckets
+    """
+    hashtag = models.ForeignKey(
+        Hashtag,
+        on_delete=models.CASCADE,
+        related_name='trend_buckets'
+    )
+    bucket = models.DateTimeField(help_text="Start of the hour counted")
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'social_hashtag_trend'
+        unique_together = ('hashtag', 'bucket')
+        indexes = [
+            models.Index(fields=['bucket']),
+        ]
+        verbose_name = 'Hashtag Trend'
+        verbose_name_plural = 'Hashtag Trends'
+    
+    def __str__(self):
+        return f"#{self.hashtag_id} x{self.count} at {self.bucket:%Y-%m-%d %H:00}"
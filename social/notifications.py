@@ -0,0 +1,202 @@
+"""
+FitMitra Social Notifications
+Request-side enqueue and the batching/coalescing worker behind
+the process_notifications command; without the queue the same
+coalescing runs in the request
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Notification, NotificationEvent
+from . import badges, realtime
+
+
+# Queue notifications for the worker instead of writing them in the request
+# The worker publishes and invalidates badges from its own process, so this
+# needs a shared cache and realtime broker; off, the request coalesces itself
+ASYNC = getattr(settings, 'SOCIAL_ASYNC_NOTIFICATIONS', False)
+
+# Unread notifications of these types absorb new events for the same post
+COALESCE_TYPES = ('like',)
+
+# How far back an unread notification may be reused for coalescing
+COALESCE_WINDOW = timedelta(
+    seconds=getattr(settings, 'SOCIAL_NOTIFICATION_COALESCE_WINDOW', 3600)
+)
+
+
+# ============================================================
+# ENQUEUE
+# ============================================================
+
+def notify(recipient_id, actor_id, notification_type, post_id=None, comment_id=None):
+    """
+    Record that actor did something recipient should hear about
+    Queued with one INSERT when ASYNC, otherwise coalesced and written
+    here; self-notifications are ignored. Returns the queued event or the
+    number of notification rows written
+    """
+    if recipient_id == actor_id:
+        return None
+
+    fields = {
+        'recipient_id': recipient_id,
+        'actor_id': actor_id,
+        'notification_type': notification_type,
+        'post_id': post_id,
+        'comment_id': comment_id,
+    }
+    if ASYNC:
+        return NotificationEvent.objects.create(**fields)
+    return _process_now([NotificationEvent(**fields)])
+
+
+def notify_many(recipient_ids, actor_id, notification_type, post_id=None, comment_id=None):
+    """
+    notify() for many recipients of the same event in one INSERT
+    Returns the number of rows queued or created
+    """
+    fields = {
+        'actor_id': actor_id,
+        'notification_type': notification_type,
+        'post_id': post_id,
+        'comment_id': comment_id,
+    }
+    recipient_ids = {user_id for user_id in recipient_ids if user_id != actor_id}
+    if not recipient_ids:
+        return 0
+
+    events = [NotificationEvent(recipient_id=user_id, **fields) for user_id in recipient_ids]
+    if ASYNC:
+        NotificationEvent.objects.bulk_create(events)
+    else:
+        _process_now(events)
+    return len(recipient_ids)
+
+
+# ============================================================
+# WORKER
+# ============================================================
+
+def _coalesce_key(event):
+    return (event.recipient_id, event.notification_type, event.post_id)
+
+
+def _publish(rows):
+    for row in rows:
+        realtime.publish_notification(row)
+
+
+def _process_batch(events):
+    """Turn one batch of events into Notification rows; returns rows touched"""
+    singles = []
+    groups = defaultdict(list)
+    for event in events:
+        if event.notification_type in COALESCE_TYPES:
+            groups[_coalesce_key(event)].append(event)
+        else:
+            singles.append(event)
+
+    # Unread notifications the grouped events can be folded into, locked
+    # so concurrent workers merge actors one at a time
+    existing = {}
+    if groups:
+        candidates = Notification.objects.select_for_update().filter(
+            recipient_id__in={key[0] for key in groups},
+            notification_type__in=COALESCE_TYPES,
+            post_id__in={key[2] for key in groups},
+            is_read=False,
+            created_at__gte=timezone.now() - COALESCE_WINDOW
+        ).order_by('created_at').values_list(
+            'id', 'recipient_id', 'notification_type', 'post_id', 'actor_id', 'actor_ids'
+        )
+        for notification_id, recipient_id, notification_type, post_id, actor_id, actor_ids in candidates:
+            # Latest wins; rows predating actor_ids know only their last actor
+            existing[(recipient_id, notification_type, post_id)] = (
+                notification_id, actor_ids or [actor_id]
+            )
+
+    new_rows = []
+    updated_ids = []
+    for key, group in groups.items():
+        latest = group[-1]
+        actor_ids = list(dict.fromkeys(event.actor_id for event in group))
+        if key in existing:
+            notification_id, known = existing[key]
+            merged = known + [actor_id for actor_id in actor_ids if actor_id not in known]
+            Notification.objects.filter(pk=notification_id).update(
+                actor_id=latest.actor_id,
+                actor_ids=merged,
+                actor_count=F('actor_count') + (len(merged) - len(known)),
+                created_at=latest.created_at
+            )
+            updated_ids.append(notification_id)
+        else:
+            new_rows.append(Notification(
+                recipient_id=latest.recipient_id,
+                actor_id=latest.actor_id,
+                notification_type=latest.notification_type,
+                post_id=latest.post_id,
+                actor_count=len(actor_ids),
+                actor_ids=actor_ids
+            ))
+
+    new_rows.extend(
+        Notification(
+            recipient_id=event.recipient_id,
+            actor_id=event.actor_id,
+            notification_type=event.notification_type,
+            post_id=event.post_id,
+            comment_id=event.comment_id
+        )
+        for event in singles
+    )
+
+    # bulk_create skips post_save, so push to realtime streams explicitly
+    created = Notification.objects.bulk_create(new_rows)
+    pushed = [row for row in created if row.pk] + list(
+        Notification.objects.filter(pk__in=updated_ids)
+    )
+    transaction.on_commit(lambda: _publish(pushed))
+    badges.invalidate(*{event.recipient_id for event in events})
+
+    return len(new_rows) + len(updated_ids)
+
+
+def _process_now(events):
+    """Run unsaved events through the worker's batch step inside the request"""
+    now = timezone.now()
+    for event in events:
+        event.created_at = now
+    with transaction.atomic():
+        return _process_batch(events)
+
+
+def process_events(batch_size=500):
+    """
+    Drain the event queue in id order, one transaction per batch
+    Events locked by a concurrent worker are skipped
+    Returns (events processed, notification rows written)
+    """
+    processed = written = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                NotificationEvent.objects.select_for_update(
+                    skip_locked=True
+                ).order_by('id')[:batch_size]
+            )
+            if not events:
+                return processed, written
+
+            written += _process_batch(events)
+            NotificationEvent.objects.filter(
+                id__in=[event.id for event in events]
+            ).delete()
+            processed += len(events)
@@ -0,0 +1,196 @@
+"""
+FitMitra Social Pagination
+Page-number pagination with an opt-in keyset (cursor) mode for deep scrolling
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# ============================================================
+# CURSOR ENCODING
+# ============================================================
+
+def encode_cursor(values):
+    """Encode keyset values as an opaque url-safe token"""
+    payload = json.dumps(
+        [value.isoformat() if hasattr(value, 'isoformat') else value for value in values],
+        separators=(',', ':'),
+        default=str
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a token from encode_cursor, raising NotFound when malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise NotFound('Invalid cursor')
+    if not isinstance(values, list):
+        raise NotFound('Invalid cursor')
+    return values
+
+
+# ============================================================
+# KEYSET HELPERS
+# ============================================================
+
+def get_keyset_ordering(queryset):
+    """
+    Return the queryset ordering as [(field, descending)], with a primary
+    key tie-breaker so every row has a unique, stable position
+    """
+    ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering) or ['-pk']
+
+    keyset = []
+    for field in ordering:
+        if not isinstance(field, str):
+            raise TypeError('Keyset pagination only supports field-name ordering')
+        descending = field.startswith('-')
+        name = field.lstrip('-')
+        keyset.append((queryset.model._meta.pk.name if name == 'pk' else name, descending))
+
+    pk_name = queryset.model._meta.pk.name
+    if not any(name == pk_name for name, _ in keyset):
+        keyset.append((pk_name, keyset[-1][1]))
+
+    return keyset
+
+
+def get_keyset_values(obj, ordering):
+    """Read the ordering values of a row (follows `__` relations)"""
+    values = []
+    for name, _ in ordering:
+        value = obj
+        for attr in name.split('__'):
+            value = getattr(value, attr)
+        values.append(value)
+    return values
+
+
+def _ordering_field(queryset, name):
+    """Model field (or annotation output field) behind an ordering name"""
+    annotation = queryset.query.annotations.get(name)
+    if annotation is not None:
+        return annotation.output_field
+    model = queryset.model
+    *relations, last = name.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    field = model._meta.get_field(last)
+    return field.target_field if field.is_relation else field
+
+
+def cursor_values(queryset, ordering, token):
+    """
+    Decode token into Python values typed like the ordering fields, so a
+    tampered cursor is a NotFound rather than an error while filtering
+    """
+    values = decode_cursor(token)
+    if len(values) != len(ordering):
+        raise NotFound('Invalid cursor')
+    try:
+        typed = [
+            _ordering_field(queryset, name).to_python(value)
+            for (name, _), value in zip(ordering, values)
+        ]
+    except (FieldDoesNotExist, ValidationError, TypeError, ValueError):
+        raise NotFound('Invalid cursor')
+    if any(value is None for value in typed):
+        raise NotFound('Invalid cursor')
+    return typed
+
+
+def keyset_filter(ordering, values):
+    """
+    Build the row-comparison predicate `(a, b, c) < (x, y, z)` as an OR of
+    prefix-equality terms so each term can use a composite index
+    """
+    if len(values) != len(ordering):
+        raise NotFound('Invalid cursor')
+
+    condition = Q()
+    for position, (name, descending) in enumerate(ordering):
+        term = {
+            ordering[i][0]: values[i]
+            for i in range(position)
+        }
+        term[f"{name}__{'lt' if descending else 'gt'}"] = values[position]
+        condition |= Q(**term)
+    return condition
+
+
+# ============================================================
+# PAGINATION CLASSES
+# ============================================================
+
+class KeysetPaginationMixin:
+    """
+    Adds an opaque cursor mode to page-number pagination
+    Clients opt in with `?cursor=` (empty for the first page) and then follow
+    `next`; cursor pages skip COUNT(*) and OFFSET and stay stable while new
+    rows are inserted at the head of the list
+    """
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = get_keyset_ordering(queryset)
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(
+                keyset_filter(self.ordering, cursor_values(queryset, self.ordering, token))
+            )
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not getattr(self, 'use_cursor', False):
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        token = encode_cursor(get_keyset_values(self.page[-1], self.ordering))
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_paginated_response(self, data):
+        if not getattr(self, 'use_cursor', False):
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data)
+        ]))
+
+
+class StandardPagination(KeysetPaginationMixin, PageNumberPagination):
+    """Standard pagination for lists"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class FeedPagination(KeysetPaginationMixin, PageNumberPagination):
+    """Pagination for feed"""
+    page_size = 15
+    page_size_query_param = 'page_size'
+    max_page_size = 50
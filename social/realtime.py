@@ -0,0 +1,170 @@
+"""
+FitMitra Social Realtime
+Server-Sent Events push channel for new messages and notifications
+Served by the ASGI application; publishes go through a pluggable broker
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_SECONDS = getattr(settings, 'SOCIAL_REALTIME_KEEPALIVE', 20)
+
+# Streams are closed after this many seconds; EventSource reconnects on its own
+MAX_STREAM_SECONDS = getattr(settings, 'SOCIAL_REALTIME_MAX_AGE', 300)
+
+# Events buffered per connection before the oldest are dropped
+QUEUE_SIZE = 100
+
+
+# ============================================================
+# BROKER
+# ============================================================
+
+class InProcessBroker:
+    """
+    Per-user fan-out to asyncio queues owned by the ASGI event loop
+    Only reaches clients connected to this worker process; point
+    SOCIAL_REALTIME_BROKER at a shared implementation (same interface)
+    to deliver across processes
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id):
+        """Register a queue for user_id; must be called on the event loop"""
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[user_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.difference_update({sub for sub in subscribers if sub[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id, event, data):
+        """Thread-safe; callable from sync views and signal handlers"""
+        payload = f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._put, queue, payload)
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    @staticmethod
+    def _put(queue, payload):
+        if queue.full():
+            queue.get_nowait()  # Slow consumer: drop the oldest event
+        queue.put_nowait(payload)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_path = getattr(
+                    settings, 'SOCIAL_REALTIME_BROKER', 'social.realtime.InProcessBroker'
+                )
+                _broker = import_string(broker_path)()
+    return _broker
+
+
+# ============================================================
+# PUBLISHERS
+# ============================================================
+
+def publish_message(message):
+    get_broker().publish(message.recipient_id, 'message', {
+        'id': message.id,
+        'sender_id': message.sender_id,
+        'recipient_id': message.recipient_id,
+        'text': message.text,
+        'created_at': message.created_at,
+    })
+
+
+def publish_notification(notification):
+    get_broker().publish(notification.recipient_id, 'notification', {
+        'id': notification.id,
+        'notification_type': notification.notification_type,
+        'actor_id': notification.actor_id,
+        'post_id': notification.post_id,
+        'comment_id': notification.comment_id,
+        'created_at': notification.created_at,
+    })
+
+
+# ============================================================
+# STREAM VIEW
+# ============================================================
+
+def _authenticate(request):
+    """
+    Resolve the user id from a JWT access token without touching the DB
+    EventSource cannot send headers, so `?token=` is accepted as well
+    """
+    raw_token = request.GET.get('token')
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        raw_token = header.split(' ', 1)[1]
+    if not raw_token:
+        return None
+    try:
+        return AccessToken(raw_token)[jwt_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+
+
+async def event_stream(request):
+    """
+    GET /api/social/stream/ -- text/event-stream of `message` and
+    `notification` events for the authenticated user
+    """
+    user_id = _authenticate(request)
+    if user_id is None:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    async def events():
+        # Subscribe lazily so the queue belongs to the server's event loop
+        broker = get_broker()
+        queue = broker.subscribe(user_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + MAX_STREAM_SECONDS
+        try:
+            yield "retry: 3000\n\n"
+            while loop.time() < deadline:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            broker.unsubscribe(user_id, queue)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,315 @@
+"""
+FitMitra Social Search
+Ranked profile and post search
+
+PostgreSQL: stored tsvector columns (GIN indexed) ranked with ts_rank,
+plus pg_trgm similarity on usernames for typo tolerance
+Other backends (SQLite dev/test runs): a per-process in-memory inverted
+index with the same prefix/typo semantics, so search can be exercised
+and benchmarked locally
+"""
+
+import difflib
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+)
+from django.db import connection
+from django.db.models import Case, F, FloatField, OuterRef, Q, Subquery, Value, When
+
+from .models import Post, UserProfile
+
+
+CONFIG = getattr(settings, 'SOCIAL_SEARCH_CONFIG', 'english')
+
+# Maximum results ranked by the in-memory fallback
+FALLBACK_LIMIT = 500
+
+# Field weights used by the fallback (mirror tsvector weights A/B)
+WEIGHT_A = 1.0
+WEIGHT_B = 0.4
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def use_postgres():
+    return connection.vendor == 'postgresql'
+
+
+# ============================================================
+# IN-MEMORY FALLBACK INDEX
+# ============================================================
+
+class InvertedIndex:
+    """
+    term -> {doc_id: weight} postings with a sorted vocabulary for
+    prefix expansion; built lazily from `loader` on first search
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._postings = None
+        self._doc_terms = {}
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+    def _ensure_built(self):
+        if self._postings is None:
+            self._postings = defaultdict(dict)
+            for doc_id, fields in self._loader():
+                self._add(doc_id, fields)
+            self._vocabulary = sorted(self._postings)
+
+    def _add(self, doc_id, fields):
+        terms = {}
+        for text, weight in fields:
+            for term in tokenize(text):
+                terms[term] = terms.get(term, 0) + weight
+        for term, weight in terms.items():
+            self._postings[term][doc_id] = weight
+        self._doc_terms[doc_id] = set(terms)
+        self._vocabulary_dirty = True
+
+    def _remove(self, doc_id):
+        for term in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._vocabulary_dirty = True
+
+    @property
+    def is_built(self):
+        return self._postings is not None
+
+    def update(self, doc_id, fields):
+        """Replace a document; no-op until the index has been built"""
+        with self._lock:
+            if self._postings is None:
+                return
+            self._remove(doc_id)
+            if fields:
+                self._add(doc_id, fields)
+
+    def remove(self, doc_id):
+        self.update(doc_id, None)
+
+    def _expand(self, term, fuzzy):
+        """Vocabulary terms matching `term` by prefix, else by edit similarity"""
+        start = bisect_left(self._vocabulary, term)
+        matches = []
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(term):
+                break
+            matches.append(candidate)
+        if not matches and fuzzy:
+            matches = difflib.get_close_matches(term, self._vocabulary, n=3, cutoff=0.75)
+        return matches
+
+    def search(self, query, fuzzy=False, limit=FALLBACK_LIMIT):
+        """[(doc_id, score)] of documents matching every query term, best first"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            self._ensure_built()
+            if self._vocabulary_dirty:
+                self._vocabulary = sorted(self._postings)
+                self._vocabulary_dirty = False
+
+            total = len(self._doc_terms) or 1
+            scores = None
+            for term in terms:
+                term_scores = defaultdict(float)
+                for match in self._expand(term, fuzzy):
+                    postings = self._postings[match]
+                    idf = math.log(1 + total / len(postings))
+                    for doc_id, weight in postings.items():
+                        term_scores[doc_id] = max(term_scores[doc_id], weight * idf)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        doc_id: score + term_scores[doc_id]
+                        for doc_id, score in scores.items()
+                        if doc_id in term_scores
+                    }
+                if not scores:
+                    return []
+
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:limit]
+
+
+def _profile_fields(username, first_name, last_name, bio):
+    return [(username, WEIGHT_A), (f'{first_name} {last_name}', WEIGHT_A), (bio, WEIGHT_B)]
+
+
+def _load_profiles():
+    rows = UserProfile.objects.values_list(
+        'id', 'username', 'user__first_name', 'user__last_name', 'bio'
+    )
+    for profile_id, *fields in rows.iterator():
+        yield profile_id, _profile_fields(*fields)
+
+
+def _load_posts():
+    rows = Post.objects.filter(is_active=True).values_list('id', 'caption')
+    for post_id, caption in rows.iterator():
+        yield post_id, [(caption, WEIGHT_A)]
+
+
+profile_index = InvertedIndex(_load_profiles)
+post_index = InvertedIndex(_load_posts)
+
+
+# ============================================================
+# MAINTENANCE (called from signals)
+# ============================================================
+
+def _profile_vector():
+    return (
+        SearchVector('username', 'user__first_name', 'user__last_name', weight='A', config=CONFIG)
+        + SearchVector('bio', weight='B', config=CONFIG)
+    )
+
+
+def _vector_subquery(model, vector):
+    # Joined columns cannot appear in UPDATE ... SET, so go through a subquery
+    return Subquery(
+        model.objects.filter(pk=OuterRef('pk')).annotate(vector=vector).values('vector')[:1]
+    )
+
+
+def _reindex_profiles(profiles):
+    if use_postgres():
+        profiles.update(search_vector=_vector_subquery(UserProfile, _profile_vector()))
+    elif profile_index.is_built:
+        rows = profiles.values_list('id', 'username', 'user__first_name', 'user__last_name', 'bio')
+        for profile_id, *fields in rows:
+            profile_index.update(profile_id, _profile_fields(*fields))
+
+
+def index_profile(profile):
+    _reindex_profiles(UserProfile.objects.filter(pk=profile.pk))
+
+
+def index_user(user):
+    """Reindex user's profile after a first/last name change"""
+    _reindex_profiles(UserProfile.objects.filter(user_id=user.pk))
+
+
+def index_post(post):
+    if use_postgres():
+        Post.objects.filter(pk=post.pk).update(
+            search_vector=SearchVector(Value(post.caption), config=CONFIG)
+        )
+    elif post.is_active:
+        post_index.update(post.pk, [(post.caption, WEIGHT_A)])
+    else:
+        post_index.remove(post.pk)
+
+
+def rebuild_vectors(chunk_size=5000):
+    """Recompute stored vectors in pk chunks (PostgreSQL); yields (label, rows)"""
+    if not use_postgres():
+        return
+    specs = (
+        ('profiles', UserProfile, _profile_vector()),
+        ('posts', Post, SearchVector('caption', config=CONFIG)),
+    )
+    for label, model, vector in specs:
+        computed = _vector_subquery(model, vector)
+        updated = 0
+        last_pk = 0
+        max_pk = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        while last_pk < max_pk:
+            updated += model.objects.filter(
+                pk__gt=last_pk, pk__lte=last_pk + chunk_size
+            ).update(search_vector=computed)
+            last_pk += chunk_size
+        yield label, updated
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def _prefix_query(terms):
+    """tsquery matching every term as a prefix; terms are word characters only"""
+    return SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms),
+        search_type='raw',
+        config=CONFIG
+    )
+
+
+def _ranked(queryset, results):
+    """Restrict to fallback results, annotated and ordered by their score"""
+    if not results:
+        return queryset.none()
+
+    # One CASE branch per distinct score keeps the SQL small on tied results
+    by_score = defaultdict(list)
+    for doc_id, score in results:
+        by_score[score].append(doc_id)
+
+    return queryset.filter(
+        pk__in=[doc_id for doc_id, _ in results]
+    ).annotate(
+        rank=Case(
+            *[When(pk__in=doc_ids, then=Value(score)) for score, doc_ids in by_score.items()],
+            output_field=FloatField()
+        )
+    ).order_by('-rank', '-pk')
+
+
+def search_profiles(query):
+    """
+    Profiles matching every word of `query` by prefix (username, name, bio),
+    plus usernames within trigram distance of it; best match first
+    """
+    terms = tokenize(query)
+    if not terms:
+        return UserProfile.objects.none()
+
+    if not use_postgres():
+        return _ranked(UserProfile.objects.all(), profile_index.search(query, fuzzy=True))
+
+    username = query.strip().lstrip('@').lower()
+    tsquery = _prefix_query(terms)
+    return UserProfile.objects.filter(
+        Q(search_vector=tsquery) | Q(username__trigram_similar=username)
+    ).annotate(
+        rank=SearchRank(F('search_vector'), tsquery) + TrigramSimilarity('username', username)
+    ).order_by('-rank', '-pk')
+
+
+def search_posts(query):
+    """Active posts whose caption matches every word of `query`; best match first"""
+    terms = tokenize(query)
+    if not terms:
+        return Post.objects.none()
+
+    if not use_postgres():
+        return _ranked(Post.objects.filter(is_active=True), post_index.search(query))
+
+    tsquery = _prefix_query(terms)
+    return Post.objects.filter(
+        is_active=True,
+        search_vector=tsquery
+    ).annotate(
+        rank=SearchRank(F('search_vector'), tsquery)
+    ).order_by('-rank', '-pk')
@@ -5,11 +5,14 @@ Optimized for performance with select_related and prefetch_related
 """
 
 from rest_framework import serializers
+from django.db import transaction
 from django.contrib.auth.models import User
+from common import images, uploads
 from .models import (
     UserProfile, Post, Like, Comment, Follow, 
     Message, Notification, Report, Block
 )
+from . import captions, conversations, counters, graph, timeline
 
 
 # ============================================================
@@ -46,23 +49,13 @@ class UserProfileSerializer(serializers.ModelSerializer):
     def get_is_following(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            from social.models import Follow
-            return Follow.objects.filter(
-                follower=request.user,
-                following=obj.user,
-                status='accepted'
-            ).exists()
+            return graph.is_following(request.user.id, obj.user_id)
         return False
 
     def get_follows_you(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            from social.models import Follow
-            return Follow.objects.filter(
-                follower=obj.user,
-                following=request.user,
-                status='accepted'
-            ).exists()
+            return graph.is_following(obj.user_id, request.user.id)
         return False
 
 
@@ -104,12 +97,10 @@ class UserMiniSerializer(serializers.ModelSerializer):
     def get_is_following(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            from social.models import Follow
-            return Follow.objects.filter(
-                follower=request.user,
-                following=obj,
-                status='accepted'
-            ).exists()
+            viewer = self.context.get('viewer')
+            if viewer is not None:
+                return viewer.is_following(obj)
+            return graph.is_following(request.user.id, obj.id)
         return False
 
 
@@ -120,17 +111,24 @@ class UserMiniSerializer(serializers.ModelSerializer):
 class PostSerializer(serializers.ModelSerializer):
     """
     Main post serializer with author info and engagement stats
+    image_url is the original upload; subclasses pick a smaller rendition
     """
+    # Rendition served as image_url (None = original)
+    image_rendition = None
+    
     author = UserMiniSerializer(read_only=True)
+    likes_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     can_edit = serializers.SerializerMethodField()
     can_delete = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
+    image_thumbnail_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Post
         fields = [
             'id', 'author', 'post_type', 'caption', 'image', 'image_url',
+            'image_thumbnail_url', 'image_width', 'image_height',
             'likes_count', 'comments_count', 'shares_count',
             'is_liked', 'can_edit', 'can_delete',
             'created_at', 'updated_at'
@@ -140,10 +138,21 @@ class PostSerializer(serializers.ModelSerializer):
             'shares_count', 'created_at', 'updated_at'
         ]
     
+    def get_likes_count(self, obj):
+        """Stored count plus any buffered (unflushed) like deltas"""
+        if not counters.BUFFERED:
+            return obj.likes_count
+        viewer = self.context.get('viewer')
+        pending = viewer.pending_likes if viewer is not None else None
+        return counters.current_value(obj, 'post_likes', pending)
+    
     def get_is_liked(self, obj):
         """Check if current user has liked this post"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            viewer = self.context.get('viewer')
+            if viewer is not None:
+                return viewer.has_liked(obj)
             return Like.objects.filter(user=request.user, post=obj).exists()
         return False
     
@@ -161,14 +170,22 @@ class PostSerializer(serializers.ModelSerializer):
             return obj.author == request.user
         return False
     
+    def _absolute(self, url):
+        request = self.context.get('request')
+        if url and request:
+            return request.build_absolute_uri(url)
+        return url
+    
     def get_image_url(self, obj):
-        """Get absolute URL for post image"""
-        if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
-        return None
+        """Get absolute URL for post image (rendition when one is ready)"""
+        if self.image_rendition is None:
+            return self._absolute(obj.image.url if obj.image else None)
+        return self._absolute(
+            images.rendition_url(obj.image, obj.image_renditions, self.image_rendition)
+        )
+    
+    def get_image_thumbnail_url(self, obj):
+        return self._absolute(images.rendition_url(obj.image, obj.image_renditions, 'thumb'))
 
 
 class PostCreateSerializer(serializers.ModelSerializer):
@@ -188,12 +205,25 @@ class PostCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create post and update user's post count"""
         user = self.context['request'].user
-        post = Post.objects.create(author=user, **validated_data)
         
-        # Update user's post count
-        if hasattr(user, 'social_profile'):
-            user.social_profile.posts_count += 1
-            user.social_profile.save(update_fields=['posts_count'])
+        with transaction.atomic():
+            # Identical image bytes already stored are reused, not written again
+            if validated_data.get('image'):
+                validated_data['image'] = uploads.store(validated_data['image'], Post, 'image')
+            
+            post = Post.objects.create(author=user, **validated_data)
+            
+            # WebP renditions are built in the background after commit
+            images.schedule(post, 'image')
+            
+            # Update user's post count
+            counters.adjust_profile(user.id, 'posts_count', 1)
+            
+            # Hashtag links and @mention notifications
+            captions.process_post(post)
+        
+        # Fan out to followers' home timelines
+        timeline.fan_out_post(post)
         
         return post
 
@@ -208,31 +238,45 @@ class CommentSerializer(serializers.ModelSerializer):
     """
     author = UserMiniSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
+    replies_cursor = serializers.SerializerMethodField()
     can_delete = serializers.SerializerMethodField()
     
     class Meta:
         model = Comment
         fields = [
             'id', 'post', 'author', 'text', 'parent',
-            'likes_count', 'replies', 'can_delete',
+            'likes_count', 'replies', 'replies_cursor', 'can_delete',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['author', 'likes_count', 'created_at', 'updated_at']
     
     def get_replies(self, obj):
         """Get nested replies (limit depth to avoid recursion)"""
-        if obj.parent is None:  # Only get replies for top-level comments
-            replies = obj.replies.filter(is_active=True).select_related(
-                'author', 'author__social_profile'
-            )[:5]  # Limit to 5 replies
+        if obj.parent_id is None:  # Only get replies for top-level comments
+            viewer = self.context.get('viewer')
+            replies = viewer.get_replies(obj) if viewer is not None else None
+            if replies is None:
+                replies = obj.replies.filter(is_active=True).select_related(
+                    'author', 'author__social_profile'
+                )[:5]  # Limit to 5 replies
             return CommentSerializer(replies, many=True, context=self.context).data
         return []
     
+    def get_replies_cursor(self, obj):
+        """Cursor for GET comments/<id>/replies/ when more replies exist"""
+        viewer = self.context.get('viewer')
+        if obj.parent_id is None and viewer is not None:
+            return viewer.get_replies_cursor(obj)
+        return None
+    
     def get_can_delete(self, obj):
         """Check if current user can delete this comment"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.author == request.user or obj.post.author == request.user
+            post_author_id = self.context.get('post_author_id')
+            if post_author_id is None:
+                post_author_id = obj.post.author_id
+            return request.user.id in (obj.author_id, post_author_id)
         return False
 
 
@@ -256,12 +300,15 @@ class CommentCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create comment and update post's comment count"""
         user = self.context['request'].user
-        comment = Comment.objects.create(author=user, **validated_data)
         
-        # Update post's comment count
-        post = validated_data['post']
-        post.comments_count += 1
-        post.save(update_fields=['comments_count'])
+        with transaction.atomic():
+            comment = Comment.objects.create(author=user, **validated_data)
+            
+            # Update post's comment count
+            counters.adjust_post(comment.post_id, 'comments_count', 1)
+            
+            # Hashtag links and @mention notifications
+            captions.process_comment(comment)
         
         return comment
 
@@ -340,11 +387,7 @@ class MessageCreateSerializer(serializers.ModelSerializer):
     
         # Relaxed logic: Allow messaging if user follows recipient 
         # OR if recipient has allow_messages=True
-        is_following = Follow.objects.filter(
-            follower=request.user,
-            following_id=recipient_id,
-            status='accepted'
-        ).exists()
+        is_following = graph.is_following(request.user.id, recipient_id)
         
         recipient_profile = UserProfile.objects.filter(user_id=recipient_id).first()
         allow_messages = recipient_profile.allow_messages if recipient_profile else True
@@ -361,22 +404,27 @@ class MessageCreateSerializer(serializers.ModelSerializer):
         recipient_id = validated_data.pop('recipient_id')
         recipient = User.objects.get(id=recipient_id)
         
-        message = Message.objects.create(
-            sender=self.context['request'].user,
-            recipient=recipient,
-            **validated_data
-        )
+        with transaction.atomic():
+            message = Message.objects.create(
+                sender=self.context['request'].user,
+                recipient=recipient,
+                **validated_data
+            )
+            
+            # Update both participants' inbox rows
+            conversations.record_message(message)
         
         return message
 
 
 class ConversationSerializer(serializers.Serializer):
     """
-    Serializer for conversation list
+    Serializer for conversation list (Conversation inbox rows)
     """
-    user = UserMiniSerializer()
+    user = UserMiniSerializer(source='partner')
     last_message = MessageSerializer()
     unread_count = serializers.IntegerField()
+    last_activity_at = serializers.DateTimeField()
 
 
 # ============================================================
@@ -393,10 +441,10 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = [
-            'id', 'actor', 'notification_type', 'post_data',
+            'id', 'actor', 'actor_count', 'notification_type', 'post_data',
             'is_read', 'created_at'
         ]
-        read_only_fields = ['actor', 'notification_type', 'created_at']
+        read_only_fields = ['actor', 'actor_count', 'notification_type', 'created_at']
     
     def get_post_data(self, obj):
         """Get minimal post data if notification is related to a post"""
@@ -447,7 +495,10 @@ class ReportSerializer(serializers.ModelSerializer):
 class FeedPostSerializer(PostSerializer):
     """
     Extended post serializer for feed with recent comments
+    Serves the medium image rendition instead of the original
     """
+    image_rendition = 'medium'
+    
     recent_comments = serializers.SerializerMethodField()
     
     class Meta(PostSerializer.Meta):
@@ -455,11 +506,14 @@ class FeedPostSerializer(PostSerializer):
     
     def get_recent_comments(self, obj):
         """Get 2 most recent comments"""
-        comments = obj.comments.filter(
-            is_active=True,
-            parent=None  # Only top-level comments
-        ).select_related(
-            'author', 'author__social_profile'
-        ).order_by('-created_at')[:2]
+        viewer = self.context.get('viewer')
+        comments = viewer.get_recent_comments(obj) if viewer is not None else None
+        if comments is None:
+            comments = obj.comments.filter(
+                is_active=True,
+                parent=None  # Only top-level comments
+            ).select_related(
+                'author', 'author__social_profile'
+            ).order_by('-created_at')[:2]
         
         return CommentSerializer(comments, many=True, context=self.context).data
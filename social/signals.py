@@ -3,10 +3,12 @@ FitMitra Social Signals
 Automatic actions triggered by model events
 """
 
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import UserProfile, Post, Message, Notification, Follow, Block
+from . import autocomplete, badges, caching, graph, realtime, search, usernames
 
 
 @receiver(post_save, sender=User)
@@ -15,26 +17,185 @@ def create_social_profile(sender, instance, created, **kwargs):
     Automatically create social profile when user is created
     """
     if created:
-        # Generate username from user's username or email
-        base_username = instance.username if instance.username else instance.email.split('@')[0]
-        username = base_username
-        
-        # Ensure username is unique
-        counter = 1
-        while UserProfile.objects.filter(username=username).exists():
-            username = f"{base_username}{counter}"
-            counter += 1
-        
-        UserProfile.objects.create(
-            user=instance,
-            username=username
-        )
+        # Username from user's username or email, suffixed until unique
+        usernames.create_profile(instance)
 
 
 @receiver(post_save, sender=User)
-def save_social_profile(sender, instance, **kwargs):
+def save_social_profile(sender, instance, created, **kwargs):
     """
-    Save social profile when user is saved
+    Save pending edits to the user's social profile when user is saved
+    Only a profile already loaded on the instance is considered, and it is
+    written only if it has dirty fields (logins never touch the profile)
     """
-    if hasattr(instance, 'social_profile'):
-        instance.social_profile.save()
+    if created or not User.social_profile.is_cached(instance):
+        return
+    try:
+        profile = instance.social_profile
+    except UserProfile.DoesNotExist:
+        return
+    if profile.get_dirty_fields():
+        profile.save()
+
+
+# User fields copied into profile search and profile responses
+NAME_FIELDS = ('first_name', 'last_name')
+
+
+def _loaded_names(user):
+    # Deferred fields are absent from __dict__ (unknown, not changed)
+    return {name: user.__dict__[name] for name in NAME_FIELDS if name in user.__dict__}
+
+
+@receiver(post_init, sender=User)
+def remember_user_names(sender, instance, **kwargs):
+    instance._loaded_names = _loaded_names(instance)
+
+
+@receiver(pre_save, sender=User)
+def detect_name_change(sender, instance, update_fields=None, **kwargs):
+    """
+    Flag saves that change first/last name, so password changes and admin
+    edits skip the profile reindex and response expiry
+    """
+    loaded = getattr(instance, '_loaded_names', {})
+    current = _loaded_names(instance)
+    saved = NAME_FIELDS if update_fields is None else set(NAME_FIELDS) & set(update_fields)
+    instance._names_changed = any(
+        name in current and (name not in loaded or loaded[name] != current[name])
+        for name in saved
+    )
+    instance._loaded_names = {**loaded, **current}
+
+
+@receiver(post_save, sender=User)
+def reindex_profile_name(sender, instance, created, **kwargs):
+    """
+    Profile search covers first/last name, which live on User
+    """
+    if not created and getattr(instance, '_names_changed', True):
+        search.index_user(instance)
+
+
+@receiver(post_save, sender=Message)
+def push_new_message(sender, instance, created, **kwargs):
+    """
+    Push new messages to the recipient's realtime stream once committed
+    """
+    if created:
+        transaction.on_commit(lambda: realtime.publish_message(instance))
+
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, **kwargs):
+    """
+    Push new notifications to the recipient's realtime stream once committed
+    """
+    if created:
+        transaction.on_commit(lambda: realtime.publish_notification(instance))
+
+
+@receiver(post_save, sender=Message)
+def refresh_message_badge(sender, instance, **kwargs):
+    """
+    Drop the recipient's cached unread counts on send and read
+    """
+    badges.invalidate(instance.recipient_id)
+
+
+@receiver(post_save, sender=Notification)
+def refresh_notification_badge(sender, instance, **kwargs):
+    """
+    Drop the recipient's cached unread counts on create and read
+    """
+    badges.invalidate(instance.recipient_id)
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def refresh_follow_graph(sender, instance, **kwargs):
+    """
+    Invalidate cached graph sets of both sides of a follow edge
+    """
+    graph.invalidate(instance.follower_id, instance.following_id)
+
+
+@receiver([post_save, post_delete], sender=Block)
+def refresh_block_graph(sender, instance, **kwargs):
+    """
+    Invalidate cached graph sets of both sides of a block
+    """
+    graph.invalidate(instance.blocker_id, instance.blocked_id)
+
+
+@receiver(post_save, sender=UserProfile)
+def index_profile(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Keep the profile's search vector (or fallback index entry) and its
+    autocomplete entry current when the fields they use change
+    """
+    changed = None if created or update_fields is None else set(update_fields)
+    
+    if changed is None or changed & {'username', 'bio'}:
+        search.index_profile(instance)
+    if changed is None or changed & {'username', 'followers_count', 'profile_picture'}:
+        autocomplete.index.update(instance)
+
+
+@receiver(post_delete, sender=UserProfile)
+def unindex_profile(sender, instance, **kwargs):
+    autocomplete.index.remove(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    """
+    Keep the post's search vector (or fallback index entry) current
+    """
+    search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.post_index.remove(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+def expire_profile_responses(sender, instance, created, **kwargs):
+    """
+    Drop cached profile responses under the old and new username
+    (the loaded snapshot still holds the pre-save values here)
+    """
+    if created:
+        return
+    previous = getattr(instance, '_loaded_values', {}).get('username')
+    caching.invalidate_profiles(instance.username, previous)
+
+
+@receiver(post_save, sender=User)
+def expire_user_responses(sender, instance, created, **kwargs):
+    """
+    Profile responses show the full name, which lives on User
+    """
+    if not created and getattr(instance, '_names_changed', True):
+        caching.invalidate_users(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def expire_follow_responses(sender, instance, **kwargs):
+    """
+    Follower lists, counts and is_following flags of both sides changed
+    """
+    caching.invalidate_users(instance.follower_id, instance.following_id)
+
+
+@receiver([post_save, post_delete], sender=Block)
+def expire_block_responses(sender, instance, **kwargs):
+    caching.invalidate_users(instance.blocker_id, instance.blocked_id)
+
+
+@receiver(post_save, sender=Post)
+def expire_post_responses(sender, instance, **kwargs):
+    """
+    The author's post list and posts_count changed
+    """
+    caching.invalidate_users(instance.author_id)
@@ -0,0 +1,500 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User, update_last_login
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from . import autocomplete, notifications, timeline
+from .pagination import encode_cursor
+from .viewer import RECENT_COMMENTS_LIMIT, REPLIES_LIMIT, ViewerContext
+from .models import (
+    Comment, Follow, Like, Notification, NotificationEvent, Post, TimelineEntry, UserProfile
+)
+
+
+def make_user(username):
+    return User.objects.create_user(username=username, email=f'{username}@example.com', password='pw-12345!')
+
+
+class ListingQueryCountTests(APITestCase):
+    """Post listings run a constant number of queries whatever the page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = make_user('viewer')
+        cls.author = make_user('author')
+        fans = [make_user(f'fan{i}') for i in range(3)]
+        Follow.objects.create(follower=cls.viewer, following=cls.author, status='accepted')
+
+        for i in range(25):
+            post = Post.objects.create(author=cls.author, caption=f'Workout {i}')
+            for fan in fans:
+                Like.objects.create(user=fan, post=post)
+                Comment.objects.create(post=post, author=fan, text='Nice')
+            Like.objects.create(user=cls.viewer, post=post)
+
+    def setUp(self):
+        self.client.force_authenticate(self.viewer)
+
+    def get(self, url, page_size):
+        # Cold caches, so both page sizes do the same lookups
+        for alias in caches:
+            caches[alias].clear()
+        response = self.client.get(url, {'page_size': page_size})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response
+
+    def assertConstantQueries(self, url):
+        with CaptureQueriesContext(connection) as small:
+            response = self.get(url, 5)
+        self.assertEqual(len(response.data['results']), 5)
+
+        with self.assertNumQueries(len(small.captured_queries)):
+            response = self.get(url, 20)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_feed(self):
+        self.assertConstantQueries('/api/social/feed/')
+
+    def test_explore(self):
+        self.client.force_authenticate(make_user('stranger'))
+        self.assertConstantQueries('/api/social/explore/')
+
+    def test_user_posts(self):
+        self.assertConstantQueries(f'/api/social/profiles/{self.author.social_profile.username}/posts/')
+
+
+class ProfileSaveTests(APITestCase):
+    """User saves (logins in particular) leave the social profile alone"""
+
+    def setUp(self):
+        self.user = make_user('ravi')
+
+    def profile_queries(self, queries):
+        return [query['sql'] for query in queries if UserProfile._meta.db_table in query['sql']]
+
+    def test_login_query_count(self):
+        # User lookup, login log, accounts/gym-owner profiles for the response
+        with self.assertNumQueries(4) as ctx:
+            response = self.client.post('/api/accounts/login/', {'username': 'ravi', 'password': 'pw-12345!'})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.profile_queries(ctx.captured_queries), [])
+
+    def test_last_login_update_skips_profile(self):
+        with CaptureQueriesContext(connection) as ctx:
+            update_last_login(None, self.user)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(self.profile_queries(ctx.captured_queries), [])
+
+    def test_clean_profile_is_not_written(self):
+        user = User.objects.select_related('social_profile').get(pk=self.user.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            user.last_login = timezone.now()
+            user.save()
+        self.assertEqual(self.profile_queries(ctx.captured_queries), [])
+
+    def test_dirty_profile_is_saved_with_user(self):
+        user = User.objects.select_related('social_profile').get(pk=self.user.pk)
+        user.social_profile.bio = 'Leg day'
+        user.save()
+        self.assertEqual(UserProfile.objects.get(user=user).bio, 'Leg day')
+
+    def test_partial_save_keeps_other_fields_dirty(self):
+        user = User.objects.select_related('social_profile').get(pk=self.user.pk)
+        profile = user.social_profile
+        profile.bio = 'Leg day'
+        profile.fitness_goal = 'Strength'
+        profile.save(update_fields=['bio'])
+        self.assertEqual(profile.get_dirty_fields(), ['fitness_goal'])
+        user.save()
+        saved = UserProfile.objects.get(user=user)
+        self.assertEqual((saved.bio, saved.fitness_goal), ('Leg day', 'Strength'))
+
+    def test_password_change_skips_profile(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('new-pw-678!')
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(self.profile_queries(ctx.captured_queries), [])
+
+    def test_name_change_expires_profile(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Ravi'
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertTrue(self.profile_queries(ctx.captured_queries))
+
+        # Saved names are the new baseline
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(self.profile_queries(ctx.captured_queries), [])
+
+
+class CursorTests(APITestCase):
+    """Tampered keyset cursors are rejected with 404, not a server error"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('author')
+        cls.posts = [Post.objects.create(author=cls.author, caption=f'Post {i}') for i in range(3)]
+
+    def get(self, cursor):
+        username = self.author.social_profile.username
+        return self.client.get(f'/api/social/profiles/{username}/posts/', {'cursor': cursor, 'page_size': 1})
+
+    def test_valid_cursor(self):
+        newest = self.posts[-1]
+        response = self.get(encode_cursor([newest.created_at, newest.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['id'], self.posts[-2].id)
+
+    def test_tampered_cursor(self):
+        newest = self.posts[-1]
+        for values in (
+            [newest.created_at, 'abc'],
+            ['yesterday', newest.id],
+            [newest.created_at.isoformat(), {'id': 1}],
+            [None, newest.id],
+            [newest.id],
+        ):
+            with self.subTest(values=values):
+                self.assertEqual(self.get(encode_cursor(values)).status_code, 404)
+        self.assertEqual(self.get('not-base64!').status_code, 404)
+
+
+class AutocompleteTests(APITestCase):
+    """Usernames differing only in case are separate index entries"""
+
+    def setUp(self):
+        self.index = autocomplete.UsernameIndex()
+        self.upper = make_user('Ravi').social_profile
+        self.lower = make_user('ravi').social_profile
+
+    def usernames(self, prefix):
+        return sorted(entry['username'] for entry in self.index.complete(prefix))
+
+    def test_case_variants_after_build(self):
+        self.index.rebuild()
+        self.assertEqual(self.usernames('RAV'), sorted([self.upper.username, self.lower.username]))
+
+    def test_case_variants_after_updates(self):
+        self.index.rebuild()
+        self.index.remove(self.upper.pk)
+        self.assertEqual(self.usernames('rav'), [self.lower.username])
+        self.index.update(self.upper)
+        self.assertEqual(self.usernames('rav'), sorted([self.upper.username, self.lower.username]))
+
+    def test_hidden_users_filtered_while_ranking(self):
+        fans = [make_user(f'rav{i}') for i in range(6)]
+        for i, fan in enumerate(fans):
+            UserProfile.objects.filter(user=fan).update(followers_count=10 + i)
+        self.index.rebuild()
+        hidden = {fan.id for fan in fans[2:]}
+
+        # Small range (scan) and crowded range (cached top list) agree
+        for scan_limit in (100, 1):
+            with self.subTest(scan_limit=scan_limit), \
+                    mock.patch.object(autocomplete, 'SCAN_LIMIT', scan_limit), \
+                    mock.patch.object(autocomplete, 'TOP_CACHE_SIZE', 3):
+                self.index._top = {}
+                results = self.index.complete('rav', limit=2, exclude_ids=hidden)
+                self.assertEqual([entry['id'] for entry in results], [fans[1].id, fans[0].id])
+
+    def test_lookup_after_fork_with_build_in_flight(self):
+        # A child forked while the parent's build thread held the lock
+        self.index._build_lock.acquire()
+        self.index._reset_locks()
+        self.assertEqual(len(self.index.complete('rav')), 2)
+
+    def test_warm_on_first_request(self):
+        from Backend import warmup
+        from explore import spatial
+        with mock.patch.object(autocomplete.index, 'warm') as warm, \
+                mock.patch.object(spatial.index, 'warm') as warm_gyms:
+            warmup.install()
+            self.addCleanup(warmup.request_started.disconnect, warmup._warm)
+            self.client.get('/api/social/autocomplete/')
+            self.client.get('/api/social/autocomplete/')
+        warm.assert_called_once_with()
+        warm_gyms.assert_called_once_with()
+
+
+class ImportTests(APITestCase):
+    """A malformed line is rejected without stopping the import or the reconcile"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = make_user('alice')
+        cls.bob = make_user('bob')
+        cls.post = Post.objects.create(author=cls.alice, caption='Deadlift day')
+
+    def run_import(self, suffix, content):
+        with tempfile.NamedTemporaryFile('wb', suffix=suffix, delete=False) as handle:
+            handle.write(content)
+        self.addCleanup(os.remove, handle.name)
+        out = StringIO()
+        call_command('import_social_graph', 'likes', handle.name, '--chunk-size', '1', stdout=out)
+        return out.getvalue()
+
+    def test_malformed_jsonl_line(self):
+        output = self.run_import('.jsonl', (
+            f'{{"user_id": {self.alice.id}, "post_id": {self.post.id}}}\n'
+            '{"user_id": oops\n'
+            f'{{"user_id": {self.bob.id}, "post_id": {self.post.id}}}\n'
+        ).encode())
+        self.assertIn('3 rows read, 2 accepted, 1 rejected', output)
+        self.assertIn('Rejected 1 malformed lines: 2', output)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).likes_count, 2)
+
+    def test_undecodable_csv_line(self):
+        output = self.run_import('.csv', (
+            b'user_id,post_id\n'
+            + f'{self.alice.id},{self.post.id}\n'.encode()
+            + b'\xff\xfe,1\n'
+            + f'{self.bob.id},{self.post.id}\n'.encode()
+        ))
+        self.assertIn('3 rows read, 2 accepted, 1 rejected', output)
+        self.assertIn('Rejected 1 malformed lines: 3', output)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).likes_count, 2)
+
+
+class NotificationTests(APITestCase):
+    """Likes coalesce the same way whether notifications are queued or written in the request"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('author')
+        cls.fans = [make_user('fan1'), make_user('fan2')]
+        cls.post = Post.objects.create(author=cls.author, caption='New PR')
+
+    def like(self, user, again=False):
+        self.client.force_authenticate(user)
+        url = f'/api/social/posts/{self.post.id}/'
+        if again:
+            self.client.post(url + 'unlike/')
+        self.assertEqual(self.client.post(url + 'like/').status_code, 201)
+
+    def like_notifications(self):
+        return list(Notification.objects.filter(
+            recipient=self.author, notification_type='like'
+        ).values_list('actor_count', 'actor_ids'))
+
+    def run_likes(self):
+        for fan in self.fans:
+            self.like(fan)
+        # Unlike and like again: still one actor
+        self.like(self.fans[0], again=True)
+
+    def test_likes_coalesce_in_request(self):
+        self.assertFalse(notifications.ASYNC)
+        self.run_likes()
+        self.assertEqual(self.like_notifications(), [(2, [fan.id for fan in self.fans])])
+        self.assertFalse(NotificationEvent.objects.exists())
+
+    def test_queued_likes_match_request_path(self):
+        with mock.patch.object(notifications, 'ASYNC', True):
+            self.run_likes()
+        self.assertEqual(NotificationEvent.objects.count(), 3)
+        self.assertEqual(self.like_notifications(), [])
+
+        self.assertEqual(notifications.process_events(), (3, 1))
+        self.assertEqual(self.like_notifications(), [(2, [fan.id for fan in self.fans])])
+        self.assertFalse(NotificationEvent.objects.exists())
+
+    def test_queued_like_merges_into_existing(self):
+        self.like(self.fans[0])
+        with mock.patch.object(notifications, 'ASYNC', True):
+            self.like(self.fans[1])
+            self.like(self.fans[0], again=True)
+        notifications.process_events()
+        self.assertEqual(self.like_notifications(), [(2, [fan.id for fan in self.fans])])
+
+    def test_read_notification_is_not_reused(self):
+        self.like(self.fans[0])
+        Notification.objects.update(is_read=True)
+        self.like(self.fans[1])
+        self.assertEqual(
+            sorted(self.like_notifications()),
+            [(1, [self.fans[0].id]), (1, [self.fans[1].id])]
+        )
+
+    def test_notify_many(self):
+        for asynchronous in (False, True):
+            with self.subTest(asynchronous=asynchronous), mock.patch.object(notifications, 'ASYNC', asynchronous):
+                Notification.objects.all().delete()
+                count = notifications.notify_many(
+                    [self.author.id, self.fans[1].id, self.fans[0].id], self.fans[0].id,
+                    'mention', post_id=self.post.id
+                )
+                if asynchronous:
+                    notifications.process_events()
+                self.assertEqual(count, 2)
+                self.assertEqual(
+                    set(Notification.objects.values_list('recipient_id', 'actor_count')),
+                    {(self.author.id, 1), (self.fans[1].id, 1)}
+                )
+
+
+@mock.patch.object(timeline, 'ASYNC', False)
+class TimelineTests(APITestCase):
+    """Fan-out after commit, read-merge of high-fanout authors, unfollow cleanup and trimming"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = make_user('reader')
+        cls.author = make_user('author')
+        cls.celebrity = make_user('celebrity')
+        for followed in (cls.author, cls.celebrity):
+            Follow.objects.create(follower=cls.reader, following=followed, status='accepted')
+
+    def publish(self, user, caption):
+        self.client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/social/posts/', {'caption': caption, 'post_type': 'text'})
+        self.assertEqual(response.status_code, 201, response.content)
+        return Post.objects.get(pk=response.data['id'])
+
+    def timeline_post_ids(self, user):
+        return set(TimelineEntry.objects.filter(user=user).values_list('post_id', flat=True))
+
+    def test_fan_out_after_commit(self):
+        self.client.force_authenticate(self.author)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/api/social/posts/', {'caption': 'Squats', 'post_type': 'text'})
+        post_id = response.data['id']
+        # Only the author's own entry is written in the request
+        self.assertEqual(self.timeline_post_ids(self.reader), set())
+        self.assertEqual(self.timeline_post_ids(self.author), {post_id})
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.timeline_post_ids(self.reader), {post_id})
+
+    def test_high_fanout_author_merged_on_read(self):
+        UserProfile.objects.filter(user=self.celebrity).update(
+            followers_count=timeline.FANOUT_FOLLOWER_LIMIT + 1
+        )
+        post = self.publish(self.author, 'Bench')
+        famous = self.publish(self.celebrity, 'Marathon')
+
+        self.assertEqual(self.timeline_post_ids(self.reader), {post.id})
+        self.assertEqual(
+            list(timeline.home_timeline(self.reader).values_list('id', flat=True)),
+            [famous.id, post.id]
+        )
+
+    def test_unfollow_removes_entries(self):
+        post = self.publish(self.author, 'Rows')
+        kept = self.publish(self.celebrity, 'Intervals')
+        self.client.force_authenticate(self.reader)
+        response = self.client.post('/api/social/unfollow/', {'user_id': self.author.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.timeline_post_ids(self.reader), {kept.id})
+        self.assertNotIn(post.id, timeline.home_timeline(self.reader).values_list('id', flat=True))
+
+    def test_trim_keeps_newest_entries(self):
+        posts = [self.publish(self.author, f'Set {i}') for i in range(5)]
+        self.assertEqual(timeline.trim_timelines(length=2), (2, 6))
+        newest = {post.id for post in posts[-2:]}
+        self.assertEqual(self.timeline_post_ids(self.reader), newest)
+        self.assertEqual(self.timeline_post_ids(self.author), newest)
+
+
+class ResponseCacheTests(APITestCase):
+    """Cached profile responses are kept apart per host and scheme"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('author')
+        for caption in ('Hill sprints', 'Tempo run'):
+            Post.objects.create(author=cls.author, caption=caption)
+
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+
+    def next_link(self, **extra):
+        username = self.author.social_profile.username
+        response = self.client.get(f'/api/social/profiles/{username}/posts/', {'page_size': 1}, **extra)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data['next']
+
+    def test_host_and_scheme_in_key(self):
+        with self.settings(ALLOWED_HOSTS=['localhost', '127.0.0.1']):
+            self.assertTrue(self.next_link(HTTP_HOST='localhost').startswith('http://localhost/'))
+            self.assertTrue(self.next_link(HTTP_HOST='127.0.0.1').startswith('http://127.0.0.1/'))
+            self.assertTrue(self.next_link(HTTP_HOST='localhost', secure=True).startswith('https://localhost/'))
+
+
+class ViewerContextTests(APITestCase):
+    """Recent comments and replies are cut to the newest N per post and per thread"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = make_user('viewer')
+        fan = make_user('fan')
+        cls.busy, cls.quiet, cls.empty = [
+            Post.objects.create(author=fan, caption=caption) for caption in ('Busy', 'Quiet', 'Empty')
+        ]
+        cls.busy_comments = [
+            Comment.objects.create(post=cls.busy, author=fan, text=f'Top {i}')
+            for i in range(RECENT_COMMENTS_LIMIT + 2)
+        ]
+        cls.quiet_comment = Comment.objects.create(post=cls.quiet, author=fan, text='Only')
+        cls.long_thread = [
+            Comment.objects.create(post=cls.busy, author=fan, parent=cls.busy_comments[-1], text=f'Reply {i}')
+            for i in range(REPLIES_LIMIT + 2)
+        ]
+        cls.short_thread = [
+            Comment.objects.create(post=cls.busy, author=fan, parent=cls.busy_comments[-2], text='Reply')
+        ]
+
+    def context(self):
+        posts = list(Post.objects.filter(pk__in=[self.busy.pk, self.quiet.pk, self.empty.pk]))
+        return ViewerContext(self.viewer, posts, with_comments=True)
+
+    def ids(self, comments):
+        return [comment.id for comment in comments]
+
+    def test_newest_comments_per_post(self):
+        viewer = self.context()
+        self.assertEqual(
+            self.ids(viewer.get_recent_comments(self.busy)),
+            self.ids(reversed(self.busy_comments[-RECENT_COMMENTS_LIMIT:]))
+        )
+        self.assertEqual(self.ids(viewer.get_recent_comments(self.quiet)), [self.quiet_comment.id])
+        self.assertEqual(viewer.get_recent_comments(self.empty), [])
+
+    def test_newest_replies_per_thread(self):
+        viewer = self.context()
+        newest, older = self.busy_comments[-1], self.busy_comments[-2]
+        self.assertEqual(
+            self.ids(viewer.get_replies(newest)),
+            self.ids(reversed(self.long_thread[-REPLIES_LIMIT:]))
+        )
+        last = self.long_thread[-REPLIES_LIMIT]
+        self.assertEqual(viewer.get_replies_cursor(newest), encode_cursor([last.created_at, last.id]))
+        self.assertEqual(self.ids(viewer.get_replies(older)), self.ids(self.short_thread))
+        self.assertIsNone(viewer.get_replies_cursor(older))
+
+    def test_constant_queries(self):
+        # More comments on a post add no queries
+        for alias in caches:
+            caches[alias].clear()
+        with CaptureQueriesContext(connection) as cold:
+            self.context()
+        Comment.objects.bulk_create(
+            Comment(post=self.quiet, author=self.viewer, text=f'More {i}') for i in range(10)
+        )
+        with self.assertNumQueries(len(cold.captured_queries)):
+            for alias in caches:
+                caches[alias].clear()
+            self.context()
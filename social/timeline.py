@@ -0,0 +1,234 @@
+"""
+FitMitra Social Timeline
+Materialized home timelines (fan-out-on-write) with a fan-out-on-read
+fallback for authors whose follower count would make writes unbounded
+Follower fan-out runs after commit, off the request thread; timelines
+are trimmed to their newest TIMELINE_LENGTH entries by trim_timelines
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Q
+
+from .models import Follow, Post, TimelineEntry, UserProfile
+
+
+logger = logging.getLogger(__name__)
+
+
+# Authors above this follower count are merged into feeds at read time
+FANOUT_FOLLOWER_LIMIT = getattr(settings, 'SOCIAL_FANOUT_FOLLOWER_LIMIT', 5000)
+
+# Number of recent posts copied into a timeline when a follow is created
+BACKFILL_POSTS = getattr(settings, 'SOCIAL_TIMELINE_BACKFILL', 100)
+
+# Entries kept per timeline by trim_timelines (and by rebuild_timeline)
+TIMELINE_LENGTH = getattr(settings, 'SOCIAL_TIMELINE_LENGTH', 800)
+
+# Fan out in a background thread after commit; False fans out inline (tests, scripts)
+ASYNC = getattr(settings, 'SOCIAL_TIMELINE_FANOUT_ASYNC', True)
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'SOCIAL_TIMELINE_FANOUT_WORKERS', 2),
+    thread_name_prefix='fanout'
+)
+
+BATCH_SIZE = 1000
+
+
+def _entry(user_id, post_id, author_id, created_at):
+    return TimelineEntry(
+        user_id=user_id,
+        post_id=post_id,
+        author_id=author_id,
+        created_at=created_at
+    )
+
+
+def _bulk_insert(entries):
+    TimelineEntry.objects.bulk_create(
+        entries,
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def is_high_fanout(user_id):
+    """Authors with too many followers are read-merged instead of fanned out"""
+    return UserProfile.objects.filter(
+        user_id=user_id,
+        followers_count__gt=FANOUT_FOLLOWER_LIMIT
+    ).exists()
+
+
+# ============================================================
+# WRITE PATH
+# ============================================================
+
+def fan_out_post(post):
+    """
+    Push a new post into the author's timeline now and into every
+    follower's timeline once the surrounding transaction commits
+    High-fanout authors only get their own entry; followers merge on read
+    """
+    _bulk_insert([_entry(post.author_id, post.id, post.author_id, post.created_at)])
+
+    if ASYNC:
+        transaction.on_commit(lambda: _executor.submit(_run_fan_out, post.id))
+    else:
+        transaction.on_commit(lambda: fan_out_to_followers(post.id))
+
+
+def fan_out_to_followers(post_id):
+    """Insert a post into its author's followers' timelines; returns rows written"""
+    post = Post.objects.filter(pk=post_id, is_active=True).values(
+        'author_id', 'created_at'
+    ).first()
+    if post is None or is_high_fanout(post['author_id']):
+        return 0
+
+    follower_ids = Follow.objects.filter(
+        following_id=post['author_id'],
+        status='accepted'
+    ).values_list('follower_id', flat=True)
+
+    written = 0
+    entries = []
+    for follower_id in follower_ids.iterator(chunk_size=BATCH_SIZE):
+        entries.append(
+            _entry(follower_id, post_id, post['author_id'], post['created_at'])
+        )
+        if len(entries) >= BATCH_SIZE:
+            _bulk_insert(entries)
+            written += len(entries)
+            entries = []
+
+    if entries:
+        _bulk_insert(entries)
+        written += len(entries)
+    return written
+
+
+def _run_fan_out(post_id):
+    try:
+        fan_out_to_followers(post_id)
+    except Exception:
+        logger.exception('Timeline fan-out failed for post #%s', post_id)
+    finally:
+        close_old_connections()
+
+
+def backfill_author(user, author):
+    """Copy an author's recent posts into a user's timeline after a follow"""
+    if is_high_fanout(author.id):
+        return
+
+    posts = Post.objects.filter(
+        author=author,
+        is_active=True
+    ).order_by('-created_at').values_list('id', 'created_at')[:BACKFILL_POSTS]
+
+    _bulk_insert([
+        _entry(user.id, post_id, author.id, created_at)
+        for post_id, created_at in posts
+    ])
+
+
+def remove_author(user, author):
+    """Drop an author's posts from a user's timeline (unfollow/block)"""
+    TimelineEntry.objects.filter(user=user, author=author).delete()
+
+
+def remove_post(post):
+    """Drop a deleted post from every timeline"""
+    TimelineEntry.objects.filter(post=post).delete()
+
+
+def rebuild_timeline(user):
+    """Recreate a user's timeline from the follow graph"""
+    TimelineEntry.objects.filter(user=user).delete()
+
+    author_ids = [user.id] + list(
+        Follow.objects.filter(
+            follower=user,
+            status='accepted'
+        ).exclude(
+            following__social_profile__followers_count__gt=FANOUT_FOLLOWER_LIMIT
+        ).values_list('following_id', flat=True)
+    )
+
+    entries = []
+    for author_id in author_ids:
+        posts = Post.objects.filter(
+            author_id=author_id,
+            is_active=True
+        ).order_by('-created_at').values_list('id', 'created_at')[:BACKFILL_POSTS]
+        entries.extend(
+            _entry(user.id, post_id, author_id, created_at)
+            for post_id, created_at in posts
+        )
+
+    entries.sort(key=lambda entry: entry.created_at, reverse=True)
+    entries = entries[:TIMELINE_LENGTH]
+    _bulk_insert(entries)
+    return len(entries)
+
+
+def trim_timelines(length=TIMELINE_LENGTH):
+    """
+    Delete entries beyond the newest `length` of every timeline
+    Returns (timelines trimmed, entries deleted)
+    """
+    user_ids = TimelineEntry.objects.values('user_id').annotate(
+        entries=Count('id')
+    ).filter(entries__gt=length).values_list('user_id', flat=True)
+
+    trimmed = deleted = 0
+    for user_id in list(user_ids):
+        entries = TimelineEntry.objects.filter(user_id=user_id)
+        # Oldest kept entry; everything strictly older goes
+        cutoff = entries.order_by('-created_at').values_list('created_at', flat=True)[length - 1]
+        count, _ = entries.filter(created_at__lt=cutoff).delete()
+        trimmed += 1
+        deleted += count
+    return trimmed, deleted
+
+
+# ============================================================
+# READ PATH
+# ============================================================
+
+def home_timeline(user):
+    """
+    Posts in a user's home timeline, newest first
+    Exposes the ordering key as `feed_at` on every returned post
+    """
+    high_fanout_ids = list(
+        Follow.objects.filter(
+            follower=user,
+            status='accepted',
+            following__social_profile__followers_count__gt=FANOUT_FOLLOWER_LIMIT
+        ).values_list('following_id', flat=True)
+    )
+
+    if not high_fanout_ids:
+        # Single range read over (user, -created_at) on the timeline table
+        return Post.objects.filter(
+            timeline_entries__user=user,
+            is_active=True
+        ).annotate(
+            feed_at=F('timeline_entries__created_at')
+        ).order_by('-feed_at', '-id')
+
+    # Fan-out-on-read merge for followed high-fanout authors
+    materialized_ids = TimelineEntry.objects.filter(user=user).values('post_id')
+
+    return Post.objects.filter(
+        Q(id__in=materialized_ids) | Q(author_id__in=high_fanout_ids),
+        is_active=True
+    ).annotate(
+        feed_at=F('created_at')
+    ).order_by('-feed_at', '-id')
@@ -0,0 +1,105 @@
+"""
+FitMitra Social Trending
+Time-decayed "hot" ranking of recent posts for the explore feed
+
+score = log10(weighted engagement) + age_seconds / DECAY_SECONDS
+Newer posts start higher, so a post's score only changes when its
+engagement does and refreshes rescore just the posts that moved
+"""
+
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Post, TrendingPost
+
+
+# Posts older than this drop out of the ranking
+WINDOW = timedelta(days=getattr(settings, 'SOCIAL_TRENDING_WINDOW_DAYS', 7))
+
+# Explore only reads the best K rows
+TOP_K = getattr(settings, 'SOCIAL_TRENDING_TOP_K', 500)
+
+# Seconds of recency worth a 10x engagement difference
+DECAY_SECONDS = getattr(settings, 'SOCIAL_TRENDING_DECAY_SECONDS', 45000)
+
+WEIGHTS = {'likes_count': 1, 'comments_count': 2, 'shares_count': 3}
+
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def hot_score(likes_count, comments_count, shares_count, created_at):
+    engagement = (
+        likes_count * WEIGHTS['likes_count']
+        + comments_count * WEIGHTS['comments_count']
+        + shares_count * WEIGHTS['shares_count']
+    )
+    age = (created_at - EPOCH).total_seconds()
+    return round(math.log10(max(engagement, 1)) + age / DECAY_SECONDS, 7)
+
+
+def refresh(batch_size=1000):
+    """
+    Bring the ranking table up to date with the posts inside WINDOW
+    Only new posts and posts whose counters changed are rescored
+    Returns (rows scored, rows removed)
+    """
+    cutoff = timezone.now() - WINDOW
+    removed, _ = TrendingPost.objects.exclude(
+        post__is_active=True,
+        post__created_at__gte=cutoff
+    ).delete()
+
+    snapshots = {
+        row[0]: row[1:]
+        for row in TrendingPost.objects.values_list(
+            'post_id', 'likes_count', 'comments_count', 'shares_count'
+        ).iterator()
+    }
+
+    candidates = Post.objects.filter(
+        is_active=True,
+        created_at__gte=cutoff
+    ).order_by().values_list(
+        'id', 'author_id', 'created_at',
+        'likes_count', 'comments_count', 'shares_count'
+    )
+
+    to_create, to_update = [], []
+    for post_id, author_id, created_at, *counts in candidates.iterator():
+        if snapshots.get(post_id) == tuple(counts):
+            continue
+        row = TrendingPost(
+            post_id=post_id,
+            author_id=author_id,
+            score=hot_score(*counts, created_at),
+            likes_count=counts[0],
+            comments_count=counts[1],
+            shares_count=counts[2]
+        )
+        (to_update if post_id in snapshots else to_create).append(row)
+
+    with transaction.atomic():
+        # A concurrent refresh may have inserted the same posts
+        TrendingPost.objects.bulk_create(
+            to_create, batch_size=batch_size, ignore_conflicts=True
+        )
+        TrendingPost.objects.bulk_update(
+            to_update,
+            ['score', 'likes_count', 'comments_count', 'shares_count'],
+            batch_size=batch_size
+        )
+
+    return len(to_create) + len(to_update), removed
+
+
+def top_k_cutoff():
+    """Score of the K-th ranked row, or None when the table is empty"""
+    scores = TrendingPost.objects.order_by('-score').values_list('score', flat=True)
+    cutoff = scores[TOP_K - 1:TOP_K].first()
+    if cutoff is None:
+        cutoff = scores.last()
+    return cutoff
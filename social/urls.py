@@ -5,7 +5,7 @@ API endpoints for social features
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import views, realtime
 
 # Create router for ViewSets
 router = DefaultRouter()
@@ -22,6 +22,22 @@ urlpatterns = [
     path('feed/', views.feed_view, name='feed'),
     path('explore/', views.explore_feed_view, name='explore-feed'),
     
+    # Comment thread continuation
+    path('comments/<int:comment_id>/replies/', views.comment_replies, name='comment-replies'),
+    
+    # Hashtag URLs
+    path('hashtags/trending/', views.trending_hashtags, name='trending-hashtags'),
+    path('hashtags/<str:name>/posts/', views.hashtag_posts, name='hashtag-posts'),
+    
+    # Realtime push (Server-Sent Events, requires the ASGI server)
+    path('stream/', realtime.event_stream, name='stream'),
+    
+    # Unread badge counts (cached, ETag-aware)
+    path('badges/', views.unread_badges, name='badges'),
+    
+    # Username typeahead (in-process prefix index)
+    path('autocomplete/', views.autocomplete_usernames, name='autocomplete'),
+    
     # Follow URLs
     path('follow/', views.follow_user, name='follow'),
     path('unfollow/', views.unfollow_user, name='unfollow'),
@@ -30,4 +46,7 @@ urlpatterns = [
     path('report/', views.report_content, name='report'),
     path('block/', views.block_user, name='block'),
     path('unblock/', views.unblock_user, name='unblock'),
+    
+    # Diagnostics (staff only)
+    path('graph/stats/', views.graph_cache_stats, name='graph-stats'),
 ]
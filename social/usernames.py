@@ -0,0 +1,61 @@
+"""
+FitMitra Social Usernames
+Collision-free username allocation for new social profiles
+"""
+
+from django.db import IntegrityError, transaction
+
+from .models import UserProfile
+
+
+MAX_LENGTH = UserProfile._meta.get_field('username').max_length
+
+# Characters reserved for the numeric suffix when the base is long
+SUFFIX_ROOM = 6
+
+# Attempts before giving up when concurrent signups keep taking the name
+MAX_ATTEMPTS = 5
+
+
+def base_username(user):
+    """Username to start from: the account username, else the email local part"""
+    base = user.username if user.username else user.email.split('@')[0]
+    return base[:MAX_LENGTH]
+
+
+def _candidate(base, n):
+    if n == 0:
+        return base
+    suffix = str(n)
+    return f'{base[:MAX_LENGTH - len(suffix)]}{suffix}'
+
+
+def allocate(base):
+    """
+    First free name in base, base1, base2, ...
+    One indexed LIKE 'stem%' query fetches every name that could collide
+    """
+    stem = base[:MAX_LENGTH - SUFFIX_ROOM]
+    taken = set(
+        UserProfile.objects.filter(username__startswith=stem).values_list('username', flat=True)
+    )
+    n = 0
+    while _candidate(base, n) in taken:
+        n += 1
+    return _candidate(base, n)
+
+
+def create_profile(user, base=None, **fields):
+    """
+    Create user's UserProfile under a unique username
+    A concurrent signup taking the same name hits the unique constraint;
+    the name is then re-allocated
+    """
+    base = base or base_username(user)
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return UserProfile.objects.create(user=user, username=allocate(base), **fields)
+        except IntegrityError:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
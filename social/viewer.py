@@ -0,0 +1,190 @@
+"""
+FitMitra Social Viewer Context
+Bulk-loads viewer-dependent state for a page of posts so serializers never
+query per row
+"""
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Comment, Like
+from .pagination import encode_cursor
+from . import counters, graph
+
+
+# Relations joined by every post listing; engagement rows are never
+# prefetched, serializers use the denormalized counters instead
+POST_LISTING_RELATED = ('author', 'author__social_profile', 'author__profile')
+
+# Relations joined by every comment listing
+COMMENT_RELATED = ('author', 'author__social_profile', 'author__profile')
+
+# Top-level comments shown under each feed post
+RECENT_COMMENTS_LIMIT = 2
+
+# Replies rendered under each top-level comment
+REPLIES_LIMIT = 5
+
+
+def _comment_queryset():
+    return Comment.objects.filter(
+        is_active=True
+    ).select_related(
+        *COMMENT_RELATED
+    )
+
+
+def _top_per_partition(queryset, partition, limit):
+    """Keep the newest `limit` rows per partition using ROW_NUMBER()"""
+    return queryset.annotate(
+        row_number=Window(
+            expression=RowNumber(),
+            partition_by=[F(partition)],
+            order_by=[F('created_at').desc(), F('id').desc()]
+        )
+    ).filter(
+        row_number__lte=limit
+    ).order_by('-created_at', '-id')
+
+
+def _load_threads(parents, posts, limit):
+    """
+    Newest `limit` replies of every parent comment in one windowed query
+    Returns ({parent_id: [reply]}, {parent_id: cursor}); a cursor is set
+    only for threads with more replies (one extra row is read to tell)
+    """
+    threads = {parent_id: [] for parent_id in parents}
+    cursors = {}
+    if not threads:
+        return threads, cursors
+
+    replies = _top_per_partition(
+        _comment_queryset().filter(parent_id__in=list(threads)),
+        'parent_id',
+        limit + 1
+    )
+    for reply in replies:
+        reply.post = posts[reply.post_id]
+        threads[reply.parent_id].append(reply)
+
+    for parent_id, thread in threads.items():
+        if len(thread) > limit:
+            del thread[limit:]
+            cursors[parent_id] = encode_cursor([thread[-1].created_at, thread[-1].id])
+    return threads, cursors
+
+
+class ViewerContext:
+    """
+    Viewer state for one page of posts, resolved in a fixed number of queries:
+    liked post ids, followed user ids, recent comments and their replies
+    Pass as `context['viewer']`; serializers fall back to per-row queries
+    when it is absent
+    """
+
+    def __init__(self, user, posts, with_comments=False):
+        self.user = user if user is not None and user.is_authenticated else None
+        self.posts = {post.id: post for post in posts}
+        self.liked_post_ids = set()
+        self.following_ids = set()
+        self.recent_comments = {}
+        self.replies = {}
+        self.replies_cursors = {}
+        self.pending_likes = counters.pending_deltas('post_likes', self.posts)
+
+        if with_comments:
+            self._load_comments()
+        if self.user is not None:
+            self._load_likes()
+            self._load_following()
+
+    # ------------------------------------------------------------
+    # Loaders
+    # ------------------------------------------------------------
+
+    def _load_comments(self):
+        comments = _top_per_partition(
+            _comment_queryset().filter(post_id__in=list(self.posts), parent=None),
+            'post_id',
+            RECENT_COMMENTS_LIMIT
+        )
+        self.recent_comments = {post_id: [] for post_id in self.posts}
+        for comment in comments:
+            comment.post = self.posts[comment.post_id]
+            self.recent_comments[comment.post_id].append(comment)
+
+        parents = [
+            comment.id
+            for comments in self.recent_comments.values()
+            for comment in comments
+        ]
+        self.replies, self.replies_cursors = _load_threads(parents, self.posts, REPLIES_LIMIT)
+
+    def _load_likes(self):
+        self.liked_post_ids = set(
+            Like.objects.filter(
+                user=self.user,
+                post_id__in=list(self.posts)
+            ).values_list('post_id', flat=True)
+        )
+
+    def _load_following(self):
+        user_ids = {post.author_id for post in self.posts.values()}
+        for comments in list(self.recent_comments.values()) + list(self.replies.values()):
+            user_ids.update(comment.author_id for comment in comments)
+
+        self.following_ids = graph.following_ids(self.user.id) & user_ids
+
+    # ------------------------------------------------------------
+    # Lookups used by serializers
+    # ------------------------------------------------------------
+
+    def has_liked(self, post):
+        return post.id in self.liked_post_ids
+
+    def is_following(self, user):
+        return user.id in self.following_ids
+
+    def get_recent_comments(self, post):
+        """Recent comments for a post, or None if they were not loaded"""
+        return self.recent_comments.get(post.id)
+
+    def get_replies(self, comment):
+        """First replies of a comment, or None if they were not loaded"""
+        return self.replies.get(comment.id)
+
+    def get_replies_cursor(self, comment):
+        """Cursor for the replies after the loaded ones, None when there are none"""
+        return self.replies_cursors.get(comment.id)
+
+
+class CommentTree:
+    """
+    One page of a post's top-level comments with the newest replies of
+    every thread, resolved in a fixed number of queries
+    Threads with more replies get a cursor for the comment replies endpoint
+    Pass as `context['viewer']` alongside `context['post_author_id']`
+    """
+
+    def __init__(self, user, post, comments, replies_limit=REPLIES_LIMIT):
+        self.user = user if user is not None and user.is_authenticated else None
+        self.post = post
+
+        for comment in comments:
+            comment.post = post
+        self.replies, self.replies_cursors = _load_threads(
+            [comment.id for comment in comments], {post.id: post}, replies_limit
+        )
+
+        self.following_ids = set()
+        if self.user is not None:
+            self.following_ids = graph.following_ids(self.user.id)
+
+    def is_following(self, user):
+        return user.id in self.following_ids
+
+    def get_replies(self, comment):
+        return self.replies.get(comment.id)
+
+    def get_replies_cursor(self, comment):
+        return self.replies_cursors.get(comment.id)
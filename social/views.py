@@ -4,19 +4,21 @@ Production-ready API views for social features
 Optimized for performance with pagination, caching, and efficient queries
 """
 
-from rest_framework import viewsets, status, filters
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework import viewsets, status
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q, Prefetch, Count, Exists, OuterRef
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from common.uploads import StreamingUploadMixin
+from django.db.models import Q, F, Count, Exists, OuterRef
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 from django.utils import timezone
 
 from .models import (
     UserProfile, Post, Like, Comment, Follow,
-    Message, Notification, Report, Block
+    Message, Notification, Report, Block, Conversation
 )
 from .serializers import (
     UserProfileSerializer, UserProfileUpdateSerializer,
@@ -26,24 +28,20 @@ from .serializers import (
     MessageSerializer, MessageCreateSerializer, ConversationSerializer,
     NotificationSerializer, ReportSerializer
 )
+from .pagination import StandardPagination, FeedPagination
+from .viewer import CommentTree, ViewerContext, COMMENT_RELATED, POST_LISTING_RELATED
+from . import (
+    autocomplete, badges, caching, captions, conversations, counters, graph,
+    notifications, search, timeline, trending, usernames
+)
 
 
-# ============================================================
-# PAGINATION CLASSES
-# ============================================================
-
-class StandardPagination(PageNumberPagination):
-    """Standard pagination for lists"""
-    page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-
-class FeedPagination(PageNumberPagination):
-    """Pagination for feed"""
-    page_size = 15
-    page_size_query_param = 'page_size'
-    max_page_size = 50
+def get_post_context(request, posts, with_comments=False):
+    """Serializer context with viewer state bulk-loaded for a page of posts"""
+    return {
+        'request': request,
+        'viewer': ViewerContext(request.user, posts, with_comments=with_comments)
+    }
 
 
 # ============================================================
@@ -53,13 +51,11 @@ class FeedPagination(PageNumberPagination):
 class UserProfileViewSet(viewsets.ModelViewSet):
     """
     ViewSet for user profiles
-    Supports viewing, updating, and searching profiles
+    Supports viewing, updating, and searching profiles (?search=)
     """
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['username', 'user__first_name', 'user__last_name', 'bio']
     lookup_field = 'username'
     
     @action(detail=False, methods=['get', 'put', 'patch'], permission_classes=[IsAuthenticated])
@@ -68,10 +64,9 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         Get or update current user's social profile
         """
         # Try to get the profile, create if missing (failsafe for signals)
-        profile, created = UserProfile.objects.get_or_create(
-            user=request.user,
-            defaults={'username': request.user.username}
-        )
+        profile = UserProfile.objects.filter(user=request.user).first()
+        if profile is None:
+            profile = usernames.create_profile(request.user)
         
         if request.method == 'GET':
             serializer = self.get_serializer(profile)
@@ -89,7 +84,10 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         return Response(UserProfileSerializer(profile, context={'request': request}).data)
     
     def get_queryset(self):
-        """Optimize query with select_related"""
+        """Optimize query with select_related; ranked results when searching"""
+        query = self.request.query_params.get('search')
+        if self.action == 'list' and query:
+            return search.search_profiles(query).select_related('user')
         return UserProfile.objects.select_related('user').all()
     
     def get_serializer_class(self):
@@ -98,6 +96,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
             return UserProfileUpdateSerializer
         return UserProfileSerializer
     
+    @caching.cache_response
     def retrieve(self, request, username=None):
         """
         Get user profile by username with additional stats
@@ -109,26 +108,14 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         
         # Add follow status if user is authenticated
         if request.user.is_authenticated:
-            data['is_following'] = Follow.objects.filter(
-                follower=request.user,
-                following=profile.user,
-                status='accepted'
-            ).exists()
-            
-            data['follows_you'] = Follow.objects.filter(
-                follower=profile.user,
-                following=request.user,
-                status='accepted'
-            ).exists()
-            
-            data['is_blocked'] = Block.objects.filter(
-                blocker=request.user,
-                blocked=profile.user
-            ).exists()
+            data['is_following'] = graph.is_following(request.user.id, profile.user_id)
+            data['follows_you'] = graph.is_following(profile.user_id, request.user.id)
+            data['is_blocked'] = graph.has_blocked(request.user.id, profile.user_id)
         
         return Response(data)
     
     @action(detail=True, methods=['get'])
+    @caching.cache_response
     def posts(self, request, username=None):
         """Get all posts by a user"""
         profile = get_object_or_404(UserProfile, username=username)
@@ -137,9 +124,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
             author=profile.user,
             is_active=True
         ).select_related(
-            'author', 'author__social_profile'
-        ).prefetch_related(
-            'likes', 'comments'
+            *POST_LISTING_RELATED
         ).order_by('-created_at')
         
         paginator = StandardPagination()
@@ -148,12 +133,13 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         serializer = PostSerializer(
             page, 
             many=True, 
-            context={'request': request}
+            context=get_post_context(request, page)
         )
         
         return paginator.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @caching.cache_response
     def followers(self, request, username=None):
         """Get user's followers"""
         profile = get_object_or_404(UserProfile, username=username)
@@ -172,6 +158,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         return paginator.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @caching.cache_response
     def following(self, request, username=None):
         """Get users that this user follows"""
         profile = get_object_or_404(UserProfile, username=username)
@@ -194,21 +181,23 @@ class UserProfileViewSet(viewsets.ModelViewSet):
 # POST VIEWS
 # ============================================================
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(StreamingUploadMixin, viewsets.ModelViewSet):
     """
     ViewSet for posts (CRUD operations)
+    Image uploads stream to disk and are size-capped (413)
     """
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
     
     def get_queryset(self):
-        """Optimize query with select_related and prefetch_related"""
+        """
+        Lean listing query: only joins the author rows
+        Viewer likes and recent comments are loaded per page by ViewerContext
+        """
         return Post.objects.filter(
             is_active=True
         ).select_related(
-            'author', 'author__social_profile'
-        ).prefetch_related(
-            'likes', 'comments'
+            *POST_LISTING_RELATED
         ).order_by('-created_at')
     
     def get_serializer_class(self):
@@ -217,6 +206,19 @@ class PostViewSet(viewsets.ModelViewSet):
             return PostCreateSerializer
         return PostSerializer
     
+    def list(self, request, *args, **kwargs):
+        """List posts with viewer state loaded once per page"""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        
+        serializer = PostSerializer(
+            page,
+            many=True,
+            context=get_post_context(request, page)
+        )
+        
+        return self.get_paginated_response(serializer.data)
+    
     def create(self, request, *args, **kwargs):
         """Create post and return full serialized data"""
         serializer = self.get_serializer(data=request.data)
@@ -236,39 +238,61 @@ class PostViewSet(viewsets.ModelViewSet):
     def perform_destroy(self, instance):
         """Soft delete post"""
         if instance.author == self.request.user:
-            instance.is_active = False
-            instance.save()
+            with transaction.atomic():
+                deactivated = Post.objects.filter(
+                    pk=instance.pk,
+                    is_active=True
+                ).update(is_active=False, updated_at=timezone.now())
+                
+                # Update user's post count
+                if deactivated:
+                    counters.adjust_profile(instance.author_id, 'posts_count', -1)
+                    captions.remove_post(instance)
+                    caching.invalidate_users(instance.author_id)
             
-            # Update user's post count
-            if hasattr(instance.author, 'social_profile'):
-                profile = instance.author.social_profile
-                profile.posts_count = max(0, profile.posts_count - 1)
-                profile.save(update_fields=['posts_count'])
+            timeline.remove_post(instance)
+            search.post_index.remove(instance.pk)
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text caption search, best match first (?q=)"""
+        posts = search.search_posts(
+            request.query_params.get('q', '')
+        ).select_related(*POST_LISTING_RELATED)
+        
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(posts, request)
+        
+        serializer = PostSerializer(
+            page,
+            many=True,
+            context=get_post_context(request, page)
+        )
+        
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def like(self, request, pk=None):
         """Like a post"""
         post = self.get_object()
         
-        # Check if already liked
-        like, created = Like.objects.get_or_create(
-            user=request.user,
-            post=post
-        )
+        with transaction.atomic():
+            # Check if already liked
+            like, created = Like.objects.get_or_create(
+                user=request.user,
+                post=post
+            )
+            
+            # Update post's like count
+            if created:
+                counters.adjust_post_likes(post.id, 1)
+                caching.invalidate_viewers(request.user.id)
         
         if created:
-            # Update post's like count
-            post.likes_count += 1
-            post.save(update_fields=['likes_count'])
-            
-            # Create notification
-            if post.author != request.user:
-                Notification.objects.create(
-                    recipient=post.author,
-                    actor=request.user,
-                    notification_type='like',
-                    post=post
-                )
+            # Queue notification
+            notifications.notify(
+                post.author_id, request.user.id, 'like', post_id=post.id
+            )
             
             return Response({'status': 'liked'}, status=status.HTTP_201_CREATED)
         
@@ -279,24 +303,28 @@ class PostViewSet(viewsets.ModelViewSet):
         """Unlike a post"""
         post = self.get_object()
         
-        try:
-            like = Like.objects.get(user=request.user, post=post)
-            like.delete()
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(user=request.user, post=post).delete()
             
             # Update post's like count
-            post.likes_count = max(0, post.likes_count - 1)
-            post.save(update_fields=['likes_count'])
-            
-            return Response({'status': 'unliked'}, status=status.HTTP_200_OK)
-        except Like.DoesNotExist:
+            if deleted:
+                counters.adjust_post_likes(post.id, -1)
+                caching.invalidate_viewers(request.user.id)
+        
+        if not deleted:
             return Response(
                 {'error': 'Post not liked'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        return Response({'status': 'unliked'}, status=status.HTTP_200_OK)
     
     @action(detail=True, methods=['get'])
     def comments(self, request, pk=None):
-        """Get all comments for a post"""
+        """
+        Top-level comments of a post, newest first, each with its newest
+        replies; threads with more carry `replies_cursor`
+        """
         post = self.get_object()
         
         comments = Comment.objects.filter(
@@ -304,15 +332,8 @@ class PostViewSet(viewsets.ModelViewSet):
             is_active=True,
             parent=None  # Only top-level comments
         ).select_related(
-            'author', 'author__social_profile'
-        ).prefetch_related(
-            Prefetch(
-                'replies',
-                queryset=Comment.objects.filter(is_active=True).select_related(
-                    'author', 'author__social_profile'
-                )
-            )
-        ).order_by('-created_at')
+            *COMMENT_RELATED
+        ).order_by('-created_at', '-id')
         
         paginator = StandardPagination()
         page = paginator.paginate_queryset(comments, request)
@@ -320,7 +341,11 @@ class PostViewSet(viewsets.ModelViewSet):
         serializer = CommentSerializer(
             page,
             many=True,
-            context={'request': request}
+            context={
+                'request': request,
+                'viewer': CommentTree(request.user, post, page),
+                'post_author_id': post.author_id
+            }
         )
         
         return paginator.get_paginated_response(serializer.data)
@@ -338,15 +363,11 @@ class PostViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             comment = serializer.save()
             
-            # Create notification
-            if post.author != request.user:
-                Notification.objects.create(
-                    recipient=post.author,
-                    actor=request.user,
-                    notification_type='comment',
-                    post=post,
-                    comment=comment
-                )
+            # Queue notification
+            notifications.notify(
+                post.author_id, request.user.id, 'comment',
+                post_id=post.id, comment_id=comment.id
+            )
             
             return Response(
                 CommentSerializer(comment, context={'request': request}).data,
@@ -356,6 +377,39 @@ class PostViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def comment_replies(request, comment_id):
+    """
+    Replies of a top-level comment, newest first
+    Continue a thread with ?cursor=<replies_cursor>
+    """
+    parent = get_object_or_404(
+        Comment.objects.select_related('post'),
+        pk=comment_id,
+        is_active=True,
+        post__is_active=True
+    )
+    
+    replies = Comment.objects.filter(
+        parent=parent,
+        is_active=True
+    ).select_related(
+        *COMMENT_RELATED
+    ).order_by('-created_at', '-id')
+    
+    paginator = StandardPagination()
+    page = paginator.paginate_queryset(replies, request)
+    
+    serializer = CommentSerializer(
+        page,
+        many=True,
+        context={'request': request, 'post_author_id': parent.post.author_id}
+    )
+    
+    return paginator.get_paginated_response(serializer.data)
+
+
 # ============================================================
 # FEED VIEW
 # ============================================================
@@ -369,47 +423,30 @@ def feed_view(request):
     """
     user = request.user
     
-    # Get users that current user follows
-    following_ids = Follow.objects.filter(
-        follower=user,
-        status='accepted'
-    ).values_list('following_id', flat=True)
-    
-    # Get blocked users
-    blocked_ids = Block.objects.filter(
-        blocker=user
-    ).values_list('blocked_id', flat=True)
-    
     # Build feed query
     # If user follows few people, show more trending/recent content
-    is_new_user = len(following_ids) < 5
+    is_new_user = len(graph.following_ids(user.id)) < 5
     
     if is_new_user:
+        # Get blocked users
+        blocked_ids = graph.blocking_ids(user.id)
+        
         # For new users, show followed users + most recent active posts
         feed_posts = Post.objects.filter(
             is_active=True
         ).exclude(
             author_id__in=blocked_ids
-        ).select_related(
-            'author', 'author__social_profile'
-        ).prefetch_related(
-            'likes', 'comments'
-        ).order_by('-created_at')
+        ).annotate(
+            feed_at=F('created_at')
+        ).order_by('-feed_at', '-id')
     else:
-        # For established users, prioritize followed users + trending
-        feed_posts = Post.objects.filter(
-            is_active=True
-        ).exclude(
-            author_id__in=blocked_ids
-        ).filter(
-            Q(author_id__in=following_ids) |
-            Q(likes_count__gte=5) |  # Lowered trending threshold
-            Q(created_at__gte=timezone.now() - timezone.timedelta(days=1)) # Recent posts
-        ).select_related(
-            'author', 'author__social_profile'
-        ).prefetch_related(
-            'likes', 'comments'
-        ).distinct().order_by('-created_at')
+        # For established users, read the materialized home timeline
+        # (blocked authors are removed from it by block_user)
+        feed_posts = timeline.home_timeline(user)
+    
+    feed_posts = feed_posts.select_related(
+        *POST_LISTING_RELATED
+    )
     
     # Paginate
     paginator = FeedPagination()
@@ -418,7 +455,7 @@ def feed_view(request):
     serializer = FeedPostSerializer(
         page,
         many=True,
-        context={'request': request}
+        context=get_post_context(request, page, with_comments=True)
     )
     
     return paginator.get_paginated_response(serializer.data)
@@ -434,11 +471,8 @@ def explore_feed_view(request):
     user = request.user
     
     # Get blocked users
-    blocked_ids = Block.objects.filter(
-        blocker=user
-    ).values_list('blocked_id', flat=True)
+    blocked_ids = graph.blocking_ids(user.id)
     
-    # Get trending posts (high engagement, recent)
     explore_posts = Post.objects.filter(
         is_active=True
     ).exclude(
@@ -446,10 +480,18 @@ def explore_feed_view(request):
     ).exclude(
         author=user  # Don't show own posts
     ).select_related(
-        'author', 'author__social_profile'
-    ).prefetch_related(
-        'likes', 'comments'
-    ).order_by('-likes_count', '-created_at')
+        *POST_LISTING_RELATED
+    )
+    
+    # Top-K window of the precomputed trending ranking
+    cutoff = trending.top_k_cutoff()
+    if cutoff is not None:
+        explore_posts = explore_posts.filter(
+            trending__score__gte=cutoff
+        ).order_by('-trending__score', '-id')
+    else:
+        # Ranking not built yet (refresh_trending has never run)
+        explore_posts = explore_posts.order_by('-likes_count', '-created_at')
     
     # Paginate
     paginator = FeedPagination()
@@ -458,12 +500,60 @@ def explore_feed_view(request):
     serializer = FeedPostSerializer(
         page,
         many=True,
-        context={'request': request}
+        context=get_post_context(request, page, with_comments=True)
     )
     
     return paginator.get_paginated_response(serializer.data)
 
 
+# ============================================================
+# HASHTAG VIEWS
+# ============================================================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def hashtag_posts(request, name):
+    """
+    Posts tagged #name, newest first
+    Reads the (hashtag, -created_at) link index; supports ?cursor=
+    """
+    posts = captions.posts_for_hashtag(name)
+    if posts is None:
+        return Response(
+            {'error': 'Hashtag not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    posts = posts.exclude(
+        author_id__in=graph.blocking_ids(request.user.id)
+    ).select_related(
+        *POST_LISTING_RELATED
+    )
+    
+    paginator = FeedPagination()
+    page = paginator.paginate_queryset(posts, request)
+    
+    serializer = FeedPostSerializer(
+        page,
+        many=True,
+        context=get_post_context(request, page, with_comments=True)
+    )
+    
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def trending_hashtags(request):
+    """Most used hashtags over the recent trend window (?limit=)"""
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 20)), 50))
+    except ValueError:
+        limit = 20
+    
+    return Response({'results': captions.trending_hashtags(limit=limit)})
+
+
 # ============================================================
 # FOLLOW VIEWS
 # ============================================================
@@ -487,35 +577,30 @@ def follow_user(request):
         )
     
     # Check if blocked
-    if Block.objects.filter(blocker=user_to_follow, blocked=request.user).exists():
+    if graph.has_blocked(user_to_follow.id, request.user.id):
         return Response(
             {'error': 'Cannot follow this user'},
             status=status.HTTP_403_FORBIDDEN
         )
     
-    # Create or get follow relationship
-    follow, created = Follow.objects.get_or_create(
-        follower=request.user,
-        following=user_to_follow,
-        defaults={'status': 'accepted'}  # Auto-accept for now
-    )
+    with transaction.atomic():
+        # Create or get follow relationship
+        follow, created = Follow.objects.get_or_create(
+            follower=request.user,
+            following=user_to_follow,
+            defaults={'status': 'accepted'}  # Auto-accept for now
+        )
+        
+        # Update follower/following counts
+        if created:
+            counters.adjust_follow(request.user.id, user_to_follow.id, 1)
     
     if created:
-        # Update follower/following counts
-        if hasattr(request.user, 'social_profile'):
-            request.user.social_profile.following_count += 1
-            request.user.social_profile.save(update_fields=['following_count'])
-        
-        if hasattr(user_to_follow, 'social_profile'):
-            user_to_follow.social_profile.followers_count += 1
-            user_to_follow.social_profile.save(update_fields=['followers_count'])
-        
-        # Create notification
-        Notification.objects.create(
-            recipient=user_to_follow,
-            actor=request.user,
-            notification_type='follow'
-        )
+        # Pull the followed user's recent posts into the home timeline
+        timeline.backfill_author(request.user, user_to_follow)
+        
+        # Queue notification
+        notifications.notify(user_to_follow.id, request.user.id, 'follow')
         
         return Response({'status': 'followed'}, status=status.HTTP_201_CREATED)
     
@@ -533,33 +618,25 @@ def unfollow_user(request):
     
     user_to_unfollow = get_object_or_404(User, id=serializer.validated_data['user_id'])
     
-    try:
-        follow = Follow.objects.get(
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(
             follower=request.user,
             following=user_to_unfollow
-        )
-        follow.delete()
+        ).delete()
         
         # Update follower/following counts
-        if hasattr(request.user, 'social_profile'):
-            request.user.social_profile.following_count = max(
-                0, request.user.social_profile.following_count - 1
-            )
-            request.user.social_profile.save(update_fields=['following_count'])
-        
-        if hasattr(user_to_unfollow, 'social_profile'):
-            user_to_unfollow.social_profile.followers_count = max(
-                0, user_to_unfollow.social_profile.followers_count - 1
-            )
-            user_to_unfollow.social_profile.save(update_fields=['followers_count'])
-        
-        return Response({'status': 'unfollowed'}, status=status.HTTP_200_OK)
+        if deleted:
+            counters.adjust_follow(request.user.id, user_to_unfollow.id, -1)
     
-    except Follow.DoesNotExist:
+    if not deleted:
         return Response(
             {'error': 'Not following this user'},
             status=status.HTTP_400_BAD_REQUEST
         )
+    
+    timeline.remove_author(request.user, user_to_unfollow)
+    
+    return Response({'status': 'unfollowed'}, status=status.HTTP_200_OK)
 
 
 # ============================================================
@@ -592,47 +669,22 @@ class MessageViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def conversations(self, request):
         """Get list of conversations with last message and unread count"""
-        user = request.user
-        
-        # Get all users with whom current user has conversations
-        conversations_data = []
-        
-        # Get unique conversation partners
-        sent_to = Message.objects.filter(sender=user).values_list('recipient', flat=True).distinct()
-        received_from = Message.objects.filter(recipient=user).values_list('sender', flat=True).distinct()
-        
-        conversation_partners = set(list(sent_to) + list(received_from))
+        inbox = Conversation.objects.filter(
+            user=request.user
+        ).select_related(
+            'partner', 'partner__social_profile', 'partner__profile',
+            'last_message',
+            'last_message__sender', 'last_message__sender__social_profile',
+            'last_message__sender__profile',
+            'last_message__recipient', 'last_message__recipient__social_profile',
+            'last_message__recipient__profile'
+        ).order_by('-last_activity_at')
         
-        for partner_id in conversation_partners:
-            partner = User.objects.select_related('social_profile').get(id=partner_id)
-            
-            # Get last message
-            last_message = Message.objects.filter(
-                Q(sender=user, recipient=partner) |
-                Q(sender=partner, recipient=user)
-            ).select_related('sender', 'recipient').order_by('-created_at').first()
-            
-            # Get unread count
-            unread_count = Message.objects.filter(
-                sender=partner,
-                recipient=user,
-                is_read=False
-            ).count()
-            
-            conversations_data.append({
-                'user': partner,
-                'last_message': last_message,
-                'unread_count': unread_count
-            })
-        
-        # Sort by last message time
-        conversations_data.sort(
-            key=lambda x: x['last_message'].created_at if x['last_message'] else timezone.now(),
-            reverse=True
-        )
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(inbox, request)
         
-        serializer = ConversationSerializer(conversations_data, many=True)
-        return Response(serializer.data)
+        serializer = ConversationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def conversation(self, request):
@@ -662,6 +714,7 @@ class MessageViewSet(viewsets.ModelViewSet):
             recipient=request.user,
             is_read=False
         ).update(is_read=True, read_at=timezone.now())
+        conversations.mark_read(request.user, other_user)
         
         paginator = StandardPagination()
         page = paginator.paginate_queryset(messages, request)
@@ -697,6 +750,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
             recipient=request.user,
             is_read=False
         ).update(is_read=True)
+        badges.invalidate(request.user.id)
         
         return Response({'status': 'marked_all_read'}, status=status.HTTP_200_OK)
     
@@ -712,14 +766,32 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get count of unread notifications"""
-        count = Notification.objects.filter(
-            recipient=request.user,
-            is_read=False
-        ).count()
+        count = badges.get_counts(request.user.id)['notifications']
         
         return Response({'unread_count': count})
 
 
+@api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
+@permission_classes([IsAuthenticated])
+def unread_badges(request):
+    """
+    Unread notification and message counts for app badges
+    Served from cache without loading the user; send If-None-Match to get a 304
+    """
+    counts = badges.get_counts(request.user.id)
+    etag = badges.get_etag(counts)
+    
+    if request.headers.get('If-None-Match') == etag:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(counts)
+    
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 # ============================================================
 # MODERATION VIEWS
 # ============================================================
@@ -766,11 +838,21 @@ def block_user(request):
     )
     
     if created:
-        # Remove follow relationships
-        Follow.objects.filter(
-            Q(follower=request.user, following=user_to_block) |
-            Q(follower=user_to_block, following=request.user)
-        ).delete()
+        # Remove follow relationships (and their counters)
+        with transaction.atomic():
+            edges = list(Follow.objects.filter(
+                Q(follower=request.user, following=user_to_block) |
+                Q(follower=user_to_block, following=request.user)
+            ).values_list('id', 'follower_id', 'following_id', 'status'))
+            Follow.objects.filter(id__in=[edge[0] for edge in edges]).delete()
+            
+            for _, follower_id, following_id, edge_status in edges:
+                if edge_status == 'accepted':
+                    counters.adjust_follow(follower_id, following_id, -1)
+        
+        # Purge each other's posts from both home timelines
+        timeline.remove_author(request.user, user_to_block)
+        timeline.remove_author(user_to_block, request.user)
         
         return Response({'status': 'blocked'}, status=status.HTTP_201_CREATED)
     
@@ -804,3 +886,42 @@ def unblock_user(request):
             {'error': 'User not blocked'},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+# ============================================================
+# AUTOCOMPLETE VIEW
+# ============================================================
+
+@api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
+@permission_classes([IsAuthenticated])
+def autocomplete_usernames(request):
+    """
+    Username typeahead for @mentions and follow search (?q=&limit=)
+    Served from the in-process prefix index, most followed first
+    """
+    try:
+        limit = int(request.query_params.get('limit', 8))
+    except ValueError:
+        limit = 8
+    
+    # Users either side has blocked never show up
+    hidden_ids = graph.blocking_ids(request.user.id) | graph.blocked_by_ids(request.user.id)
+    
+    results = autocomplete.index.complete(
+        request.query_params.get('q', ''),
+        limit=limit,
+        exclude_ids=hidden_ids
+    )
+    return Response({'results': results})
+
+
+# ============================================================
+# DIAGNOSTICS
+# ============================================================
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def graph_cache_stats(request):
+    """Hit rate and load latency of this worker's social graph cache"""
+    return Response(graph.get_stats())